@@ -0,0 +1,62 @@
+"""Load test for the chat pipeline on the deterministic stub backend.
+
+Runs a multi-turn conversation through ChatManager, the generation worker
+and ModelManager with a simulated model, once reusing the chat session and
+once re-evaluating the whole history every turn.
+
+Usage: python benchmarks/chat_load_benchmark.py [--turns 20] [--latency 0.01]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QCoreApplication
+from src.core.backends import StubBackend
+from src.core.model_manager import ModelManager
+from src.core.chat_manager import ChatManager
+
+def run_conversation(args, reuse_session):
+    backend = StubBackend(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        prompt_tokens_per_second=args.prompt_tokens_per_second,
+        response_tokens=args.response_tokens
+    )
+    model_manager = ModelManager(backend=backend)
+    chat_manager = ChatManager(model_manager)
+    
+    latencies = []
+    for turn in range(args.turns):
+        if not reuse_session:
+            chat_manager.session.invalidate()
+        start = time.perf_counter()
+        chat_manager.get_response(f"Question {turn}: what does the function on line {turn * 10} do?")
+        latencies.append(time.perf_counter() - start)
+    model_manager.shutdown()
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=500)
+    parser.add_argument("--prompt-tokens-per-second", type=float, default=5000)
+    parser.add_argument("--response-tokens", type=int, default=32)
+    args = parser.parse_args()
+    
+    app = QCoreApplication.instance() or QCoreApplication([])
+    # ModelManager keeps its settings and models relative to the working directory
+    os.chdir(tempfile.mkdtemp())
+    
+    for name, reuse_session in [("re-evaluate", False), ("session", True)]:
+        latencies = run_conversation(args, reuse_session)
+        p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1]
+        print(f"{name:>12}: total {sum(latencies):6.2f} s, mean {statistics.mean(latencies) * 1000:7.1f} ms, "
+              f"p95 {p95 * 1000:7.1f} ms, last turn {latencies[-1] * 1000:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
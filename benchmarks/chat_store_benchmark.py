@@ -0,0 +1,78 @@
+"""Benchmark for the chat history store: a 50,000-message conversation.
+
+Writes the conversation through ChatStore, then reports the time to reopen
+it and read the first page, against reading every message, to page back
+through it and to search it.
+
+Usage: python benchmarks/chat_store_benchmark.py [--messages 50000] [--page-size 100]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.chat_store import ChatStore
+
+WORDS = ["python", "list", "sort", "closure", "thread", "query", "index", "model", "test", "error",
+         "function", "class", "import", "cache", "reply", "token", "widget", "signal", "path", "file"]
+
+def message_text(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 80)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--searches", type=int, default=100)
+    args = parser.parse_args()
+    
+    rng = random.Random(0)
+    path = os.path.join(tempfile.mkdtemp(), "chat.db")
+    
+    store = ChatStore(path)
+    conversation = store.new_conversation()
+    start = time.perf_counter()
+    for i in range(args.messages):
+        store.append(conversation, "user" if i % 2 == 0 else "assistant", message_text(rng))
+    queued = time.perf_counter() - start
+    store.flush()
+    written = time.perf_counter() - start
+    store.close()
+    print(f"write: {args.messages} messages queued in {queued:.2f} s, on disk after {written:.2f} s "
+          f"({os.path.getsize(path) / 2**20:.1f} MB)")
+    
+    start = time.perf_counter()
+    store = ChatStore(path)
+    page = store.page(store.latest_conversation(), limit=args.page_size)
+    first_page = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    everything = store.query("SELECT role, content FROM messages WHERE conversation = ? ORDER BY id",
+                             (conversation,))
+    read_all = time.perf_counter() - start
+    print(f"open: first page of {len(page)} in {first_page * 1000:.1f} ms, "
+          f"all {len(everything)} messages in {read_all * 1000:.1f} ms")
+    
+    times = []
+    while page:
+        start = time.perf_counter()
+        page = store.page(conversation, before=page[0]["id"], limit=args.page_size)
+        times.append(time.perf_counter() - start)
+    print(f"scroll back: {len(times)} pages, median {statistics.median(times) * 1000:.2f} ms per page")
+    
+    times = []
+    for _ in range(args.searches):
+        query = " ".join(rng.sample(WORDS, 3))
+        start = time.perf_counter()
+        store.find_answers(query, limit=20)
+        times.append(time.perf_counter() - start)
+    print(f"search: median {statistics.median(times) * 1000:.2f} ms, "
+          f"max {max(times) * 1000:.2f} ms over {args.searches} queries")
+    store.close()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
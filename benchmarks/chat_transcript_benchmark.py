@@ -0,0 +1,160 @@
+"""Micro-benchmark for the chat transcript.
+
+Compares TranscriptView with the previous transcript of one MessageWidget
+per message in a QScrollArea: the time to append a message to a long
+conversation, to stream tokens into the last message and to scroll a page,
+after loading the conversation.
+
+Usage: python benchmarks/chat_transcript_benchmark.py [--messages 10000] [--legacy-messages 1000]
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# GUI modules import core the way src/main.py runs them
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt6.QtWidgets import QApplication, QScrollArea, QWidget, QVBoxLayout, QFrame, QLabel
+from PyQt6.QtCore import Qt
+from gui.chat_transcript import TranscriptView
+
+class LegacyMessageWidget(QFrame):
+    """The previous message widget: a frame with a word-wrapped label."""
+    def __init__(self, text, is_user=True, parent=None):
+        super().__init__(parent)
+        self.text = text
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 5, 10, 5)
+        self.message_label = QLabel(text)
+        self.message_label.setWordWrap(True)
+        self.message_label.setTextFormat(Qt.TextFormat.RichText)
+        layout.addWidget(self.message_label)
+    
+    def append_text(self, chunk):
+        self.text += chunk
+        self.message_label.setText(self.text)
+
+class LegacyTranscript(QScrollArea):
+    """The previous transcript: widgets in a QVBoxLayout inside a QScrollArea."""
+    def __init__(self):
+        super().__init__()
+        self.setWidgetResizable(True)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.container = QWidget()
+        self.message_layout = QVBoxLayout(self.container)
+        self.message_layout.setSpacing(10)
+        self.message_layout.addStretch()
+        self.setWidget(self.container)
+        self.messages = []
+    
+    def load(self, messages):
+        for text, is_user in messages:
+            self.add_message(text, is_user)
+    
+    def add_message(self, text, is_user):
+        message = LegacyMessageWidget(text, is_user)
+        self.message_layout.insertWidget(self.message_layout.count() - 1, message)
+        self.messages.append(message)
+        self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+    
+    def append_text(self, chunk):
+        self.messages[-1].append_text(chunk)
+        self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+    
+    def scroll_bar(self):
+        return self.verticalScrollBar()
+    
+    def repaint_view(self):
+        self.viewport().repaint()
+    
+    def show_sized(self):
+        self.resize(800, 600)
+        self.show()
+
+class VirtualTranscript:
+    """TranscriptView behind the same interface as LegacyTranscript."""
+    def __init__(self):
+        self.view = TranscriptView()
+    
+    def load(self, messages):
+        self.view.transcript.add_messages(messages)
+        self.view.scroll_to_latest()
+    
+    def add_message(self, text, is_user):
+        self.view.transcript.add_message(text, is_user)
+        self.view.scroll_to_latest()
+    
+    def append_text(self, chunk):
+        self.view.transcript.append_text(len(self.view.transcript.messages) - 1, chunk)
+        self.view.scroll_to_latest()
+    
+    def scroll_bar(self):
+        return self.view.verticalScrollBar()
+    
+    def repaint_view(self):
+        self.view.viewport().repaint()
+    
+    def show_sized(self):
+        self.view.resize(800, 600)
+        self.view.show()
+
+def message_text(i):
+    words = ["the", "model", "streams", "tokens", "into", "a", "reply", "about", "code", "and", "tests"]
+    return " ".join(words[(i + j) % len(words)] for j in range(10 + (i * 7) % 60))
+
+def time_transcript(app, transcript, messages, samples, tokens):
+    transcript.show_sized()
+    
+    # Load the conversation so far
+    start = time.perf_counter()
+    transcript.load([(message_text(i), i % 2 == 0) for i in range(messages - samples)])
+    app.processEvents()
+    fill = time.perf_counter() - start
+    
+    # Appends at the end of the long conversation, each shown before the next
+    start = time.perf_counter()
+    for i in range(messages - samples, messages):
+        transcript.add_message(message_text(i), i % 2 == 0)
+        app.processEvents()
+    append = (time.perf_counter() - start) / samples
+    
+    transcript.add_message("", False)
+    start = time.perf_counter()
+    for i in range(tokens):
+        transcript.append_text(f" token{i}")
+        app.processEvents()
+    stream = (time.perf_counter() - start) / tokens
+    
+    # Page up through the conversation, sampling at most 200 positions
+    scroll_bar = transcript.scroll_bar()
+    step = max(scroll_bar.pageStep(), (scroll_bar.maximum() - scroll_bar.minimum()) // 200)
+    positions = range(scroll_bar.maximum(), scroll_bar.minimum(), -step)
+    start = time.perf_counter()
+    for value in positions:
+        scroll_bar.setValue(value)
+        transcript.repaint_view()
+    scroll = (time.perf_counter() - start) / max(len(positions), 1)
+    return fill, append, stream, scroll
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--legacy-messages", type=int, default=1000,
+                        help="conversation length for the widget transcript, which gets slow quickly")
+    parser.add_argument("--samples", type=int, default=100, help="appends to time at the end")
+    parser.add_argument("--tokens", type=int, default=200, help="tokens to stream into the last message")
+    args = parser.parse_args()
+    
+    app = QApplication.instance() or QApplication([])
+    runs = [("widgets", LegacyTranscript, args.legacy_messages), ("list view", VirtualTranscript, args.messages)]
+    for name, transcript_class, messages in runs:
+        if messages <= args.samples:
+            continue
+        fill, append, stream, scroll = time_transcript(app, transcript_class(), messages, args.samples, args.tokens)
+        print(f"{name:>10} ({messages} messages): fill {fill:6.2f} s, append {append * 1000:7.2f} ms, "
+              f"stream token {stream * 1000:6.2f} ms, scroll page {scroll * 1000:6.2f} ms")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
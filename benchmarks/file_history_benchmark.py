@@ -0,0 +1,79 @@
+"""Benchmark for file version history: 1,000 edits to a 1 MB file.
+
+Saves each edit through FileManager, then reports save time, the disk used
+by the object store against storing every version in full, and the time to
+restore and diff old versions.
+
+Usage: python benchmarks/file_history_benchmark.py [--edits 1000] [--size-kb 1024]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.file_manager import FileManager
+
+def make_source(size, rng):
+    lines = []
+    total = 0
+    while total < size:
+        line = f"    value_{rng.randrange(10**6)} = compute({rng.randrange(1000)}, '{rng.random():.6f}')\n"
+        lines.append(line)
+        total += len(line)
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edits", type=int, default=1000)
+    parser.add_argument("--size-kb", type=int, default=1024)
+    args = parser.parse_args()
+    
+    rng = random.Random(0)
+    os.chdir(tempfile.mkdtemp())
+    file_manager = FileManager()
+    file_manager.journal.max_versions = args.edits + 1
+    path = "workspace/large.py"
+    
+    lines = make_source(args.size_kb * 1024, rng)
+    file_manager.create_file(path, "".join(lines))
+    
+    save_times = []
+    for _ in range(args.edits):
+        lines[rng.randrange(len(lines))] = f"    edited_{rng.randrange(10**6)} = True\n"
+        content = "".join(lines)
+        start = time.perf_counter()
+        file_manager.write_file(path, content)
+        save_times.append(time.perf_counter() - start)
+    file_manager.save_history()
+    
+    versions = len(file_manager.file_history[path])
+    full_size = sum(version["size"] for version in file_manager.file_history[path])
+    store_size = file_manager.journal.blobs.disk_usage()
+    print(f"{versions} versions of a {args.size_kb} KB file")
+    print(f"save: mean {statistics.mean(save_times) * 1000:.2f} ms, "
+          f"p95 {sorted(save_times)[int(len(save_times) * 0.95)] * 1000:.2f} ms")
+    print(f"disk: {store_size / 1024:.0f} KB in the object store vs "
+          f"{full_size / 1024 / 1024:.0f} MB storing every version ({full_size / store_size:.0f}x smaller)")
+    
+    # Drop decoded versions so restores read from disk
+    file_manager.journal.blobs.cache.clear()
+    start = time.perf_counter()
+    for index in range(0, versions, max(1, versions // 20)):
+        file_manager.read_version(path, index)
+    print(f"read: {(time.perf_counter() - start) / 20 * 1000:.2f} ms per version from disk")
+    
+    start = time.perf_counter()
+    diff = file_manager.diff_versions(path, 0, -1)
+    print(f"diff: first vs last in {(time.perf_counter() - start) * 1000:.1f} ms ({diff.count(chr(10))} lines)")
+    
+    start = time.perf_counter()
+    file_manager.restore_version(path, 0)
+    print(f"restore: oldest version in {(time.perf_counter() - start) * 1000:.1f} ms")
+    file_manager.close()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
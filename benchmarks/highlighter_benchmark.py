@@ -0,0 +1,102 @@
+"""Micro-benchmark for the code editor's syntax highlighter.
+
+Compares PythonHighlighter with the previous per-keyword regex highlighter
+on a generated Python file, for a full highlight and for a single edit.
+
+Usage: python benchmarks/highlighter_benchmark.py [--lines 10000]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# GUI modules import core the way src/main.py runs them
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QTextCursor, QSyntaxHighlighter, QTextCharFormat, QColor
+from gui.tabs.code_tab import PythonHighlighter, CodeEditor
+
+class LegacyHighlighter(QSyntaxHighlighter):
+    """The previous highlighter: one uncompiled regex per keyword and builtin."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        format = QTextCharFormat()
+        format.setForeground(QColor("#FF7043"))
+        words = PythonHighlighter.KEYWORDS + PythonHighlighter.BUILTINS
+        self.highlighting_rules = [(r'\b' + word + r'\b', format) for word in words]
+        self.highlighting_rules += [
+            (r'"[^"\\]*(\\.[^"\\]*)*"|\'[^\'\\]*(\\.[^\'\\]*)*\'', format),
+            (r'\b[0-9]+\b', format),
+            (r'#[^\n]*', format)
+        ]
+    
+    def highlightBlock(self, text):
+        import re
+        for pattern, format in self.highlighting_rules:
+            for match in re.finditer(pattern, text):
+                self.setFormat(match.start(), match.end() - match.start(), format)
+
+SAMPLE = '''class Node(object):
+    """A node in a tree.
+    
+    Holds a value and its children.
+    """
+    def __init__(self, value, children=None):
+        self.value = value  # payload
+        self.children = list(children or [])
+    
+    def total(self):
+        return self.value + sum(child.total() for child in self.children if child is not None)
+    
+    def describe(self):
+        return f"Node({self.value!r}) with {len(self.children)} children, 0x{id(self):x}"
+
+'''
+
+def generate_source(lines):
+    sample_lines = SAMPLE.count("\n")
+    return SAMPLE * (lines // sample_lines + 1)
+
+def time_highlighter(app, highlighter_class, source, edits):
+    editor = CodeEditor()
+    editor.highlighter.setDocument(None)
+    highlighter = highlighter_class(editor.document())
+    
+    start = time.perf_counter()
+    editor.setPlainText(source)
+    app.processEvents()
+    full = time.perf_counter() - start
+    
+    # Type characters into a line in the middle of the file
+    document = editor.document()
+    cursor = QTextCursor(document.findBlockByNumber(document.blockCount() // 2))
+    cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock)
+    start = time.perf_counter()
+    for _ in range(edits):
+        cursor.insertText("x")
+        app.processEvents()
+    typing = (time.perf_counter() - start) / edits
+    return full, typing
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=10000)
+    parser.add_argument("--edits", type=int, default=200)
+    args = parser.parse_args()
+    
+    app = QApplication.instance() or QApplication([])
+    source = generate_source(args.lines)
+    print(f"Highlighting {source.count(chr(10))} lines, {len(source) / 1024:.0f} KB")
+    
+    results = {}
+    for name, highlighter_class in [("legacy", LegacyHighlighter), ("single-pass", PythonHighlighter)]:
+        full, typing = time_highlighter(app, highlighter_class, source, args.edits)
+        results[name] = full
+        print(f"{name:>12}: full highlight {full * 1000:8.1f} ms, per keystroke {typing * 1000:6.3f} ms")
+    print(f"Speedup: {results['legacy'] / results['single-pass']:.1f}x")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
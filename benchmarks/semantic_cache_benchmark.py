@@ -0,0 +1,102 @@
+"""Benchmark for the semantic answer cache.
+
+Fills a SemanticCache with questions, then replays a workload in which some
+questions are rewordings of cached ones, and reports lookup time against
+comparing with every entry in Python, the hit rate and how many hits
+returned the answer to a different question. Uses the stub backend's
+embedder, so similarity is over shared words only.
+
+Usage: python benchmarks/semantic_cache_benchmark.py [--entries 300] [--lookups 1000] [--repeat-share 0.3]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.backends import StubBackend
+from src.core.semantic_cache import SemanticCache
+
+TOPICS = ["list", "dict", "thread", "socket", "decorator", "generator", "closure", "regex", "json", "class",
+          "async", "pytest", "numpy", "pandas", "sqlite", "logging", "typing", "pathlib", "enum", "unicode"]
+VERBS = ["sort", "reverse", "copy", "merge", "filter", "test", "debug", "speed up", "serialise", "explain"]
+GOALS = ["without a loop", "in place", "for large inputs", "safely", "on Windows", "in one line"]
+
+def question(rng):
+    return f"How do I {rng.choice(VERBS)} a {rng.choice(TOPICS)} {rng.choice(GOALS)} in Python?"
+
+def reword(text, rng):
+    text = text.replace("How do I", rng.choice(["How can I", "how do i", "How do I"]))
+    return text.rstrip("?") if rng.random() < 0.5 else text
+
+def legacy_lookup(entries, vector, threshold):
+    """Nearest entry by comparing with each cached vector in turn."""
+    best, best_score = None, threshold
+    for prompt, answer, cached in entries:
+        score = sum(a * b for a, b in zip(cached, vector))
+        if score >= best_score:
+            best, best_score = answer, score
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=300)
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--repeat-share", type=float, default=0.3, help="share of lookups rewording a cached question")
+    parser.add_argument("--threshold", type=float, default=0.96,
+                        help="the stub embedder needs a higher threshold than a sentence embedder")
+    parser.add_argument("--dimension", type=int, default=384)
+    args = parser.parse_args()
+    
+    rng = random.Random(0)
+    embed = StubBackend(embedding_size=args.dimension).embed
+    cache = SemanticCache(embed, threshold=args.threshold, max_entries=args.entries)
+    questions = [question(rng) for _ in range(args.entries)]
+    start = time.perf_counter()
+    for i, text in enumerate(questions):
+        cache.put(text, f"answer {i}", "model")
+    print(f"fill: {cache.stats()['entries']} entries in {time.perf_counter() - start:.2f} s")
+    
+    answers = {text: f"answer {i}" for i, text in enumerate(questions)}
+    workload = []  # (question, answer expected from the cache or None)
+    for _ in range(args.lookups):
+        if rng.random() < args.repeat_share:
+            original = rng.choice(questions)
+            workload.append((reword(original, rng), answers[original]))
+        else:
+            text = question(rng)
+            workload.append((text, answers.get(text)))
+    vectors = [embed(text) for text, _ in workload]
+    
+    start = time.perf_counter()
+    for text, _ in workload:
+        embed(text)
+    embedding = (time.perf_counter() - start) / len(workload)
+    
+    times = []
+    wrong = 0
+    for text, expected in workload:
+        start = time.perf_counter()
+        hit = cache.lookup(text, "model")
+        times.append(time.perf_counter() - start - embedding)
+        if hit is not None and hit["answer"] != expected:
+            wrong += 1
+    
+    entries = [(text, f"answer {i}", embed(text)) for i, text in enumerate(questions)]
+    legacy_times = []
+    for vector in vectors[:100]:
+        start = time.perf_counter()
+        legacy_lookup(entries, vector, args.threshold)
+        legacy_times.append(time.perf_counter() - start)
+    
+    stats = cache.stats()
+    print(f"lookup: numpy index median {statistics.median(times) * 1000:.3f} ms, "
+          f"python loop median {statistics.median(legacy_times) * 1000:.3f} ms "
+          f"(embedding {embedding * 1000:.3f} ms excluded)")
+    print(f"hit rate: {stats['hit_rate']:.1%} ({stats['hits']} of {stats['hits'] + stats['misses']}, "
+          f"{wrong} with another question's answer), rewordings in workload: {args.repeat_share:.0%}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,20 +1,16 @@
 from PyQt6.QtCore import QObject, pyqtSignal
-import re
-import ast
 import json
+import threading
 from pathlib import Path
+from .response_cache import ResponseCache
+from .code_index import format_snippets
+from .conversation import estimate_tokens
+from .static_analysis import analyze_python, summarize_facts
+from .structured_output import (SCHEMAS, REPAIR_TEMPLATE, StreamingJSONParser, extract_json,
+                                validate, schema_instructions)
 
-class AIFeatures(QObject):
-    analysis_complete = pyqtSignal(str, dict)  # file_path, results
-    suggestion_ready = pyqtSignal(str, list)   # context, suggestions
-    
-    def __init__(self, chat_manager):
-        super().__init__()
-        self.chat_manager = chat_manager
-        
-    def analyze_code_structure(self, code, language):
-        """Analyze code structure and complexity"""
-        prompt = f"""Analyze this {language} code and provide detailed information about:
+PROMPT_TEMPLATES = {
+    "analyze_code_structure": """Analyze this {language} code and provide detailed information about:
 1. Code structure (classes, functions, etc.)
 2. Complexity metrics
 3. Potential issues
@@ -23,17 +19,14 @@ class AIFeatures(QObject):
 Code:
 {code}
 
-Provide the analysis in JSON format with these sections."""
-        
-        response = self.chat_manager.process_message(prompt)
-        try:
-            return json.loads(response)
-        except:
-            return {"error": "Failed to parse analysis"}
-            
-    def suggest_improvements(self, code, language):
-        """Suggest code improvements"""
-        prompt = f"""Review this {language} code and suggest improvements for:
+Provide the analysis in JSON format with these sections.""",
+    "review_code_structure": """Review this {language} code for potential issues and best practices compliance.
+Its structure and complexity were already measured:
+{facts}
+
+Code:
+{code}""",
+    "suggest_improvements": """Review this {language} code and suggest improvements for:
 1. Performance optimization
 2. Code readability
 3. Error handling
@@ -42,13 +35,8 @@ Provide the analysis in JSON format with these sections."""
 Code:
 {code}
 
-Provide specific suggestions with example code."""
-        
-        return self.chat_manager.process_message(prompt)
-        
-    def generate_documentation(self, code, language):
-        """Generate documentation for code"""
-        prompt = f"""Generate comprehensive documentation for this {language} code including:
+Provide specific suggestions with example code.""",
+    "generate_documentation": """Generate comprehensive documentation for this {language} code including:
 1. Overview
 2. Function/class documentation
 3. Parameters and return values
@@ -57,26 +45,16 @@ Provide specific suggestions with example code."""
 Code:
 {code}
 
-Provide the documentation in markdown format."""
-        
-        return self.chat_manager.process_message(prompt)
-        
-    def explain_code(self, code, language, level="intermediate"):
-        """Explain code with specified detail level"""
-        prompt = f"""Explain this {language} code at a {level} level. Include:
+Provide the documentation in markdown format.""",
+    "explain_code": """Explain this {language} code at a {level} level. Include:
 1. Overall purpose
 2. How it works
 3. Key concepts used
 4. Step-by-step explanation
 
 Code:
-{code}"""
-        
-        return self.chat_manager.process_message(prompt)
-        
-    def suggest_tests(self, code, language):
-        """Suggest unit tests for code"""
-        prompt = f"""Generate unit tests for this {language} code. Include:
+{code}""",
+    "suggest_tests": """Generate unit tests for this {language} code. Include:
 1. Test cases
 2. Edge cases
 3. Input/output examples
@@ -85,13 +63,8 @@ Code:
 Code:
 {code}
 
-Provide complete test code examples."""
-        
-        return self.chat_manager.process_message(prompt)
-        
-    def refactor_code(self, code, language):
-        """Suggest code refactoring"""
-        prompt = f"""Suggest refactoring for this {language} code to improve:
+Provide complete test code examples.""",
+    "refactor_code": """Suggest refactoring for this {language} code to improve:
 1. Design patterns usage
 2. Code organization
 3. Maintainability
@@ -100,13 +73,8 @@ Provide complete test code examples."""
 Code:
 {code}
 
-Provide the refactored code with explanations."""
-        
-        return self.chat_manager.process_message(prompt)
-        
-    def generate_similar_code(self, code, language):
-        """Generate similar code with variations"""
-        prompt = f"""Generate 3 variations of this {language} code with:
+Provide the refactored code with explanations.""",
+    "generate_similar_code": """Generate 3 variations of this {language} code with:
 1. Different approaches
 2. Alternative implementations
 3. Various design patterns
@@ -114,13 +82,8 @@ Provide the refactored code with explanations."""
 Original code:
 {code}
 
-Provide complete code examples with explanations."""
-        
-        return self.chat_manager.process_message(prompt)
-        
-    def debug_code(self, code, error_message, language):
-        """Help debug code with error"""
-        prompt = f"""Debug this {language} code that produces the following error:
+Provide complete code examples with explanations.""",
+    "debug_code": """Debug this {language} code that produces the following error:
 Error: {error_message}
 
 Code:
@@ -130,13 +93,8 @@ Provide:
 1. Error analysis
 2. Potential causes
 3. Solutions
-4. Fixed code example"""
-        
-        return self.chat_manager.process_message(prompt)
-        
-    def optimize_code(self, code, language):
-        """Suggest performance optimizations"""
-        prompt = f"""Analyze and optimize this {language} code for:
+4. Fixed code example""",
+    "optimize_code": """Analyze and optimize this {language} code for:
 1. Time complexity
 2. Space complexity
 3. Resource usage
@@ -145,6 +103,203 @@ Provide:
 Code:
 {code}
 
-Provide optimized code with performance impact explanations."""
+Provide optimized code with performance impact explanations.""",
+    "answer_project_question": """Answer this question about the project, using the related project code above and the code below.
+
+Question: {question}
+
+Code:
+{code}"""
+}
+
+class AIFeatures(QObject):
+    analysis_complete = pyqtSignal(str, dict)  # file_path, results
+    suggestion_ready = pyqtSignal(str, list)   # context, suggestions
+    
+    def __init__(self, chat_manager, cache=None, code_index=None, embedding_index=None):
+        super().__init__()
+        self.chat_manager = chat_manager
+        self.generation_params = {}
+        # Unchanged code is answered from the cache instead of regenerated
+        self.cache = cache or ResponseCache(cache_dir=Path("workspace") / "cache" / "responses")
+        # Definitions the code uses, then chunks similar to it, are added to prompts
+        self.code_index = code_index
+        self.embedding_index = embedding_index
+        self.context_snippets = 3
+        self.retrieval_chunks = 4
+        self.context_tokens = 1024  # keeps prompt, context and answer within the window
+        # JSON features get this many repair prompts after an invalid answer
+        self.max_repair_attempts = 2
+        self.structured_counts = {"requests": 0, "first_try": 0, "repaired": 0, "failed": 0, "retried": 0, "retries": 0}
+        self.structured_lock = threading.Lock()
+    
+    def count_tokens(self, text):
+        return estimate_tokens(text)
+    
+    def project_context(self, code, query=None, exclude=None):
+        """Prompt section with project code relevant to code (or to query), within context_tokens.
         
-        return self.chat_manager.process_message(prompt) 
\ No newline at end of file
+        exclude is the path of the file code comes from, whose own code is left out.
+        """
+        snippets = []
+        code_index, embedding_index = self.code_index, self.embedding_index
+        if code_index is not None and code and self.context_snippets:
+            snippets.extend(code_index.related_snippets(code, limit=self.context_snippets, exclude=exclude))
+        if embedding_index is not None and self.retrieval_chunks and (query or code):
+            excluded = Path(exclude).resolve() if exclude else None
+            retrieved = 0
+            for hit in embedding_index.search(query or code, k=2 * self.retrieval_chunks):
+                text = hit["text"].strip()
+                # Skip the code itself and chunks overlapping a definition already included
+                if not text or text in code or any(s["path"] == hit["path"] and s["start"] <= hit["end"]
+                                                   and hit["start"] <= s["end"] for s in snippets):
+                    continue
+                if excluded is not None and Path(hit["path"]).resolve() == excluded:
+                    continue
+                snippets.append(hit)
+                retrieved += 1
+                if retrieved == self.retrieval_chunks:
+                    break
+        
+        selected = []
+        budget = self.context_tokens
+        for snippet in snippets:
+            tokens = self.count_tokens(snippet["text"]) + 16  # plus the location line
+            if tokens <= budget:
+                selected.append(snippet)
+                budget -= tokens
+        return format_snippets(selected)
+    
+    def route(self, feature, prompt):
+        """The model name a feature's answers are cached under, and the generation parameters to run prompt with."""
+        model_manager = self.chat_manager.model_manager
+        route, model = model_manager.route(feature, prompt)
+        params = {**self.generation_params, "route": route}
+        if model is None:
+            return model_manager.model_name_for(), params
+        return model, {**params, "model": model}
+    
+    def run_feature(self, feature, code, retrieval_query=None, **fields):
+        """Fill in a feature's prompt template and get the (possibly cached) response."""
+        template = PROMPT_TEMPLATES[feature]
+        context = self.project_context(code, retrieval_query)
+        prompt = template.format(code=code, **fields)
+        if context:
+            prompt = f"{context}\n\n{prompt}"
+        model_name, params = self.route(feature, prompt)
+        key = ResponseCache.make_key(model_name, template, self.generation_params, code, context=context, **fields)
+        
+        response = self.cache.get(key)
+        if response is None:
+            response = self.chat_manager.process_message(prompt, **params)
+            self.cache.put(key, response)
+        return response
+    
+    def run_structured(self, feature, code, retrieval_query=None, **fields):
+        """Like run_feature, but return JSON checked against the feature's schema.
+        
+        Generation stops as soon as the JSON object closes. An answer that
+        does not parse or validate is sent back in a repair prompt, after the
+        original prompt and with the errors, at most max_repair_attempts
+        times; after that an {"error"} dict is returned.
+        """
+        template = PROMPT_TEMPLATES[feature]
+        schema = SCHEMAS[feature]
+        context = self.project_context(code, retrieval_query)
+        prompt = template.format(code=code, **fields) + "\n\n" + schema_instructions(schema)
+        if context:
+            prompt = f"{context}\n\n{prompt}"
+        model_name, params = self.route(feature, prompt)
+        key = ResponseCache.make_key(model_name, template, self.generation_params, code,
+                                     context=context, schema=schema, **fields)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return json.loads(cached)
+        
+        task = prompt
+        errors = []
+        for attempt in range(self.max_repair_attempts + 1):
+            parser = StreamingJSONParser()
+            response = self.chat_manager.process_message(prompt, stop_when=parser.feed, **params)
+            try:
+                value = extract_json(response)
+                errors = validate(value, schema)
+            except ValueError as e:
+                errors = [str(e)]
+            if not errors:
+                self.record_structured(attempt, succeeded=True)
+                self.cache.put(key, json.dumps(value))
+                return value
+            prompt = REPAIR_TEMPLATE.format(prompt=task, errors="\n".join(f"- {error}" for error in errors),
+                                            response=response, schema=json.dumps(schema))
+        self.record_structured(self.max_repair_attempts, succeeded=False)
+        return {"error": "Failed to parse analysis", "details": errors}
+    
+    def record_structured(self, retries, succeeded):
+        with self.structured_lock:
+            counts = self.structured_counts
+            counts["requests"] += 1
+            counts["retries"] += retries
+            counts["retried"] += bool(retries)
+            if not succeeded:
+                counts["failed"] += 1
+            elif retries:
+                counts["repaired"] += 1
+            else:
+                counts["first_try"] += 1
+    
+    def structured_stats(self):
+        """Counts of structured requests plus success and retry rates."""
+        with self.structured_lock:
+            counts = dict(self.structured_counts)
+        requests = counts["requests"] or 1
+        counts["success_rate"] = (counts["first_try"] + counts["repaired"]) / requests
+        counts["retry_rate"] = counts["retried"] / requests
+        return counts
+    
+    def analyze_code_structure(self, code, language):
+        """Analyze code structure and complexity"""
+        facts = analyze_python(code) if language.lower() == "python" else None
+        if facts is None:
+            return self.run_structured("analyze_code_structure", code, language=language)
+        # Structure and metrics are measured locally; the model only reviews
+        review = self.run_structured("review_code_structure", code, language=language, facts=summarize_facts(facts))
+        if "error" in review:
+            return review
+        return {**facts, "issues": review["issues"], "best_practices": review["best_practices"]}
+    
+    def suggest_improvements(self, code, language):
+        """Suggest code improvements"""
+        return self.run_feature("suggest_improvements", code, language=language)
+    
+    def generate_documentation(self, code, language):
+        """Generate documentation for code"""
+        return self.run_feature("generate_documentation", code, language=language)
+    
+    def explain_code(self, code, language, level="intermediate"):
+        """Explain code with specified detail level"""
+        return self.run_feature("explain_code", code, language=language, level=level)
+    
+    def suggest_tests(self, code, language):
+        """Suggest unit tests for code"""
+        return self.run_feature("suggest_tests", code, language=language)
+    
+    def refactor_code(self, code, language):
+        """Suggest code refactoring"""
+        return self.run_feature("refactor_code", code, language=language)
+    
+    def generate_similar_code(self, code, language):
+        """Generate similar code with variations"""
+        return self.run_feature("generate_similar_code", code, language=language)
+    
+    def debug_code(self, code, error_message, language):
+        """Help debug code with error"""
+        return self.run_feature("debug_code", code, error_message=error_message, language=language)
+    
+    def optimize_code(self, code, language):
+        """Suggest performance optimizations"""
+        return self.run_feature("optimize_code", code, language=language)
+    
+    def ask_about_project(self, question, code=""):
+        """Answer a question about the project from the code retrieved for it"""
+        return self.run_feature("answer_project_question", code, retrieval_query=question, question=question)
\ No newline at end of file
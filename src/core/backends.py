@@ -0,0 +1,195 @@
+from contextlib import contextmanager
+import hashlib
+import math
+import re
+import time
+
+class InferenceBackend:
+    """Interface to a local model runtime.
+    
+    A backend is loaded with a model file and its config, then generates
+    text with the same call shape as GPT4All: generate(prompt, streaming,
+    callback, ...) where returning False from callback stops generation.
+    All calls for a loaded backend are made from the generation worker.
+    """
+    
+    name = None
+    requires_model_file = True
+    
+    TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+    
+    def load(self, model_path, config):
+        raise NotImplementedError
+    
+    def unload(self):
+        pass
+    
+    def generate(self, prompt, streaming=False, callback=None, **kwargs):
+        raise NotImplementedError
+    
+    def stream(self, prompt, callback=None, **kwargs):
+        """Yield the response token by token."""
+        return self.generate(prompt, streaming=True, callback=callback, **kwargs)
+    
+    def chat_session(self, system_prompt="", prompt_template="{0}"):
+        """Context manager keeping the conversation evaluated between generate calls."""
+        raise NotImplementedError
+    
+    def tokenize(self, text):
+        """Split text into tokens (an approximation unless the runtime exposes its tokenizer)."""
+        return self.TOKEN_PATTERN.findall(text)
+    
+    def count_tokens(self, text):
+        return len(self.tokenize(text))
+    
+    def embed(self, texts):
+        """Embed a string or a list of strings into vectors."""
+        raise NotImplementedError
+
+class GPT4AllBackend(InferenceBackend):
+    """Runs GGUF models through the gpt4all bindings."""
+    
+    name = "gpt4all"
+    
+    def __init__(self, embedding_model=None):
+        self.embedding_model = embedding_model
+        self.model = None
+        self.embedder = None
+    
+    def load(self, model_path, config):
+        # Imported here so other backends work without gpt4all installed
+        from gpt4all import GPT4All
+        self.unload()
+        self.model = GPT4All(
+            model_name=model_path.name,
+            model_path=str(model_path.parent),
+            model_type=config.get("type"),
+            allow_download=False,
+            n_ctx=config["context_length"]
+        )
+    
+    def unload(self):
+        if self.model is not None:
+            self.model.close()
+            self.model = None
+    
+    def generate(self, prompt, streaming=False, callback=None, **kwargs):
+        if callback is not None:
+            kwargs["callback"] = callback
+        return self.model.generate(prompt, streaming=streaming, **kwargs)
+    
+    def chat_session(self, system_prompt="", prompt_template="{0}"):
+        return self.model.chat_session(system_prompt=system_prompt, prompt_template=prompt_template)
+    
+    def embed(self, texts):
+        if self.embedder is None:
+            from gpt4all import Embed4All
+            self.embedder = Embed4All(self.embedding_model)
+        return self.embedder.embed(texts)
+
+class StubBackend(InferenceBackend):
+    """Deterministic in-process backend for tests, benchmarks and load tests.
+    
+    Replies are derived from a hash of the prompt, so the same prompt always
+    gets the same answer, or come from responder(prompt) if given. latency
+    is the delay before the first token, tokens_per_second paces the rest
+    and prompt_tokens_per_second simulates prompt evaluation (0 disables
+    each delay). In a chat session only the new turn is evaluated.
+    """
+    
+    name = "stub"
+    requires_model_file = False
+    
+    WORDS = [
+        "the", "model", "code", "function", "returns", "value", "this", "a",
+        "list", "data", "file", "result", "should", "can", "be", "used",
+        "to", "and", "of", "with", "in", "each", "call", "input"
+    ]
+    
+    def __init__(self, latency=0.0, tokens_per_second=0, prompt_tokens_per_second=0,
+                 load_time=0.0, response_tokens=32, embedding_size=64, responder=None):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.prompt_tokens_per_second = prompt_tokens_per_second
+        self.load_time = load_time
+        self.response_tokens = response_tokens
+        self.embedding_size = embedding_size
+        self.responder = responder
+        self.loaded = False
+        self.session = None  # system prompt still to evaluate, or "" once evaluated
+        self.prompts = []
+    
+    def load(self, model_path, config):
+        time.sleep(self.load_time)
+        self.loaded = True
+    
+    def unload(self):
+        self.loaded = False
+    
+    def respond(self, prompt):
+        """Return the full reply to prompt."""
+        if self.responder is not None:
+            return self.responder(prompt)
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        words = [self.WORDS[digest[i % len(digest)] % len(self.WORDS)]
+                 for i in range(self.response_tokens)]
+        return " ".join(words).capitalize() + "."
+    
+    def generate(self, prompt, streaming=False, callback=None, max_tokens=200, **kwargs):
+        self.prompts.append(prompt)
+        evaluated = prompt
+        if self.session:
+            evaluated = self.session + prompt
+            self.session = ""
+        self.evaluate(evaluated)
+        
+        pieces = re.findall(r"\S+\s*|\s+", self.respond(prompt))[:max_tokens]
+        tokens = self.stream_tokens(pieces, callback)
+        return tokens if streaming else "".join(tokens)
+    
+    def evaluate(self, prompt):
+        if self.prompt_tokens_per_second:
+            time.sleep(self.count_tokens(prompt) / self.prompt_tokens_per_second)
+        time.sleep(self.latency)
+    
+    def stream_tokens(self, pieces, callback):
+        for piece in pieces:
+            if self.tokens_per_second:
+                time.sleep(1 / self.tokens_per_second)
+            if callback is not None and callback(0, piece) is False:
+                return
+            yield piece
+    
+    @contextmanager
+    def chat_session(self, system_prompt="", prompt_template="{0}"):
+        self.session = system_prompt
+        try:
+            yield self
+        finally:
+            self.session = None
+    
+    def embed(self, texts):
+        """Hash tokens into a normalised bag-of-words vector."""
+        if isinstance(texts, str):
+            return self.embed_text(texts)
+        return [self.embed_text(text) for text in texts]
+    
+    def embed_text(self, text):
+        vector = [0.0] * self.embedding_size
+        for token in self.tokenize(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "little") % self.embedding_size
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+BACKENDS = {
+    GPT4AllBackend.name: GPT4AllBackend,
+    StubBackend.name: StubBackend
+}
+
+def create_backend(name="gpt4all", **options):
+    """Create a backend by name, passing options to its constructor."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {name}")
+    return BACKENDS[name](**options)
\ No newline at end of file
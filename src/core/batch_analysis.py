@@ -0,0 +1,227 @@
+"""Run AIFeatures over every source file of a project.
+
+Usage: python -m src.core.batch_analysis PROJECT [--output analysis.jsonl]
+           [--features analyze_code_structure generate_documentation suggest_tests]
+           [--workers 2] [--backend stub]
+"""
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+import argparse
+import json
+import threading
+import time
+from .code_index import CodeIndex
+
+LANGUAGES = {
+    ".py": "Python", ".js": "JavaScript", ".jsx": "JavaScript", ".ts": "TypeScript",
+    ".tsx": "TypeScript", ".java": "Java", ".c": "C", ".h": "C", ".cpp": "C++", ".hpp": "C++",
+    ".cs": "C#", ".go": "Go", ".rs": "Rust", ".rb": "Ruby", ".php": "PHP", ".sh": "Shell"
+}
+
+# Features taking (code, language)
+BATCH_FEATURES = [
+    "analyze_code_structure", "suggest_improvements", "generate_documentation",
+    "explain_code", "suggest_tests", "refactor_code", "optimize_code"
+]
+
+DEFAULT_FEATURES = ["analyze_code_structure", "generate_documentation", "suggest_tests"]
+
+class BatchAnalyzer:
+    """Schedules AIFeatures jobs for a project and streams results to JSON Lines.
+    
+    One job is one feature for one file. Jobs run on a pool of worker
+    threads, with at most 2 * workers submitted at a time, and each result
+    is appended to output_path as soon as it completes. The output doubles
+    as the checkpoint: a (path, hash, feature) already recorded as ok is
+    skipped, so an interrupted run resumes where it stopped and a re-run
+    only analyses files whose content hash changed.
+    """
+    
+    def __init__(self, ai_features, root, output_path, features=None, workers=2,
+                 code_index=None, max_file_chars=12000, count_tokens=None):
+        unknown = set(features or []) - set(BATCH_FEATURES)
+        if unknown:
+            raise ValueError(f"Unsupported batch features: {', '.join(sorted(unknown))}")
+        self.ai_features = ai_features
+        self.root = Path(root).resolve()
+        self.output_path = Path(output_path)
+        self.features = list(features or DEFAULT_FEATURES)
+        self.workers = workers
+        self.code_index = code_index or CodeIndex(self.root)
+        self.max_file_chars = max_file_chars
+        self.count_tokens = count_tokens or ai_features.count_tokens
+        self.stop_event = threading.Event()
+        self.stats = {}
+    
+    def stop(self):
+        """Finish the running jobs and stop scheduling new ones."""
+        self.stop_event.set()
+    
+    def completed_jobs(self):
+        """(path, hash, feature) of jobs recorded as ok in the output."""
+        done = set()
+        try:
+            with open(self.output_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn by an interrupted run
+                    if record.get("status") == "ok":
+                        done.add((record["path"], record["hash"], record["feature"]))
+        except OSError:
+            pass
+        return done
+    
+    def plan(self):
+        """Return the jobs still to run as (relative path, hash, feature, language)."""
+        self.code_index.build()
+        done = self.completed_jobs()
+        jobs = []
+        skipped = 0
+        with self.code_index.lock:
+            files = sorted((relative, entry["hash"], entry["size"]) for relative, entry in self.code_index.files.items())
+        for relative, digest, size in files:
+            language = LANGUAGES.get(Path(relative).suffix.lower())
+            if language is None:
+                continue
+            if size > self.max_file_chars * 4:
+                skipped += len(self.features)
+                continue
+            for feature in self.features:
+                if (relative, digest, feature) in done:
+                    skipped += 1
+                else:
+                    jobs.append((relative, digest, feature, language))
+        self.stats["skipped"] = skipped
+        return jobs
+    
+    def run_job(self, relative, digest, feature, language):
+        start = time.perf_counter()
+        record = {"path": relative, "hash": digest, "feature": feature, "language": language}
+        try:
+            with open(self.root / relative, 'r', encoding='utf-8') as f:
+                code = f.read()
+            if len(code) > self.max_file_chars:
+                raise ValueError(f"File is longer than {self.max_file_chars} characters")
+            response = getattr(self.ai_features, feature)(code, language)
+            if isinstance(response, dict) and "error" in response:
+                raise ValueError(response["error"])  # structured output that never validated
+            text = response if isinstance(response, str) else json.dumps(response)
+            record.update(status="ok", response=response, tokens=self.count_tokens(text))
+        except Exception as e:
+            record.update(status="error", error=str(e), tokens=0)
+        record["seconds"] = round(time.perf_counter() - start, 3)
+        return record
+    
+    def run(self, on_result=None):
+        """Run every pending job and return the throughput report.
+        
+        Ctrl+C stops scheduling; running jobs still finish and are recorded.
+        """
+        jobs = self.plan()
+        self.stats.update(jobs=len(jobs), completed=0, failed=0, tokens=0, files=0)
+        self.stop_event.clear()
+        files_done = set()
+        start = time.perf_counter()
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with open(self.output_path, 'a', encoding='utf-8') as output, \
+                ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch") as pool:
+            pending = set()
+            queue = iter(jobs)
+            while True:
+                # Keep the pool busy without queueing the whole project up front
+                while len(pending) < 2 * self.workers and not self.stop_event.is_set():
+                    job = next(queue, None)
+                    if job is None:
+                        break
+                    pending.add(pool.submit(self.run_job, *job))
+                if not pending:
+                    break
+                try:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                except KeyboardInterrupt:
+                    # Record the running jobs and leave the rest for a resumed run
+                    self.stop()
+                    continue
+                for future in finished:
+                    record = future.result()
+                    record["timestamp"] = time.time()
+                    output.write(json.dumps(record) + "\n")
+                    output.flush()
+                    if record["status"] == "ok":
+                        self.stats["completed"] += 1
+                        self.stats["tokens"] += record["tokens"]
+                        files_done.add(record["path"])
+                    else:
+                        self.stats["failed"] += 1
+                    if on_result is not None:
+                        on_result(record)
+        
+        self.stats["files"] = len(files_done)
+        return self.report(time.perf_counter() - start)
+    
+    def report(self, elapsed):
+        elapsed = max(elapsed, 1e-9)
+        return {
+            **self.stats,
+            "interrupted": self.stop_event.is_set(),
+            "seconds": round(elapsed, 3),
+            "files_per_minute": round(self.stats["files"] * 60 / elapsed, 2),
+            "jobs_per_minute": round((self.stats["completed"] + self.stats["failed"]) * 60 / elapsed, 2),
+            "tokens_per_second": round(self.stats["tokens"] / elapsed, 2),
+            # Parse, repair and failure rates of features answering in JSON
+            "structured": self.ai_features.structured_stats()
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("project", help="project directory to analyse")
+    parser.add_argument("--output", default="analysis.jsonl", help="JSON Lines results, also used to resume")
+    parser.add_argument("--features", nargs="+", default=DEFAULT_FEATURES, choices=BATCH_FEATURES)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--backend", help="inference backend, e.g. stub (default from config/model_settings.json)")
+    parser.add_argument("--max-file-chars", type=int, default=12000)
+    args = parser.parse_args(argv)
+    
+    # Imported here so --help works without loading Qt
+    from .backends import create_backend
+    from .model_manager import ModelManager
+    from .chat_manager import ChatManager
+    from .ai_features import AIFeatures
+    from .embedding_index import EmbeddingIndex
+    
+    model_manager = ModelManager(backend=create_backend(args.backend) if args.backend else None)
+    if not model_manager.is_model_available():
+        parser.error("The model is not downloaded; start the application once or use --backend stub")
+    ai_features = AIFeatures(ChatManager(model_manager))
+    analyzer = BatchAnalyzer(ai_features, args.project, args.output, features=args.features,
+                             workers=args.workers, max_file_chars=args.max_file_chars,
+                             count_tokens=model_manager.backend.count_tokens)
+    # Prompts include related project code, and similar chunks when retrieval is on
+    ai_features.code_index = analyzer.code_index
+    if model_manager.settings.get("retrieval"):
+        ai_features.embedding_index = EmbeddingIndex(analyzer.root, analyzer.code_index.index_dir / "embeddings",
+                                                     model_manager.embed)
+    
+    def on_result(record):
+        done = analyzer.stats["completed"] + analyzer.stats["failed"]
+        print(f"[{done}/{analyzer.stats['jobs']}] {record['path']} {record['feature']}: "
+              f"{record['status']} in {record['seconds']:.1f}s")
+    
+    try:
+        if ai_features.embedding_index is not None:
+            analyzer.code_index.build()
+            print(f"Embedded {ai_features.embedding_index.sync(analyzer.code_index)} changed files")
+        report = analyzer.run(on_result)
+    finally:
+        model_manager.shutdown()
+        if ai_features.embedding_index is not None:
+            ai_features.embedding_index.close()
+        analyzer.code_index.close()
+    report["routes"] = model_manager.router.stats()
+    print(json.dumps(report, indent=4))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,177 @@
+from pathlib import Path
+from collections import OrderedDict
+import hashlib
+import os
+import struct
+import threading
+import zlib
+
+class BlobStore:
+    """Content-addressed object store with zlib compression and delta encoding.
+    
+    Objects are named by the BLAKE2 hash of their content. A new version
+    stored with a base is kept as a delta when that is smaller: the prefix
+    and suffix it shares with the base plus the compressed bytes between
+    them, which is compact for the typical single-region edit. Delta chains
+    are capped at max_chain so reading a version never replays too many.
+    """
+    
+    FULL = b"F"
+    DELTA = b"D"
+    DELTA_HEADER = struct.Struct(">20sHQQ")  # base digest, chain depth, prefix, suffix
+    BLOCK_SIZE = 4096
+    
+    def __init__(self, directory, max_chain=32, compression_level=6, cache_size=8):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_chain = max_chain
+        self.compression_level = compression_level
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # digest: content, recently used versions
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def hash_content(content):
+        return hashlib.blake2b(content, digest_size=20).hexdigest()
+    
+    def object_path(self, digest):
+        return self.directory / digest[:2] / digest[2:]
+    
+    def exists(self, digest):
+        return self.object_path(digest).exists()
+    
+    def put(self, content, base=None, digest=None):
+        """Store content, as a delta against the base digest if given, and return its digest."""
+        digest = digest or self.hash_content(content)
+        with self.lock:
+            if not self.exists(digest):
+                self.write_object(digest, self.encode(content, base))
+            self.remember(digest, content)
+        return digest
+    
+    def get(self, digest):
+        """Return the content for digest, or None if it is not stored."""
+        with self.lock:
+            return self.read(digest)
+    
+    def encode(self, content, base):
+        base_content = self.read(base) if base else None
+        depth = self.chain_depth(base) + 1 if base_content is not None else 0
+        if base_content is None or depth > self.max_chain:
+            return self.FULL + zlib.compress(content, self.compression_level)
+        
+        prefix = matching_length(content, base_content)
+        limit = min(len(content), len(base_content)) - prefix
+        suffix = matching_length(content, base_content, reverse=True, limit=limit)
+        middle = content[prefix:len(content) - suffix]
+        delta = (self.DELTA + self.DELTA_HEADER.pack(bytes.fromhex(base), depth, prefix, suffix)
+                 + zlib.compress(middle, self.compression_level))
+        # Only compress the whole content when the delta is not clearly smaller
+        if len(delta) < len(content) // 16:
+            return delta
+        full = self.FULL + zlib.compress(content, self.compression_level)
+        return delta if len(delta) < len(full) else full
+    
+    def read(self, digest):
+        if digest in self.cache:
+            self.cache.move_to_end(digest)
+            return self.cache[digest]
+        
+        # Walk back to the nearest full (or cached) object, then apply deltas forwards
+        chain = []
+        content = None
+        current = digest
+        while content is None:
+            data = self.read_object(current)
+            if data is None:
+                return None
+            if data[:1] == self.FULL:
+                content = zlib.decompress(data[1:])
+            else:
+                base, _, prefix, suffix = self.DELTA_HEADER.unpack_from(data, 1)
+                chain.append((prefix, suffix, data[1 + self.DELTA_HEADER.size:]))
+                current = base.hex()
+                content = self.cache.get(current)
+        for prefix, suffix, middle in reversed(chain):
+            content = content[:prefix] + zlib.decompress(middle) + content[len(content) - suffix:]
+        
+        self.remember(digest, content)
+        return content
+    
+    def chain_depth(self, digest):
+        data = self.read_object(digest, header_only=True)
+        if not data or data[:1] == self.FULL:
+            return 0
+        return self.DELTA_HEADER.unpack_from(data, 1)[1]
+    
+    def base_of(self, digest):
+        data = self.read_object(digest, header_only=True)
+        if not data or data[:1] == self.FULL:
+            return None
+        return self.DELTA_HEADER.unpack_from(data, 1)[0].hex()
+    
+    def remember(self, digest, content):
+        self.cache[digest] = content
+        self.cache.move_to_end(digest)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+    
+    def read_object(self, digest, header_only=False):
+        try:
+            with open(self.object_path(digest), 'rb') as f:
+                return f.read(1 + self.DELTA_HEADER.size) if header_only else f.read()
+        except OSError:
+            return None
+    
+    def write_object(self, digest, data):
+        path = self.object_path(digest)
+        path.parent.mkdir(exist_ok=True)
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    
+    def collect_garbage(self, live):
+        """Delete objects that neither a live digest nor its delta chain needs."""
+        with self.lock:
+            keep = set()
+            for digest in live:
+                while digest and digest not in keep:
+                    keep.add(digest)
+                    digest = self.base_of(digest)
+            for path in self.directory.glob("*/*"):
+                if path.parent.name + path.name not in keep:
+                    path.unlink()
+            for digest in list(self.cache):
+                if digest not in keep:
+                    del self.cache[digest]
+    
+    def disk_usage(self):
+        return sum(path.stat().st_size for path in self.directory.glob("*/*"))
+
+def matching_length(a, b, reverse=False, limit=None):
+    """Length of the common prefix (or suffix) of two byte strings.
+    
+    Compares blocks at C speed, doubling the block after each match and
+    halving it after a mismatch, so long runs take few comparisons.
+    """
+    if limit is None:
+        limit = min(len(a), len(b))
+    # Slicing bytes copies, but the comparison is then a single memcmp
+    def same(start, end):
+        if reverse:
+            return a[len(a) - end:len(a) - start] == b[len(b) - end:len(b) - start]
+        return a[start:end] == b[start:end]
+    
+    matched = 0
+    block = BlobStore.BLOCK_SIZE
+    while matched < limit:
+        end = min(matched + block, limit)
+        if same(matched, end):
+            matched = end
+            block *= 2
+        elif end - matched == 1:
+            break
+        else:
+            block = max(1, (end - matched) // 2)
+    return matched
\ No newline at end of file
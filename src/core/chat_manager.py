@@ -1,27 +1,247 @@
 from PyQt6.QtCore import QObject, pyqtSignal
+from pathlib import Path
+import json
+from .conversation import ConversationBuffer, ChatSession
+from .generation_worker import RequestCancelled
 
 class ChatManager(QObject):
     """Manages chat interactions with the AI model."""
     
     message_received = pyqtSignal(str, str)  # role, content
+    response_started = pyqtSignal(int)  # request id
+    response_chunk = pyqtSignal(int, str)  # request id, token text
+    response_finished = pyqtSignal(int, str)  # request id, full response
+    response_failed = pyqtSignal(int, str)  # request id, error message
+    response_cancelled = pyqtSignal(int)  # request id
+    cached_answer_offered = pyqtSignal(int, str, float)  # request id, answer, similarity
     
-    def __init__(self, model_manager):
+    def __init__(self, model_manager, plugin_manager=None, store=None, semantic_cache=None):
         super().__init__()
         self.model_manager = model_manager
-        self.history = []
+        # Enabled plugins can rewrite chat messages and responses
+        self.plugin_manager = plugin_manager
+        # Conversations are persisted to a ChatStore when one is given
+        self.store = store
+        self.conversation = None
+        # Near-duplicate opening questions are answered from a SemanticCache when one is
+        # given; with offer_cached_answers the answer is offered while generation goes ahead
+        self.semantic_cache = semantic_cache
+        self.offer_cached_answers = False
+        self.offered_answers = {}  # request id: cached answer
+        
+        # History is rendered into each prompt within the model's context window
+        # Sized for the saved default model, which the worker loads first
+        model_config = self.model_manager.registry.get(self.model_manager.registry.default_model)
+        self.history = ConversationBuffer(
+            context_length=model_config["context_length"],
+            system_prompt=self.load_system_prompt(),
+            prompt_template=model_config.get("prompt_template", "{0}")
+        )
+        # Keeps the conversation evaluated in the model so turns are not re-processed
+        self.session = ChatSession(self.history)
+        self.pending_requests = {}  # request id: GenerationRequest of a chat message
+        if self.store is not None:
+            self.restore_history()
+        
+        # Generation happens on the model manager's worker thread
+        worker = self.model_manager.worker
+        worker.request_started.connect(self.response_started)
+        worker.token_generated.connect(self.response_chunk)
+        worker.request_completed.connect(self.on_request_completed)
+        worker.request_failed.connect(self.on_request_failed)
+        worker.request_cancelled.connect(self.on_request_cancelled)
+    
+    def load_system_prompt(self, name="default"):
+        """Load a system prompt from config/prompts.json."""
+        prompts_file = Path("config/prompts.json")
+        if not prompts_file.exists():
+            return ""
+        with open(prompts_file, 'r') as f:
+            return json.load(f).get(name, {}).get("system", "")
+    
+    def restore_history(self):
+        """Continue the latest stored conversation, reading only what the history can hold."""
+        self.conversation = self.store.latest_conversation()
+        if self.conversation is None:
+            self.conversation = self.store.new_conversation()
+            return
+        for message in self.store.page(self.conversation, limit=self.history.max_messages):
+            self.history.append(message["role"], message["content"])
+    
+    def on_model_switched(self, model_name):
+        """Fit the history to the new model's context window and prompt format."""
+        model_config = self.model_manager.registry.get(model_name)
+        self.history.context_length = model_config["context_length"]
+        self.history.prompt_template = model_config.get("prompt_template", "{0}")
+        self.history.set_token_counter(self.history.token_counter)  # recount in the new format
+    
+    def run_hook(self, hook, value, *args):
+        if self.plugin_manager is None:
+            return value
+        return self.plugin_manager.run_hook(hook, value, *args)
+    
+    def send_message(self, message):
+        """Queue a chat message for the AI model and return its request id."""
+        request = self.submit_chat(message, self.offer_cached_answers)
+        self.pending_requests[request.id] = request
+        return request.id
+    
+    def submit_chat(self, message, offer):
+        """Queue a chat message, running plugins and the semantic cache on the worker.
+        
+        The request's prompt becomes the message as rewritten by pre_chat
+        plugins, and its response the answer as rewritten by post_chat ones.
+        Only a conversation's opening question is cached, as a follow-up such
+        as "why?" means something else in every conversation.
+        """
+        use_cache = self.semantic_cache is not None and not len(self.history) and not self.pending_requests
+        
+        def prepare(request):
+            request.prompt = self.run_hook("pre_chat", request.prompt)
+            if use_cache:
+                self.answer_from_cache(request, offer)
+        
+        def finish(request, response):
+            if use_cache:
+                self.cache_answer(request, response)
+            return self.run_hook("post_chat", response, request.prompt)
+        
+        # Routed on the message as typed, as plugins only rewrite it on the worker
+        route, model = self.model_manager.route("chat", message)
+        return self.model_manager.submit(message, session=self.session, route=route, model=model,
+                                         prepare=prepare, finish=finish)
+    
+    def answer_from_cache(self, request, offer):
+        """Answer, or offer an answer to, a request from the semantic cache (called on the worker)."""
+        # Runs before the model loads, so it is named by the model that will run
+        model_name = self.model_manager.model_name_for(request.kwargs.get("model"))
+        try:
+            cached = self.semantic_cache.lookup(request.prompt, model_name)
+        except Exception as e:
+            print(f"Error looking up cached answer: {e}")
+            return
+        if cached is None:
+            return
+        if offer:
+            self.offered_answers[request.id] = cached["answer"]
+            self.cached_answer_offered.emit(request.id, cached["answer"], cached["similarity"])
+            return
+        # The model has not seen this turn, so the session replays the history next time
+        self.session.invalidate()
+        request.answer = cached["answer"]
+    
+    def cache_answer(self, request, response):
+        """Add a generated answer to the semantic cache (called on the worker)."""
+        if request.answer is not None or request.stopped_early:
+            return
+        model_name = self.model_manager.model_name_for(request.kwargs.get("model"))
+        try:
+            self.semantic_cache.put(request.prompt, response, model_name)
+        except Exception as e:
+            print(f"Error caching answer: {e}")
+    
+    def use_cached_answer(self, request_id):
+        """Stop generating a response and use the answer offered for it instead."""
+        answer = self.offered_answers.pop(request_id, None)
+        request = self.pending_requests.get(request_id)
+        if answer is None or request is None:
+            return
+        # The worker completes the request with the answer once generation stops
+        self.session.invalidate()
+        request.answer = answer
+        request.stopped_early = True
+    
+    def ask_about_code(self, question, code, context=""):
+        """Queue a question about a piece of code and return its request id.
+        
+        context is extra project code, such as format_snippets output, or a
+        callable returning it; a callable runs on the worker before the prompt
+        is generated, so retrieval that embeds text does not block the caller.
+        """
+        prompt = f"""Answer this question about the following code.
+
+Question: {question}
+
+Code:
+{code}"""
+        if callable(context):
+            # Routed on the question and code, as the context is not known yet
+            route, model = self.model_manager.route("ask_about_code", prompt)
+            
+            def build_prompt():
+                extra = context()
+                return f"{extra}\n\n{prompt}" if extra else prompt
+            
+            return self.model_manager.submit(build_prompt, route=route, model=model).id
+        if context:
+            prompt = f"{context}\n\n{prompt}"
+        route, model = self.model_manager.route("ask_about_code", prompt)
+        return self.model_manager.submit(prompt, route=route, model=model).id
+    
+    def cancel(self, request_id):
+        """Abort a queued or running request."""
+        self.model_manager.worker.cancel(request_id)
     
     def get_response(self, message):
-        """Get a response from the AI model."""
+        """Get a response from the AI model, blocking until it is complete."""
         try:
-            response = self.model_manager.get_response(message)
-            self.history.append(("user", message))
-            self.history.append(("assistant", response))
-            self.message_received.emit("assistant", response)
+            request = self.submit_chat(message, offer=False)
+            response = self.wait(request)
+            self.record_exchange(request.prompt, response)
             return response
         except Exception as e:
             print(f"Error getting response: {e}")
             return f"Error: {str(e)}"
     
+    def process_message(self, prompt, **kwargs):
+        """Run a one-off prompt outside the chat history and wait for the response.
+        
+        Raises RequestCancelled if the request is cancelled, so a partial
+        response is never mistaken for a complete one.
+        """
+        return self.wait(self.model_manager.submit(prompt, **kwargs))
+    
+    def wait(self, request):
+        """Wait for a request's response, raising if it was cancelled or failed."""
+        response = request.wait()
+        if request.cancelled:
+            raise RequestCancelled("Request cancelled")
+        if request.error:
+            raise RuntimeError(request.error)
+        return response
+    
+    def record_exchange(self, message, response):
+        """Add a completed exchange to the chat history."""
+        self.history.append("user", message)
+        self.history.append("assistant", response)
+        if self.store is not None:
+            self.store.append(self.conversation, "user", message)
+            self.store.append(self.conversation, "assistant", response)
+        self.message_received.emit("assistant", response)
+    
+    def on_request_completed(self, request_id, response):
+        request = self.pending_requests.pop(request_id, None)
+        self.offered_answers.pop(request_id, None)
+        if request is not None:
+            self.record_exchange(request.prompt, response)
+        self.response_finished.emit(request_id, response)
+    
+    def on_request_failed(self, request_id, error):
+        self.offered_answers.pop(request_id, None)
+        if self.pending_requests.pop(request_id, None) is not None:
+            self.session.invalidate()
+        self.response_failed.emit(request_id, error)
+    
+    def on_request_cancelled(self, request_id):
+        # The model has seen a turn that is not in the history
+        self.offered_answers.pop(request_id, None)
+        if self.pending_requests.pop(request_id, None) is not None:
+            self.session.invalidate()
+        self.response_cancelled.emit(request_id)
+    
     def clear_history(self):
-        """Clear chat history."""
-        self.history.clear()
\ No newline at end of file
+        """Clear chat history, starting a new stored conversation."""
+        self.history.clear()
+        self.session.invalidate()
+        if self.store is not None:
+            self.conversation = self.store.new_conversation()
\ No newline at end of file
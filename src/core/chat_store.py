@@ -0,0 +1,153 @@
+from pathlib import Path
+import queue
+import re
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    conversation INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_conversation ON messages (conversation, id);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(content, content='messages', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS messages_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+"""
+
+TERM_PATTERN = re.compile(r"\w+")
+
+def match_query(text, any_term=False):
+    """An FTS5 query for the words of text, quoted so user input is never syntax."""
+    terms = [f'"{term}"' for term in TERM_PATTERN.findall(text)]
+    return (" OR " if any_term else " ").join(terms)
+
+class ChatStore:
+    """Chat history persisted to SQLite, with full-text search.
+    
+    The database runs in WAL mode so reads never wait for the writer.
+    append() only queues a message; a background thread writes queued
+    messages in one transaction per batch_size messages or flush_interval
+    seconds. Messages are indexed with FTS5 and read back a page at a time.
+    """
+    
+    def __init__(self, path, batch_size=100, flush_interval=0.5):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.connection = self.connect(check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+        self.lock = threading.Lock()  # guards self.connection, used for reads
+        row = self.connection.execute("SELECT MAX(conversation) FROM messages").fetchone()
+        self.last_conversation = row[0]
+        
+        self.queue = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, name="chat-store", daemon=True)
+        self.writer.start()
+    
+    def connect(self, **kwargs):
+        connection = sqlite3.connect(self.path, **kwargs)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+    
+    def close(self):
+        """Write what is queued and close the database."""
+        self.queue.put(None)
+        self.writer.join()
+        with self.lock:
+            self.connection.close()
+    
+    # Writing
+    
+    def latest_conversation(self):
+        """Id of the newest conversation, or None if there is none."""
+        return self.last_conversation
+    
+    def new_conversation(self):
+        self.last_conversation = (self.last_conversation or 0) + 1
+        return self.last_conversation
+    
+    def append(self, conversation, role, content, timestamp=None):
+        """Queue a message to be written."""
+        self.queue.put((conversation, role, content, timestamp or time.time()))
+    
+    def flush(self):
+        """Wait until every queued message is written."""
+        self.queue.join()
+    
+    def write_loop(self):
+        connection = self.connect()
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            # Collect whatever else arrives within flush_interval into the same transaction
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            running = batch[-1] is not None
+            rows = [item for item in batch if item is not None]
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT INTO messages (conversation, role, content, timestamp) VALUES (?, ?, ?, ?)", rows)
+            except sqlite3.Error as e:
+                print(f"Error saving chat history: {e}")
+            for _ in batch:
+                self.queue.task_done()
+        connection.close()
+    
+    # Reading
+    
+    def query(self, sql, parameters=()):
+        with self.lock:
+            return [dict(row) for row in self.connection.execute(sql, parameters)]
+    
+    def count(self, conversation):
+        return self.query("SELECT COUNT(*) AS count FROM messages WHERE conversation = ?", (conversation,))[0]["count"]
+    
+    def page(self, conversation, before=None, limit=100):
+        """The limit messages before message id before (default the newest), oldest first."""
+        rows = self.query(
+            "SELECT id, role, content, timestamp FROM messages WHERE conversation = ? AND id < ? "
+            "ORDER BY id DESC LIMIT ?",
+            (conversation, before if before is not None else 2 ** 63 - 1, limit))
+        rows.reverse()
+        return rows
+    
+    def search(self, text, limit=20, role=None):
+        """Messages containing every word of text, best match first, with a highlighted snippet."""
+        query = match_query(text)
+        if not query:
+            return []
+        return self.query(
+            "SELECT m.id, m.conversation, m.role, m.content, m.timestamp, "
+            "snippet(messages_fts, 0, '[', ']', '...', 12) AS snippet "
+            "FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid "
+            "WHERE messages_fts MATCH ? AND (? IS NULL OR m.role = ?) ORDER BY rank LIMIT ?",
+            (query, role, role, limit))
+    
+    def find_answers(self, question, limit=5):
+        """Past answers to questions sharing words with question, as {"question", "answer", ...}."""
+        query = match_query(question, any_term=True)
+        if not query:
+            return []
+        return self.query(
+            "SELECT q.id, q.conversation, q.content AS question, a.content AS answer, a.timestamp "
+            "FROM messages_fts JOIN messages q ON q.id = messages_fts.rowid "
+            "JOIN messages a ON a.id = (SELECT MIN(id) FROM messages WHERE conversation = q.conversation AND id > q.id) "
+            "WHERE messages_fts MATCH ? AND q.role = 'user' AND a.role = 'assistant' ORDER BY rank LIMIT ?",
+            (query, limit))
\ No newline at end of file
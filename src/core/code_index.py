@@ -0,0 +1,375 @@
+from pathlib import Path
+import ast
+import hashlib
+import json
+import os
+import re
+import threading
+from .ignore_rules import IgnoreRules
+
+INDEXED_SUFFIXES = {
+    ".py", ".pyi", ".js", ".jsx", ".ts", ".tsx", ".java", ".c", ".h", ".cpp", ".hpp",
+    ".cs", ".go", ".rs", ".rb", ".php", ".sh", ".html", ".css", ".md", ".txt", ".rst",
+    ".json", ".toml", ".yaml", ".yml", ".ini", ".cfg", ".sql"
+}
+
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+def trigrams(text):
+    """Set of lowercase three-character substrings of text."""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def extract_symbols(source):
+    """List the classes, functions, methods and module-level names defined in Python source."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+    symbols = []
+    
+    def visit(body, scope, in_class):
+        for node in body:
+            if isinstance(node, ast.ClassDef):
+                kind = "class"
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                kind = "method" if in_class else "function"
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)) and not scope:
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name):
+                        symbols.append({"name": target.id, "qualname": target.id, "kind": "variable",
+                                        "line": node.lineno, "end_line": node.end_lineno})
+                continue
+            else:
+                continue
+            qualname = f"{scope}.{node.name}" if scope else node.name
+            symbols.append({"name": node.name, "qualname": qualname, "kind": kind,
+                            "line": node.lineno, "end_line": node.end_lineno})
+            visit(node.body, qualname, kind == "class")
+    
+    visit(tree.body, "", False)
+    return symbols
+
+def format_snippets(snippets):
+    """Render snippets from CodeIndex.related_snippets as a prompt section."""
+    if not snippets:
+        return ""
+    parts = ["Related code from the project:"]
+    for snippet in snippets:
+        label = f" ({snippet['name']})" if snippet.get("name") else ""
+        parts.append(f"# {snippet['path']}:{snippet['start']}-{snippet['end']}{label}\n{snippet['text']}")
+    return "\n\n".join(parts)
+
+def default_index_dir(root):
+    digest = hashlib.blake2b(str(root).encode("utf-8"), digest_size=8).hexdigest()
+    return Path("workspace") / "index" / digest
+
+class CodeIndex:
+    """Incremental on-disk index of a project's source files.
+    
+    For each text file the manifest keeps its mtime, size and hash, the
+    symbols ast finds in it (Python only) and its set of trigrams. Substring
+    search intersects the trigram posting lists of the query and then only
+    reads the few candidate files. build() re-reads files whose mtime or
+    size changed, and update() applies FileWatcher change batches. The index
+    is saved to index_dir at most once per save_interval.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, root, index_dir=None, ignore_rules=None, max_file_size=1024 * 1024, save_interval=5.0):
+        self.root = Path(root).resolve()
+        self.index_dir = Path(index_dir) if index_dir else default_index_dir(self.root)
+        self.index_path = self.index_dir / "index.json"
+        self.ignore_rules = ignore_rules or IgnoreRules(self.root)
+        self.max_file_size = max_file_size
+        self.save_interval = save_interval
+        
+        self.files = {}  # relative path: {"mtime_ns", "size", "hash", "symbols", "trigrams"}
+        self.postings = {}  # trigram: {relative path}
+        self.symbols = {}  # name: [symbol]
+        self.lock = threading.RLock()
+        self.dirty = False
+        self.save_timer = None
+        self.load()
+    
+    def load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != self.VERSION:
+            return
+        with self.lock:
+            for relative, entry in data["files"].items():
+                grams = entry["trigrams"]
+                entry["trigrams"] = {grams[i:i + 3] for i in range(0, len(grams), 3)}
+                self.add_entry(relative, entry)
+    
+    def save(self):
+        """Write the index to disk if it changed since the last save."""
+        with self.lock:
+            self.save_timer = None
+            if not self.dirty:
+                return
+            files = {relative: {**entry, "trigrams": "".join(sorted(entry["trigrams"]))}
+                     for relative, entry in self.files.items()}
+            self.dirty = False
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.index_path.with_suffix(".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.VERSION, "root": str(self.root), "files": files}, f)
+        os.replace(temp_path, self.index_path)
+    
+    def schedule_save(self):
+        with self.lock:
+            self.dirty = True
+            if self.save_timer is None:
+                self.save_timer = threading.Timer(self.save_interval, self.save)
+                self.save_timer.daemon = True
+                self.save_timer.start()
+    
+    def close(self):
+        with self.lock:
+            if self.save_timer is not None:
+                self.save_timer.cancel()
+        self.save()
+    
+    def relative(self, path):
+        """Path relative to the root as a posix string, or None if it is outside it."""
+        try:
+            return Path(os.path.abspath(path)).relative_to(self.root).as_posix()
+        except ValueError:
+            return None
+    
+    def absolute(self, relative):
+        return str(self.root / relative)
+    
+    def add_entry(self, relative, entry):
+        self.files[relative] = entry
+        for gram in entry["trigrams"]:
+            self.postings.setdefault(gram, set()).add(relative)
+        for symbol in entry["symbols"]:
+            self.symbols.setdefault(symbol["name"], []).append({**symbol, "path": relative})
+    
+    def remove_entry(self, relative):
+        entry = self.files.pop(relative, None)
+        if entry is None:
+            return
+        for gram in entry["trigrams"]:
+            paths = self.postings[gram]
+            paths.discard(relative)
+            if not paths:
+                del self.postings[gram]
+        for name in {symbol["name"] for symbol in entry["symbols"]}:
+            remaining = [s for s in self.symbols[name] if s["path"] != relative]
+            if remaining:
+                self.symbols[name] = remaining
+            else:
+                del self.symbols[name]
+    
+    # Building and updating
+    
+    def build(self):
+        """Bring the index up to date with the tree and return how many files were re-read."""
+        seen = set()
+        changed = self.index_tree(self.root, seen)
+        with self.lock:
+            for relative in [r for r in self.files if r not in seen]:
+                self.remove_entry(relative)
+                changed += 1
+        if changed:
+            self.schedule_save()
+        return changed
+    
+    def index_tree(self, directory, seen=None):
+        changed = 0
+        stack = [str(directory)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if self.ignore_rules.is_ignored_entry(current, entry.name, is_dir):
+                        continue
+                    if is_dir:
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        relative = self.relative(entry.path)
+                        if self.index_file(entry.path, entry.stat(follow_symlinks=False)) is not None:
+                            changed += 1
+                        if seen is not None and relative in self.files:
+                            seen.add(relative)
+                except OSError:
+                    continue
+        return changed
+    
+    def is_indexable(self, path, stat):
+        return Path(path).suffix.lower() in INDEXED_SUFFIXES and stat.st_size <= self.max_file_size
+    
+    def index_file(self, path, stat=None):
+        """(Re)index one file if it changed; return its entry, or None if nothing was done."""
+        relative = self.relative(path)
+        if relative is None:
+            return None
+        stat = stat or os.stat(path)
+        if not self.is_indexable(path, stat):
+            return self.remove_path(path)
+        entry = self.files.get(relative)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return None
+        
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.blake2b(content, digest_size=20).hexdigest()
+        if entry and entry["hash"] == digest:
+            # Touched but unchanged: only the manifest needs updating
+            entry["mtime_ns"] = stat.st_mtime_ns
+            self.schedule_save()
+            return None
+        try:
+            text = content.decode("utf-8")
+        except UnicodeDecodeError:
+            return self.remove_path(path)
+        
+        new_entry = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": digest,
+            "symbols": extract_symbols(text) if relative.endswith((".py", ".pyi")) else [],
+            "trigrams": trigrams(text)
+        }
+        with self.lock:
+            self.remove_entry(relative)
+            self.add_entry(relative, new_entry)
+        self.schedule_save()
+        return new_entry
+    
+    def remove_path(self, path):
+        """Drop a file, or everything below a directory, from the index."""
+        relative = self.relative(path)
+        if relative is None:
+            return None
+        prefix = relative + "/"
+        with self.lock:
+            removed = [r for r in self.files if r == relative or r.startswith(prefix)]
+            for r in removed:
+                self.remove_entry(r)
+        if removed:
+            self.schedule_save()
+        return None
+    
+    def update(self, changes):
+        """Apply a batch of (change, path) events from FileWatcher or FileManager."""
+        for change, path in changes:
+            relative = self.relative(path)
+            if relative is None or self.ignore_rules.is_ignored(self.root / relative):
+                continue
+            try:
+                if os.path.isdir(path):
+                    self.index_tree(path)
+                elif os.path.isfile(path):
+                    self.index_file(path)
+                else:
+                    self.remove_path(path)
+            except OSError:
+                self.remove_path(path)
+    
+    # Queries
+    
+    def paths(self):
+        """Absolute paths of all indexed files."""
+        with self.lock:
+            return [self.absolute(relative) for relative in sorted(self.files)]
+    
+    def find_symbols(self, name, kind=None, prefix=False, limit=50):
+        """Symbols named name (or starting with it), with absolute paths."""
+        with self.lock:
+            if prefix:
+                lowered = name.lower()
+                matches = [s for key in sorted(self.symbols) if key.lower().startswith(lowered)
+                           for s in self.symbols[key]]
+            else:
+                matches = list(self.symbols.get(name, []))
+        if kind is not None:
+            matches = [s for s in matches if s["kind"] == kind]
+        return [{**s, "path": self.absolute(s["path"])} for s in matches[:limit]]
+    
+    def candidates(self, text):
+        """Files that contain every trigram of text, so may contain text itself."""
+        grams = trigrams(text)
+        with self.lock:
+            if not grams:
+                return sorted(self.files)
+            postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+            result = set(postings[0])
+            for paths in postings[1:]:
+                result &= paths
+                if not result:
+                    break
+            return sorted(result)
+    
+    def search(self, text, limit=50, case_sensitive=False):
+        """Lines containing text as {"path", "line", "text"}, in path order."""
+        if not text:
+            return []
+        needle = text if case_sensitive else text.lower()
+        results = []
+        for relative in self.candidates(text):
+            try:
+                with open(self.root / relative, 'r', encoding='utf-8') as f:
+                    for number, line in enumerate(f, 1):
+                        if needle in (line if case_sensitive else line.lower()):
+                            results.append({"path": self.absolute(relative), "line": number,
+                                            "text": line.rstrip("\n")})
+                            if len(results) >= limit:
+                                return results
+            except (OSError, UnicodeDecodeError):
+                continue
+        return results
+    
+    def snippet(self, path, start, end):
+        """Lines start to end (1-based, inclusive) of a file."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except (OSError, UnicodeDecodeError):
+            return ""
+        return "\n".join(lines[start - 1:end])
+    
+    def related_snippets(self, code, limit=5, max_lines=40, exclude=None):
+        """Definitions from elsewhere in the project of names that code uses.
+        
+        Names are ranked by how often code mentions them. Names that code
+        defines itself, and symbols in the file exclude (usually the one code
+        came from), are skipped.
+        """
+        exclude = self.relative(exclude) if exclude else None
+        defined = {symbol["name"] for symbol in extract_symbols(code)}
+        counts = {}
+        for name in IDENTIFIER_PATTERN.findall(code):
+            if name not in defined:
+                counts[name] = counts.get(name, 0) + 1
+        
+        snippets = []
+        with self.lock:
+            ranked = sorted((name for name in counts if name in self.symbols), key=lambda n: -counts[n])
+        for name in ranked:
+            for symbol in self.symbols.get(name, []):
+                if symbol["kind"] == "variable" or symbol["path"] == exclude:
+                    continue
+                symbol = {**symbol, "path": self.absolute(symbol["path"])}
+                end = min(symbol["end_line"], symbol["line"] + max_lines - 1)
+                snippets.append({"path": symbol["path"], "name": symbol["qualname"], "start": symbol["line"],
+                                 "end": end, "text": self.snippet(symbol["path"], symbol["line"], end)})
+                break
+            if len(snippets) >= limit:
+                break
+        return snippets
\ No newline at end of file
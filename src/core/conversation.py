@@ -0,0 +1,174 @@
+def estimate_tokens(text):
+    """Token count without a tokenizer: roughly four characters per token for English text and code."""
+    return len(text) // 4 + 1
+
+class ConversationBuffer:
+    """Chat history that renders into prompts within the model's context window.
+    
+    Token counts are computed once per message and cached. When the history
+    no longer fits, the oldest turns are dropped and replaced by a short
+    summary line.
+    """
+    
+    def __init__(self, context_length=2048, response_tokens=200, system_prompt="",
+                 prompt_template="{0}", token_counter=None, summarizer=None, max_messages=1000):
+        self.context_length = context_length
+        self.response_tokens = response_tokens
+        self.system_prompt = system_prompt
+        self.prompt_template = prompt_template
+        self.token_counter = token_counter
+        self.summarizer = summarizer or summarize_turns
+        self.max_messages = max_messages
+        self.messages = []  # [role, content, token count]
+    
+    def __iter__(self):
+        return ((role, content) for role, content, _ in self.messages)
+    
+    def __len__(self):
+        return len(self.messages)
+    
+    def append(self, role, content):
+        self.messages.append([role, content, self.count_tokens(self.format_message(role, content))])
+        # Turns this old can never fit the context window again
+        if len(self.messages) > self.max_messages:
+            del self.messages[:len(self.messages) - self.max_messages]
+    
+    def clear(self):
+        self.messages.clear()
+    
+    def set_token_counter(self, token_counter):
+        """Switch tokenizers (e.g. on model change) and recount lazily."""
+        self.token_counter = token_counter
+        for message in self.messages:
+            message[2] = None
+    
+    def count_tokens(self, text):
+        if self.token_counter:
+            return self.token_counter(text)
+        return estimate_tokens(text)
+    
+    def message_tokens(self, message):
+        if message[2] is None:
+            message[2] = self.count_tokens(self.format_message(message[0], message[1]))
+        return message[2]
+    
+    def format_message(self, role, content):
+        if role == "user":
+            return self.prompt_template.format(content)
+        return f" {content}\n"
+    
+    def budget(self):
+        """Tokens available for system prompt, history and the new message."""
+        return self.context_length - self.response_tokens
+    
+    def render(self, message):
+        """Build a prompt for message that includes as much recent history as fits."""
+        new_turn = self.format_message("user", message)
+        return self.render_history(self.count_tokens(new_turn)) + new_turn
+    
+    def render_history(self, reserve_tokens=0):
+        """Render the system prompt and recent history, leaving reserve_tokens free."""
+        available = self.budget() - reserve_tokens
+        if self.system_prompt:
+            available -= self.count_tokens(self.system_prompt + "\n")
+        
+        # Reserve room for a summary only when the whole history won't fit
+        history_tokens = sum(self.message_tokens(stored) for stored in self.messages)
+        reserved = self.budget() // 8 if history_tokens > available else 0
+        available -= reserved
+        
+        # Keep the newest messages that fit, walking backwards
+        kept = 0
+        for stored in reversed(self.messages):
+            tokens = self.message_tokens(stored)
+            if tokens > available:
+                break
+            available -= tokens
+            kept += 1
+        start = len(self.messages) - kept
+        
+        # Replace older turns with a summary in the reserved space
+        parts = [self.system_prompt + "\n"] if self.system_prompt else []
+        if start:
+            dropped = [(role, content) for role, content, _ in self.messages[:start]]
+            summary = self.summarizer(dropped, self.count_tokens, max(0, reserved + available))
+            if summary:
+                parts.append(summary + "\n")
+        
+        parts.extend(self.format_message(role, content) for role, content, _ in self.messages[start:])
+        return "".join(parts)
+
+class ChatSession:
+    """A conversation kept evaluated in the model's context between turns.
+    
+    The session holds a GPT4All chat_session open, so each turn only
+    evaluates the new message. When the session is not resident in the
+    model (first turn, the model changed, another prompt ran in between or
+    it was invalidated) it is reopened with the bounded history replayed as
+    the system prompt.
+    """
+    
+    def __init__(self, history):
+        self.history = history
+        self.model = None
+        self.context = None  # open chat_session context manager
+        self.tokens = 0  # estimated tokens held in the model's context
+        self.stale = False
+    
+    def is_open(self, model):
+        return self.context is not None and self.model is model and not self.stale
+    
+    def invalidate(self):
+        """Discard the evaluated context before the next turn."""
+        self.stale = True
+    
+    def open(self, model, reserve_tokens):
+        self.close()
+        replay = self.history.render_history(reserve_tokens)
+        self.context = model.chat_session(system_prompt=replay, prompt_template=self.history.prompt_template)
+        self.context.__enter__()
+        self.model = model
+        self.tokens = self.history.count_tokens(replay)
+        self.stale = False
+    
+    def close(self):
+        if self.context is not None:
+            context, self.context, self.model = self.context, None, None
+            context.__exit__(None, None, None)
+    
+    def stream(self, model, message, **kwargs):
+        """Yield the model's reply to message, evaluating only the new turn when possible."""
+        turn_tokens = self.count_turn(message)
+        if not self.is_open(model) or self.tokens + turn_tokens > self.history.budget():
+            self.open(model, turn_tokens)
+        self.tokens += turn_tokens
+        
+        response = []
+        try:
+            for token in model.generate(message, streaming=True, **kwargs):
+                response.append(token)
+                yield token
+        except Exception:
+            self.invalidate()
+            raise
+        self.tokens += self.history.count_tokens("".join(response))
+    
+    def count_turn(self, message):
+        return self.history.count_tokens(self.history.format_message("user", message))
+
+def summarize_turns(turns, count_tokens, max_tokens, max_chars=80):
+    """Summarise dropped turns by the opening of each, newest first within max_tokens."""
+    header = "Earlier in this conversation:"
+    lines = []
+    used = count_tokens(header)
+    for role, content in reversed(turns):
+        opening = " ".join(content.split())[:max_chars]
+        line = f"- {role}: {opening}"
+        tokens = count_tokens(line)
+        if used + tokens > max_tokens:
+            break
+        lines.insert(0, line)
+        used += tokens
+    if not lines:
+        return ""
+    return "\n".join([header] + lines)
\ No newline at end of file
@@ -0,0 +1,341 @@
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import os
+import threading
+import time
+import requests
+
+class DownloadCancelled(Exception):
+    """Raised when a download is cancelled by the user."""
+
+class SegmentedDownloader:
+    """Downloads a file over parallel HTTP Range requests.
+    
+    Data is written to "<file>.part" and progress is checkpointed to
+    "<file>.part.json", so an interrupted download resumes where it stopped.
+    Servers that ignore Range requests are downloaded in a single stream.
+    A SHA-256 of the file is computed while it is written.
+    """
+    
+    def __init__(self, url, dest_path, headers=None, segments=4,
+                 buffer_size=4 * 1024 * 1024, chunk_size=256 * 1024,
+                 progress_callback=None, progress_interval=0.5,
+                 retry_callback=None, max_retries=3, retry_delay=2, timeout=30):
+        self.url = url
+        self.dest_path = Path(dest_path)
+        self.part_path = self.dest_path.with_name(self.dest_path.name + ".part")
+        self.checkpoint_path = self.dest_path.with_name(self.dest_path.name + ".part.json")
+        self.headers = headers or {}
+        self.segment_count = max(1, segments)
+        self.buffer_size = buffer_size
+        self.chunk_size = chunk_size
+        self.progress_callback = progress_callback  # (downloaded, total, bytes/s)
+        self.progress_interval = progress_interval
+        self.retry_callback = retry_callback  # (attempt, max_retries)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        
+        self.total_size = 0
+        self.segments = []  # [{"start", "end", "downloaded"}], end inclusive
+        self.lock = threading.Lock()
+        self.running = threading.Event()  # cleared while paused
+        self.running.set()
+        self.cancelled = False
+        self.aborted = False
+        
+        self.bandwidth_limit = 0  # bytes/s, 0 means unlimited
+        self.bandwidth_allowance = 0
+        self.bandwidth_time = time.monotonic()
+        
+        self.start_time = time.monotonic()
+        self.start_downloaded = 0
+        self.last_progress = 0
+        
+        # Hash of the contiguous prefix written so far
+        self.hasher = hashlib.sha256()
+        self.hashed = 0
+        self.hash_lock = threading.Lock()
+        # Segment threads save the checkpoint through the same temp file, one at a time
+        self.checkpoint_lock = threading.Lock()
+        self.sha256 = None
+    
+    def pause(self):
+        self.running.clear()
+    
+    def resume(self):
+        self.running.set()
+    
+    def cancel(self):
+        self.cancelled = True
+        self.running.set()
+    
+    def is_paused(self):
+        return not self.running.is_set()
+    
+    def set_bandwidth_limit(self, bytes_per_second):
+        """Limit the combined speed of all segments (0 for unlimited)."""
+        with self.lock:
+            self.bandwidth_limit = max(0, int(bytes_per_second))
+            self.bandwidth_allowance = 0
+            self.bandwidth_time = time.monotonic()
+    
+    @property
+    def downloaded(self):
+        return sum(segment["downloaded"] for segment in self.segments)
+    
+    def run(self):
+        """Download the file, blocking until it is complete, and return its path."""
+        session = requests.Session()
+        session.headers.update(self.headers)
+        try:
+            supports_ranges = self.prepare(session)
+            self.start_time = time.monotonic()
+            self.start_downloaded = self.downloaded
+            self.advance_hash()  # hash whatever a resumed download already has
+            
+            pending = [s for s in self.segments if not self.segment_done(s)]
+            errors = []
+            if pending:
+                with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+                    futures = [pool.submit(self.download_segment, session, segment, supports_ranges)
+                               for segment in pending]
+                    for future in futures:
+                        try:
+                            future.result()
+                        except Exception as e:
+                            # Stop the other segments; their progress is kept
+                            self.aborted = True
+                            self.running.set()
+                            errors.append(e)
+        finally:
+            session.close()
+        
+        if self.cancelled:
+            self.discard()
+            raise DownloadCancelled("Download cancelled")
+        self.save_checkpoint()
+        if errors:
+            raise errors[0]
+        
+        if self.downloaded != self.total_size:
+            raise ValueError(f"Downloaded {self.downloaded} of {self.total_size} bytes")
+        
+        self.report_progress(force=True)
+        self.advance_hash()
+        self.sha256 = self.hasher.hexdigest()
+        os.replace(self.part_path, self.dest_path)
+        self.checkpoint_path.unlink(missing_ok=True)
+        return self.dest_path
+    
+    def prepare(self, session):
+        """Find the file size and either resume from the checkpoint or plan segments."""
+        total_size, supports_ranges = self.probe(session)
+        self.total_size = total_size
+        
+        checkpoint = self.load_checkpoint()
+        if (supports_ranges and checkpoint and self.part_path.exists()
+                and checkpoint.get("url") == self.url
+                and checkpoint.get("total_size") == total_size):
+            self.segments = checkpoint["segments"]
+            return supports_ranges
+        
+        # Start over with a preallocated (sparse) part file
+        count = self.segment_count if supports_ranges and total_size else 1
+        size = max(1, -(-total_size // count)) if total_size else 0
+        self.segments = [
+            {"start": start, "end": min(start + size, total_size) - 1, "downloaded": 0}
+            for start in range(0, total_size, size)
+        ] if total_size else [{"start": 0, "end": -1, "downloaded": 0}]
+        with open(self.part_path, 'wb') as f:
+            f.truncate(total_size)
+        self.save_checkpoint()
+        return supports_ranges
+    
+    def probe(self, session):
+        """Return (total size, whether the server honours Range requests)."""
+        response = session.get(self.url, headers={"Range": "bytes=0-0"},
+                               stream=True, timeout=self.timeout)
+        try:
+            response.raise_for_status()
+            content_range = response.headers.get("Content-Range", "")
+            if response.status_code == 206 and "/" in content_range:
+                total = content_range.rsplit("/", 1)[1]
+                if total.isdigit():
+                    return int(total), True
+            return int(response.headers.get("Content-Length", 0)), False
+        finally:
+            response.close()
+    
+    def segment_length(self, segment):
+        return segment["end"] - segment["start"] + 1
+    
+    def segment_done(self, segment):
+        # A segment with an unknown end (no Content-Length) is never done up front
+        return segment["end"] >= segment["start"] and segment["downloaded"] >= self.segment_length(segment)
+    
+    def download_segment(self, session, segment, supports_ranges):
+        """Download one segment, retrying from its last checkpointed byte."""
+        attempt = 0
+        while True:
+            try:
+                self.fetch_segment(session, segment, supports_ranges)
+                return
+            except (requests.RequestException, OSError) as e:
+                if self.cancelled or self.aborted:
+                    return
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                print(f"Download segment failed ({e}), retrying...")
+                if self.retry_callback:
+                    self.retry_callback(attempt, self.max_retries)
+                time.sleep(min(self.retry_delay * 2 ** (attempt - 1), 30))
+                if not supports_ranges:
+                    segment["downloaded"] = 0
+    
+    def fetch_segment(self, session, segment, supports_ranges):
+        offset = segment["start"] + segment["downloaded"]
+        headers = {}
+        if supports_ranges:
+            headers["Range"] = f"bytes={offset}-{segment['end']}"
+        
+        response = session.get(self.url, headers=headers, stream=True, timeout=self.timeout)
+        with response:
+            response.raise_for_status()
+            buffer = bytearray()
+            # Unbuffered: our own buffer batches writes, and a checkpoint must
+            # never count bytes still sitting in a file object's buffer
+            with open(self.part_path, 'r+b', buffering=0) as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if not self.running.is_set():
+                        self.running.wait()
+                    if self.cancelled or self.aborted:
+                        break
+                    if not chunk:
+                        continue
+                    self.throttle(len(chunk))
+                    buffer += chunk
+                    if len(buffer) >= self.buffer_size:
+                        offset = self.flush(f, segment, offset, buffer)
+                        buffer = bytearray()
+                offset = self.flush(f, segment, offset, buffer)
+        
+        if self.cancelled or self.aborted:
+            return
+        if segment["end"] < segment["start"]:
+            # Unknown size: whatever the server sent is the whole file
+            segment["end"] = offset - 1
+            self.total_size = offset
+        elif not self.segment_done(segment):
+            raise requests.ConnectionError(f"Connection closed at byte {offset}")
+    
+    def flush(self, f, segment, offset, buffer):
+        """Write buffered bytes at the segment's offset and record the progress."""
+        if not buffer:
+            return offset
+        f.seek(offset)
+        view = memoryview(buffer)
+        while view:
+            view = view[f.write(view):]
+        with self.lock:
+            segment["downloaded"] += len(buffer)
+        self.advance_hash(offset, buffer)
+        self.report_progress()
+        return offset + len(buffer)
+    
+    def contiguous_size(self):
+        """Number of bytes written without gaps from the start of the file."""
+        size = 0
+        with self.lock:
+            for segment in self.segments:
+                size = segment["start"] + segment["downloaded"]
+                if not self.segment_done(segment):
+                    break
+        return size
+    
+    def advance_hash(self, offset=None, buffer=None):
+        """Feed newly contiguous bytes to the hasher.
+        
+        The buffer just written is hashed from memory when it continues the
+        hashed prefix; bytes that segments further ahead wrote earlier are
+        read back from the part file once the gap before them closes.
+        """
+        with self.hash_lock:
+            if buffer is not None and offset == self.hashed:
+                self.hasher.update(buffer)
+                self.hashed += len(buffer)
+            
+            frontier = self.contiguous_size()
+            if self.hashed >= frontier:
+                return
+            with open(self.part_path, 'rb') as f:
+                f.seek(self.hashed)
+                while self.hashed < frontier:
+                    chunk = f.read(min(self.buffer_size, frontier - self.hashed))
+                    if not chunk:
+                        break
+                    self.hasher.update(chunk)
+                    self.hashed += len(chunk)
+    
+    def throttle(self, size):
+        """Sleep as needed to keep all segments under the bandwidth limit."""
+        while True:
+            with self.lock:
+                if not self.bandwidth_limit:
+                    return
+                now = time.monotonic()
+                self.bandwidth_allowance = min(
+                    self.bandwidth_limit,
+                    self.bandwidth_allowance + (now - self.bandwidth_time) * self.bandwidth_limit
+                )
+                self.bandwidth_time = now
+                if self.bandwidth_allowance >= size or size > self.bandwidth_limit:
+                    self.bandwidth_allowance -= size
+                    return
+                wait = (size - self.bandwidth_allowance) / self.bandwidth_limit
+            time.sleep(wait)
+    
+    def report_progress(self, force=False):
+        """Report progress and checkpoint, at most once per progress interval."""
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.last_progress < self.progress_interval:
+                return
+            self.last_progress = now
+            downloaded = self.downloaded
+        
+        self.save_checkpoint()
+        if self.progress_callback:
+            elapsed = max(now - self.start_time, 1e-6)
+            speed = (downloaded - self.start_downloaded) / elapsed
+            self.progress_callback(downloaded, self.total_size, speed)
+    
+    def load_checkpoint(self):
+        if not self.checkpoint_path.exists():
+            return None
+        try:
+            with open(self.checkpoint_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def save_checkpoint(self):
+        with self.checkpoint_lock:
+            with self.lock:
+                data = {
+                    "url": self.url,
+                    "total_size": self.total_size,
+                    "segments": [dict(segment) for segment in self.segments]
+                }
+            temp_path = self.checkpoint_path.with_suffix(".tmp")
+            with open(temp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.checkpoint_path)
+    
+    def discard(self):
+        """Remove the partial file and its checkpoint."""
+        self.part_path.unlink(missing_ok=True)
+        self.checkpoint_path.unlink(missing_ok=True)
\ No newline at end of file
@@ -0,0 +1,236 @@
+from pathlib import Path
+import json
+import os
+import threading
+import numpy as np
+
+def chunk_lines(text, size=40, overlap=10):
+    """Split text into windows of size lines overlapping by overlap: [(start, end, text)], 1-based."""
+    lines = text.splitlines()
+    chunks = []
+    step = max(1, size - overlap)
+    for start in range(0, len(lines), step):
+        window = lines[start:start + size]
+        if any(line.strip() for line in window):
+            chunks.append((start + 1, start + len(window), "\n".join(window)))
+        if start + size >= len(lines):
+            break
+    return chunks
+
+class EmbeddingIndex:
+    """Vector index of project file chunks for retrieval-augmented prompts.
+    
+    Files are split into overlapping line windows and embedded with embed
+    (a backend's embed call). Normalised vectors are rows of a float32
+    matrix memory-mapped from vectors.f32, so cosine similarity against
+    every chunk is one matrix-vector product. sync() compares each file's
+    hash in a CodeIndex with the hash it was embedded at and only
+    re-embeds changed files; their old rows are reused.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, root, directory, embed, chunk_size=40, chunk_overlap=10, batch_size=32, sync_delay=2.0):
+        self.root = Path(root)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.directory / "vectors.f32"
+        self.metadata_path = self.directory / "chunks.json"
+        self.embed = embed
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.batch_size = batch_size
+        self.sync_delay = sync_delay
+        
+        self.dimension = None
+        self.capacity = 0
+        self.count = 0  # rows in use or freed; rows beyond are unused
+        self.vectors = None
+        self.valid = np.zeros(0, dtype=bool)
+        self.files = {}  # relative path: {"hash", "chunks": [[row, start, end]]}
+        self.locations = {}  # row: (relative path, start, end)
+        self.free_rows = []
+        self.lock = threading.RLock()
+        self.sync_timer = None
+        self.load()
+    
+    def load(self):
+        try:
+            with open(self.metadata_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            return
+        if metadata.get("version") != self.VERSION or not self.vectors_path.exists():
+            return
+        self.dimension = metadata["dimension"]
+        self.count = metadata["count"]
+        self.files = metadata["files"]
+        self.capacity = os.path.getsize(self.vectors_path) // (4 * self.dimension)
+        self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(self.capacity, self.dimension))
+        self.valid = np.zeros(self.capacity, dtype=bool)
+        for relative, entry in self.files.items():
+            for row, start, end in entry["chunks"]:
+                self.valid[row] = True
+                self.locations[row] = (relative, start, end)
+        self.free_rows = [row for row in range(self.count) if not self.valid[row]]
+    
+    def save(self):
+        with self.lock:
+            if self.vectors is not None:
+                self.vectors.flush()
+            metadata = {"version": self.VERSION, "dimension": self.dimension, "count": self.count, "files": self.files}
+            temp_path = self.metadata_path.with_suffix(".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(metadata, f)
+            os.replace(temp_path, self.metadata_path)
+    
+    def close(self):
+        with self.lock:
+            if self.sync_timer is not None:
+                self.sync_timer.cancel()
+                self.sync_timer = None
+            self.save()
+    
+    # Storage
+    
+    def reserve(self, rows):
+        """Make room for rows more vectors, growing the memmap file by doubling."""
+        needed = self.count + rows - len(self.free_rows)
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, 2 * self.capacity, 256)
+        if self.vectors is not None:
+            self.vectors.flush()
+            self.vectors = None
+        with open(self.vectors_path, 'ab') as f:
+            f.truncate(capacity * self.dimension * 4)
+        self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+        valid = np.zeros(capacity, dtype=bool)
+        valid[:self.capacity] = self.valid
+        self.valid = valid
+        self.capacity = capacity
+    
+    def clear(self):
+        """Drop every vector, e.g. when the embedding model changes."""
+        self.vectors = None
+        self.vectors_path.unlink(missing_ok=True)
+        self.dimension = None
+        self.capacity = self.count = 0
+        self.valid = np.zeros(0, dtype=bool)
+        self.files = {}
+        self.locations = {}
+        self.free_rows = []
+    
+    def allocate(self):
+        if self.free_rows:
+            return self.free_rows.pop()
+        self.count += 1
+        return self.count - 1
+    
+    def remove_file(self, relative):
+        entry = self.files.pop(relative, None)
+        if entry is None:
+            return
+        for row, _, _ in entry["chunks"]:
+            self.valid[row] = False
+            self.free_rows.append(row)
+            del self.locations[row]
+    
+    def add_file(self, relative, digest, chunks, vectors):
+        if not chunks:
+            self.files[relative] = {"hash": digest, "chunks": []}
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dimension is not None and vectors.shape[1] != self.dimension:
+            self.clear()
+        if self.dimension is None:
+            self.dimension = vectors.shape[1]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        self.reserve(len(chunks))
+        rows = [self.allocate() for _ in chunks]
+        self.vectors[rows] = vectors
+        self.valid[rows] = True
+        for row, (start, end, _) in zip(rows, chunks):
+            self.locations[row] = (relative, start, end)
+        self.files[relative] = {"hash": digest, "chunks": [[row, start, end] for row, (start, end, _) in zip(rows, chunks)]}
+    
+    # Updating
+    
+    def embed_texts(self, texts):
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self.embed(texts[start:start + self.batch_size]))
+        return vectors
+    
+    def index_file(self, relative, digest):
+        """Embed one file's chunks, replacing what was stored for it."""
+        try:
+            with open(self.root / relative, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError):
+            with self.lock:
+                self.remove_file(relative)
+            return
+        chunks = chunk_lines(text, self.chunk_size, self.chunk_overlap)
+        # The path helps match questions that name a module or feature
+        vectors = self.embed_texts([f"{relative}\n{chunk}" for _, _, chunk in chunks]) if chunks else []
+        with self.lock:
+            self.remove_file(relative)
+            self.add_file(relative, digest, chunks, vectors)
+    
+    def sync(self, code_index):
+        """Re-embed files whose hash in code_index changed and drop removed files.
+        
+        Returns the number of files embedded.
+        """
+        with self.lock:
+            self.sync_timer = None
+        with code_index.lock:
+            hashes = {relative: entry["hash"] for relative, entry in code_index.files.items()}
+        with self.lock:
+            for relative in [r for r in self.files if r not in hashes]:
+                self.remove_file(relative)
+            changed = [r for r, digest in hashes.items() if self.files.get(r, {}).get("hash") != digest]
+        for relative in changed:
+            self.index_file(relative, hashes[relative])
+        self.save()
+        return len(changed)
+    
+    def schedule_sync(self, code_index):
+        """Sync after sync_delay on a background thread, coalescing bursts of changes."""
+        with self.lock:
+            if self.sync_timer is None:
+                self.sync_timer = threading.Timer(self.sync_delay, self.sync, args=(code_index,))
+                self.sync_timer.daemon = True
+                self.sync_timer.start()
+    
+    # Queries
+    
+    def search(self, query, k=5):
+        """The k chunks most similar to query as {"path", "start", "end", "score", "text"}, best first."""
+        if self.vectors is None:
+            return []
+        vector = np.asarray(self.embed(query), dtype=np.float32)
+        vector /= np.linalg.norm(vector) or 1
+        with self.lock:
+            valid = self.valid[:self.count]
+            k = min(k, int(valid.sum()))
+            if k == 0 or len(vector) != self.dimension:
+                return []
+            scores = self.vectors[:self.count] @ vector
+            scores[~valid] = -np.inf
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            hits = [(self.locations[row], float(scores[row])) for row in top]
+        return [{"path": str(self.root / relative), "start": start, "end": end, "score": score,
+                 "text": read_lines(self.root / relative, start, end)}
+                for (relative, start, end), score in hits]
+
+def read_lines(path, start, end):
+    """Lines start to end (1-based, inclusive) of a file."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return "\n".join(f.read().splitlines()[start - 1:end])
+    except (OSError, UnicodeDecodeError):
+        return ""
\ No newline at end of file
@@ -0,0 +1,136 @@
+from pathlib import Path
+import json
+import os
+import threading
+from .blob_store import BlobStore
+
+class FileJournal:
+    """Append-only JSON Lines journal of file versions.
+    
+    Recording a version appends one line, so a save costs the same however
+    much history exists. Lines reach the OS immediately while fsync is
+    debounced to once per sync_interval. Version content goes to a BlobStore,
+    delta-encoded against the previous version of the same file. The journal
+    is rewritten from the live versions when superseded lines outnumber them.
+    """
+    
+    def __init__(self, directory, max_versions=10, sync_interval=1.0, compact_min_lines=1000):
+        self.directory = Path(directory)
+        self.journal_path = self.directory / "journal.jsonl"
+        self.blobs = BlobStore(self.directory / "objects")
+        self.max_versions = max_versions
+        self.sync_interval = sync_interval
+        self.compact_min_lines = compact_min_lines
+        
+        self.versions = {}  # path: [{"hash", "size", "timestamp"}]
+        self.lines = 0
+        self.lock = threading.RLock()
+        self.sync_timer = None
+        self.load()
+        self.file = open(self.journal_path, 'a', encoding='utf-8')
+    
+    def load(self):
+        """Replay the journal, skipping a line torn by a crash mid-write."""
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self.apply(record)
+                self.lines += 1
+    
+    def apply(self, record):
+        path = record["path"]
+        if record["op"] == "delete":
+            self.versions.pop(path, None)
+            return
+        versions = self.versions.setdefault(path, [])
+        versions.append({key: record[key] for key in ("hash", "size", "timestamp") if key in record})
+        # Keep only the last max_versions versions
+        del versions[:-self.max_versions]
+    
+    def record_version(self, path, content, timestamp):
+        """Store content as the newest version of path and return its entry."""
+        digest = self.blobs.hash_content(content)
+        with self.lock:
+            versions = self.versions.get(path)
+            if versions and versions[-1]["hash"] == digest:
+                return versions[-1]
+            self.blobs.put(content, base=versions[-1]["hash"] if versions else None, digest=digest)
+            self.append({"op": "version", "path": path, "hash": digest,
+                         "size": len(content), "timestamp": timestamp})
+            return self.versions[path][-1]
+    
+    def record_delete(self, path):
+        with self.lock:
+            if path in self.versions:
+                self.append({"op": "delete", "path": path})
+    
+    def import_history(self, file_history):
+        """Append versions from the old file_history.json format (hashes only)."""
+        with self.lock:
+            for path, versions in file_history.items():
+                for version in versions:
+                    self.append({"op": "version", "path": path, **version})
+    
+    def history(self, path):
+        return list(self.versions.get(path, []))
+    
+    def append(self, record):
+        with self.lock:
+            self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+            self.lines += 1
+            self.apply(record)
+            self.schedule_sync()
+            if self.lines > max(self.compact_min_lines, 2 * self.live_lines()):
+                self.compact()
+    
+    def live_lines(self):
+        return sum(len(versions) for versions in self.versions.values())
+    
+    def schedule_sync(self):
+        if self.sync_timer is None:
+            self.sync_timer = threading.Timer(self.sync_interval, self.sync)
+            self.sync_timer.daemon = True
+            self.sync_timer.start()
+    
+    def sync(self):
+        """Force journal lines written so far to disk."""
+        with self.lock:
+            self.sync_timer = None
+            if not self.file.closed:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+    
+    def compact(self):
+        """Rewrite the journal with only live versions and drop unreferenced blobs."""
+        with self.lock:
+            temp_path = self.journal_path.with_suffix(".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for path, versions in self.versions.items():
+                    for version in versions:
+                        f.write(json.dumps({"op": "version", "path": path, **version}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.file.close()
+            os.replace(temp_path, self.journal_path)
+            self.file = open(self.journal_path, 'a', encoding='utf-8')
+            self.lines = self.live_lines()
+            self.blobs.collect_garbage(
+                version["hash"] for versions in self.versions.values() for version in versions
+            )
+    
+    def close(self):
+        with self.lock:
+            if self.sync_timer is not None:
+                self.sync_timer.cancel()
+            self.sync()
+            self.file.close()
+    
+    def read_blob(self, digest):
+        """Return the stored content for a hash, or None if it was never stored."""
+        return self.blobs.get(digest)
\ No newline at end of file
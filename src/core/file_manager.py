@@ -2,31 +2,43 @@ from pathlib import Path
 import shutil
 import json
 from PyQt6.QtCore import QObject, pyqtSignal
-import hashlib
 import mimetypes
+import difflib
+import os
+from .file_journal import FileJournal
+from .file_watcher import FileWatcher, CREATED, MODIFIED, DELETED
 
 class FileManager(QObject):
     file_created = pyqtSignal(str)  # path
     file_deleted = pyqtSignal(str)  # path
     file_modified = pyqtSignal(str)  # path
+    files_changed = pyqtSignal(list)  # [(change, path)] made by other programs, batched
     
     def __init__(self):
         super().__init__()
         self.workspace_dir = Path("workspace")
         self.workspace_dir.mkdir(exist_ok=True)
-        self.file_history = {}  # path: [versions]
+        self.journal = FileJournal(self.workspace_dir / ".history")
         self.load_history()
+        self.watcher = None
+        self.own_changes = {}  # absolute path: mtime_ns we wrote, or DELETED
+    
+    @property
+    def file_history(self):
+        """Versions of each file, oldest first: path: [versions]"""
+        return self.journal.versions
         
     def load_history(self):
+        # Carry over history from the old single-file format once
         history_file = self.workspace_dir / "file_history.json"
-        if history_file.exists():
+        if history_file.exists() and not self.journal.versions:
             with open(history_file, 'r') as f:
-                self.file_history = json.load(f)
+                self.journal.import_history(json.load(f))
+            history_file.rename(history_file.with_suffix(".json.bak"))
                 
     def save_history(self):
-        history_file = self.workspace_dir / "file_history.json"
-        with open(history_file, 'w') as f:
-            json.dump(self.file_history, f, indent=4)
+        """Flush the history journal to disk now instead of at the next sync."""
+        self.journal.sync()
             
     def create_file(self, path, content=""):
         """Create a new file with optional content"""
@@ -38,7 +50,8 @@ class FileManager(QObject):
         with open(full_path, 'w', encoding='utf-8') as f:
             f.write(content)
             
-        self.add_to_history(str(full_path))
+        self.remember_own_change(full_path)
+        self.add_to_history(str(full_path), content)
         self.file_created.emit(str(full_path))
         
     def read_file(self, path):
@@ -50,34 +63,110 @@ class FileManager(QObject):
         """Write content to file"""
         with open(path, 'w', encoding='utf-8') as f:
             f.write(content)
-        self.add_to_history(path)
+        self.remember_own_change(path)
+        self.add_to_history(path, content)
         self.file_modified.emit(path)
         
     def delete_file(self, path):
         """Delete file"""
         Path(path).unlink()
-        if str(path) in self.file_history:
-            del self.file_history[str(path)]
-        self.save_history()
+        if self.watcher is not None:
+            self.own_changes[os.path.abspath(path)] = DELETED
+        self.journal.record_delete(str(path))
         self.file_deleted.emit(str(path))
         
-    def add_to_history(self, path):
+    def add_to_history(self, path, content=None):
         """Add file version to history"""
-        if str(path) not in self.file_history:
-            self.file_history[str(path)] = []
+        if content is None:
+            with open(path, 'rb') as f:
+                content = f.read()
+        elif isinstance(content, str):
+            content = content.encode('utf-8')
             
-        with open(path, 'rb') as f:
-            content = f.read()
-            hash = hashlib.md5(content).hexdigest()
+        # Appends one journal line; the journal keeps the last 10 versions
+        self.journal.record_version(str(path), content, str(Path(path).stat().st_mtime))
             
-        self.file_history[str(path)].append({
-            'hash': hash,
-            'timestamp': str(Path(path).stat().st_mtime)
-        })
+    def get_version(self, path, version=-1):
+        """Get a version's entry by index into the file's history or by hash."""
+        versions = self.file_history.get(str(path), [])
+        if isinstance(version, str):
+            for entry in versions:
+                if entry['hash'] == version:
+                    return entry
+            raise KeyError(f"No version {version} of {path}")
+        try:
+            return versions[version]
+        except IndexError:
+            raise KeyError(f"No version {version} of {path}") from None
         
-        # Keep only last 10 versions
-        self.file_history[str(path)] = self.file_history[str(path)][-10:]
-        self.save_history()
+    def read_version(self, path, version=-1):
+        """Read the content of a stored version of a file"""
+        entry = self.get_version(path, version)
+        content = self.journal.read_blob(entry['hash'])
+        if content is None:
+            raise KeyError(f"Content of version {entry['hash']} of {path} was not stored")
+        return content.decode('utf-8')
+    
+    def restore_version(self, path, version=-2):
+        """Write a stored version back to the file, recording it as the newest version"""
+        content = self.read_version(path, version)
+        self.write_file(path, content)
+        return content
+    
+    def diff_versions(self, path, old_version=-2, new_version=-1):
+        """Get a unified diff between two stored versions of a file"""
+        old_entry = self.get_version(path, old_version)
+        new_entry = self.get_version(path, new_version)
+        return "".join(difflib.unified_diff(
+            self.read_version(path, old_entry['hash']).splitlines(keepends=True),
+            self.read_version(path, new_entry['hash']).splitlines(keepends=True),
+            fromfile=f"{path}@{old_entry['hash'][:8]}",
+            tofile=f"{path}@{new_entry['hash'][:8]}"
+        ))
+    
+    def watch_directory(self, path, **options):
+        """Watch a directory tree for changes made by other programs."""
+        self.stop_watching()
+        self.watcher = FileWatcher(os.path.abspath(path), parent=self, **options)
+        self.watcher.files_changed.connect(self.on_files_changed)
+    
+    def stop_watching(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher.deleteLater()
+            self.watcher = None
+        self.own_changes.clear()
+    
+    def remember_own_change(self, path):
+        # Lets the watcher drop the echo of our own write
+        if self.watcher is not None:
+            path = os.path.abspath(path)
+            self.own_changes[path] = os.stat(path).st_mtime_ns
+    
+    def is_own_change(self, change, path):
+        own = self.own_changes.pop(path, None)
+        if own is None:
+            return False
+        if change == DELETED:
+            return own == DELETED
+        try:
+            return own == os.stat(path).st_mtime_ns
+        except OSError:
+            return False
+    
+    def on_files_changed(self, changes):
+        external = [(change, path) for change, path in changes if not self.is_own_change(change, path)]
+        if not external:
+            return
+        signals = {CREATED: self.file_created, MODIFIED: self.file_modified, DELETED: self.file_deleted}
+        for change, path in external:
+            signals[change].emit(path)
+        self.files_changed.emit(external)
+    
+    def close(self):
+        """Stop watching, then flush and close the history journal."""
+        self.stop_watching()
+        self.journal.close()
         
     def get_file_type(self, path):
         """Get file type/language"""
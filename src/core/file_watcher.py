@@ -0,0 +1,251 @@
+from pathlib import Path
+import os
+import threading
+import time
+from PyQt6.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+from .ignore_rules import IgnoreRules
+
+CREATED = "created"
+MODIFIED = "modified"
+DELETED = "deleted"
+
+def coalesce(pending, path, change):
+    """Merge a change into the pending changes for a path."""
+    previous = pending.get(path)
+    if previous is None:
+        pending[path] = change
+    elif previous == CREATED and change == DELETED:
+        del pending[path]  # came and went within one batch
+    elif previous == CREATED:
+        pass  # still new, whatever happened to it since
+    elif previous == DELETED and change == CREATED:
+        pending[path] = MODIFIED  # replaced, as editors and checkouts do
+    else:
+        pending[path] = change
+
+class FileWatcher(QObject):
+    """Watches a directory tree and emits coalesced, debounced change batches.
+    
+    Directories are watched with QFileSystemWatcher (inotify on Linux). A
+    directory change only marks it dirty; once events stop for debounce_ms,
+    or max_delay_ms after the first one, each dirty directory is rescanned
+    once and diffed against its snapshot. Bursts such as a git checkout
+    therefore arrive as a single batch. Where the native watcher cannot
+    watch a path, the whole tree is polled every poll_interval_ms instead.
+    
+    The first snapshot of the tree is taken on a background thread, so
+    watching a large project does not block the caller; changes are
+    reported once it is done and ready is emitted.
+    """
+    
+    files_changed = pyqtSignal(list)  # [(change, path)]
+    ready = pyqtSignal()
+    snapshot_taken = pyqtSignal(object)  # {directory: entries} from the scan thread
+    
+    def __init__(self, root, ignore_rules=None, debounce_ms=200, max_delay_ms=2000,
+                 poll_interval_ms=2000, use_polling=False, max_watched_files=4096, parent=None):
+        super().__init__(parent)
+        self.root = Path(root)
+        self.ignore_rules = ignore_rules or IgnoreRules(self.root)
+        self.max_delay = max_delay_ms / 1000
+        self.max_watched_files = max_watched_files
+        
+        self.snapshots = {}  # directory: {name: (is_dir, size, mtime_ns)}
+        self.watched_files = set()
+        self.dirty = set()
+        self.pending = {}  # path: change
+        self.first_event = None
+        self.is_scanned = False
+        self.stopped = False
+        
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(debounce_ms)
+        self.debounce_timer.timeout.connect(self.flush)
+        
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(poll_interval_ms)
+        self.poll_timer.timeout.connect(self.poll)
+        
+        self.watcher = None if use_polling else QFileSystemWatcher(self)
+        if self.watcher is not None:
+            self.watcher.directoryChanged.connect(self.on_directory_changed)
+            self.watcher.fileChanged.connect(self.on_file_changed)
+        self.snapshot_taken.connect(self.on_snapshot_taken)
+        threading.Thread(target=self.take_snapshot, name="file-watcher", daemon=True).start()
+        if self.watcher is None:
+            self.poll_timer.start()
+    
+    def is_polling(self):
+        return self.poll_timer.isActive()
+    
+    def is_ignored(self, directory, entry):
+        return self.ignore_rules.is_ignored_entry(directory, entry.name, entry.is_dir(follow_symlinks=False))
+    
+    def stop(self):
+        self.stopped = True
+        self.debounce_timer.stop()
+        self.poll_timer.stop()
+        if self.watcher is not None:
+            paths = self.watcher.directories() + self.watcher.files()
+            if paths:
+                self.watcher.removePaths(paths)
+    
+    def scan_directory(self, directory):
+        """Stat the entries of one directory: {name: (is_dir, size, mtime_ns)}."""
+        entries = {}
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if self.is_ignored(directory, entry):
+                        continue
+                    try:
+                        stat = entry.stat(follow_symlinks=False)
+                        entries[entry.name] = (entry.is_dir(follow_symlinks=False), stat.st_size, stat.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return entries
+    
+    def walk(self, directory):
+        """Yield (directory, entries) for a directory and each directory below it."""
+        stack = [Path(directory)]
+        while stack and not self.stopped:
+            current = stack.pop()
+            entries = self.scan_directory(current)
+            if entries is None:
+                continue
+            yield current, entries
+            stack.extend(current / name for name, (is_dir, _, _) in entries.items() if is_dir)
+    
+    def take_snapshot(self):
+        """Snapshot the whole tree on a background thread and hand it to the watcher's thread."""
+        snapshots = dict(self.walk(self.root))
+        try:
+            self.snapshot_taken.emit(snapshots)
+        except RuntimeError:
+            pass  # the watcher was deleted while scanning
+    
+    def on_snapshot_taken(self, snapshots):
+        if self.stopped:
+            return
+        for directory, entries in snapshots.items():
+            self.snapshots[directory] = entries
+            self.add_watch(directory, directory=True)
+            for name, (is_dir, _, _) in entries.items():
+                if not is_dir:
+                    self.add_watch(directory / name)
+        self.is_scanned = True
+        self.ready.emit()
+    
+    def scan_tree(self, directory):
+        """Snapshot and watch a new directory and everything below it, recording it as created."""
+        for current, entries in self.walk(directory):
+            self.snapshots[current] = entries
+            self.add_watch(current, directory=True)
+            for name, (is_dir, _, _) in entries.items():
+                path = current / name
+                if not is_dir:
+                    self.add_watch(path)
+                self.record(path, CREATED)
+    
+    def add_watch(self, path, directory=False):
+        if self.watcher is None:
+            return
+        if not directory:
+            # Changes to unwatched files still show up when their directory is rescanned
+            if str(path) in self.watched_files or len(self.watched_files) >= self.max_watched_files:
+                return
+            self.watched_files.add(str(path))
+        if not self.watcher.addPath(str(path)) and directory:
+            # Out of inotify watches or unsupported filesystem: poll instead
+            if not self.poll_timer.isActive():
+                self.poll_timer.start()
+    
+    def on_directory_changed(self, path):
+        self.dirty.add(Path(path))
+        self.schedule()
+    
+    def on_file_changed(self, path):
+        path = Path(path)
+        self.dirty.add(path.parent)
+        if path.exists():
+            self.record(path, MODIFIED)
+            # Editors that replace files drop the inotify watch; re-add it
+            if str(path) not in self.watcher.files():
+                self.watched_files.discard(str(path))
+                self.add_watch(path)
+        else:
+            self.watched_files.discard(str(path))
+        self.schedule()
+    
+    def schedule(self):
+        now = time.monotonic()
+        if self.first_event is None:
+            self.first_event = now
+        if now - self.first_event >= self.max_delay:
+            self.flush()
+        else:
+            self.debounce_timer.start()
+    
+    def record(self, path, change):
+        coalesce(self.pending, str(path), change)
+    
+    def rescan(self, directory):
+        """Diff a directory against its snapshot, recording what changed."""
+        old = self.snapshots.get(directory)
+        new = self.scan_directory(directory)
+        if old is None and new is None:
+            return
+        if new is None:
+            self.forget(directory)
+            return
+        self.snapshots[directory] = new
+        old = old or {}
+        for name in old.keys() - new.keys():
+            path = directory / name
+            if old[name][0]:
+                self.forget(path)
+            else:
+                self.record(path, DELETED)
+        for name, entry in new.items():
+            path = directory / name
+            if name not in old or old[name][0] != entry[0]:
+                if entry[0]:
+                    self.scan_tree(path)
+                else:
+                    self.add_watch(path)
+                self.record(path, CREATED)
+            elif not entry[0] and entry != old[name]:
+                self.record(path, MODIFIED)
+    
+    def forget(self, directory):
+        """Drop snapshots below a removed directory, recording its files as deleted."""
+        for snapshot in [d for d in self.snapshots if d == directory or directory in d.parents]:
+            for name, (is_dir, _, _) in self.snapshots.pop(snapshot).items():
+                if not is_dir:
+                    self.record(snapshot / name, DELETED)
+        self.record(directory, DELETED)
+    
+    def poll(self):
+        for directory in list(self.snapshots):
+            if directory in self.snapshots:
+                self.rescan(directory)
+        self.emit_pending()
+    
+    def flush(self):
+        self.debounce_timer.stop()
+        dirty, self.dirty = self.dirty, set()
+        # Parents first, so a new subtree is scanned once from its top
+        for directory in sorted(dirty, key=lambda d: len(d.parts)):
+            if directory in self.snapshots or directory.parent in self.snapshots:
+                self.rescan(directory)
+        self.emit_pending()
+    
+    def emit_pending(self):
+        self.first_event = None
+        if self.pending:
+            changes = [(change, path) for path, change in self.pending.items()]
+            self.pending = {}
+            self.files_changed.emit(changes)
\ No newline at end of file
@@ -0,0 +1,212 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+import itertools
+import threading
+import time
+from queue import Queue
+
+class RequestCancelled(Exception):
+    """Raised when waiting on a request that was cancelled."""
+
+class GenerationRequest:
+    """A prompt queued for generation on the worker thread."""
+    
+    _ids = itertools.count(1)
+    
+    def __init__(self, prompt, stop_when=None, route=None, prepare=None, finish=None, **kwargs):
+        self.id = next(self._ids)
+        self.prompt = prompt
+        self.kwargs = kwargs
+        # Name the request's generation time is recorded under, if any
+        self.route = route
+        # Called with each token; returning True ends the response there
+        self.stop_when = stop_when
+        # Called on the worker with the request before generating, and with the
+        # request and response after; finish returns the response to complete with
+        self.prepare = prepare
+        self.finish = finish
+        # Set, e.g. by prepare, to complete with this text instead of the generated one
+        self.answer = None
+        self.response = None
+        self.error = None
+        self.cancelled = False
+        self.stopped_early = False
+        self.started_at = None  # perf_counter times set by the worker
+        self.finished_at = None
+        self._done = threading.Event()
+    
+    def cancel(self):
+        """Ask the worker to drop or abort this request."""
+        self.cancelled = True
+    
+    def is_done(self):
+        return self._done.is_set()
+    
+    def wait(self, timeout=None):
+        """Block until the request finishes and return its response."""
+        self._done.wait(timeout)
+        return self.response
+    
+    def generation_time(self):
+        """Seconds from the request's model being ready to its last token, or None."""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+    
+    def _finish(self, response=None, error=None):
+        self.finished_at = time.perf_counter()
+        self.response = response
+        self.error = error
+        self._done.set()
+
+class GenerationWorker(QThread):
+    """Runs queued generation requests in FIFO order, off the UI thread."""
+    
+    request_started = pyqtSignal(int)  # request id
+    token_generated = pyqtSignal(int, str)  # request id, token
+    request_completed = pyqtSignal(int, str)  # request id, response
+    request_failed = pyqtSignal(int, str)  # request id, error message
+    request_cancelled = pyqtSignal(int)  # request id
+    
+    def __init__(self, model_manager, parent=None):
+        super().__init__(parent)
+        self.model_manager = model_manager
+        self.queue = Queue()
+        self.requests = {}  # id: GenerationRequest
+        self.lock = threading.Lock()
+        self.current_request = None
+        self.thread_ident = None  # set once the thread runs
+    
+    def submit(self, prompt, **kwargs):
+        """Queue a prompt for generation and return its request."""
+        request = GenerationRequest(prompt, **kwargs)
+        with self.lock:
+            self.requests[request.id] = request
+        self.queue.put(request)
+        if not self.isRunning():
+            self.start()
+        return request
+    
+    def run_task(self, task):
+        """Queue a callable to run on the worker thread, in order with requests."""
+        self.queue.put(task)
+        if not self.isRunning():
+            self.start()
+    
+    def call(self, function, *args):
+        """Run function on the worker thread, in order with requests, and return its result.
+        
+        Blocks the caller until it has run; called on the worker it runs at once.
+        """
+        if threading.get_ident() == self.thread_ident:
+            return function(*args)
+        done = threading.Event()
+        result = {}
+        
+        def task():
+            try:
+                result["value"] = function(*args)
+            except Exception as e:
+                result["error"] = e
+            finally:
+                done.set()
+        
+        self.run_task(task)
+        done.wait()
+        if "error" in result:
+            raise result["error"]
+        return result["value"]
+    
+    def cancel(self, request_id):
+        """Cancel a queued or running request."""
+        with self.lock:
+            request = self.requests.get(request_id)
+        if request:
+            request.cancel()
+    
+    def cancel_all(self):
+        """Cancel every queued and running request."""
+        with self.lock:
+            requests = list(self.requests.values())
+        for request in requests:
+            request.cancel()
+    
+    def stop(self):
+        """Cancel outstanding work and stop the worker thread."""
+        self.cancel_all()
+        if self.isRunning():
+            self.queue.put(None)
+            self.wait()
+    
+    def run(self):
+        self.thread_ident = threading.get_ident()
+        while True:
+            request = self.queue.get()
+            if request is None:
+                break
+            
+            if not isinstance(request, GenerationRequest):
+                try:
+                    request()
+                except Exception as e:
+                    print(f"Error running worker task: {e}")
+                continue
+            
+            self.current_request = request
+            try:
+                self._process(request)
+            finally:
+                self.current_request = None
+                with self.lock:
+                    self.requests.pop(request.id, None)
+    
+    def _process(self, request):
+        if request.cancelled:
+            request._finish()
+            self.request_cancelled.emit(request.id)
+            return
+        
+        self.request_started.emit(request.id)
+        tokens = []
+        try:
+            if request.prepare is not None:
+                request.prepare(request)
+            if request.answer is None and not request.cancelled:
+                self.generate(request, tokens)
+            response = request.answer if request.answer is not None else "".join(tokens)
+            if request.finish is not None and not request.cancelled:
+                response = request.finish(request, response)
+        except Exception as e:
+            print(f"Error generating response: {e}")
+            request._finish(error=str(e))
+            self.request_failed.emit(request.id, str(e))
+            return
+        
+        request._finish(response)
+        # Answers that were not generated say nothing about the route's speed
+        if request.route is not None and not request.cancelled and request.answer is None:
+            self.model_manager.record_latency(request.route, request.generation_time(), request.kwargs.get("model"))
+        if request.cancelled:
+            self.request_cancelled.emit(request.id)
+        else:
+            self.request_completed.emit(request.id, response)
+    
+    def generate(self, request, tokens):
+        """Stream the request's response into tokens, emitting each one."""
+        # Only the model the request runs on is loaded, and loading is not timed
+        self.model_manager.ensure_model_loaded(request.kwargs.get("model"))
+        if callable(request.prompt):
+            # Prompts that need the backend, e.g. to retrieve context, are built here
+            request.prompt = request.prompt()
+        request.started_at = time.perf_counter()
+        for token in self.model_manager.stream_response(
+            request.prompt,
+            should_stop=lambda: request.cancelled or request.stopped_early,
+            **request.kwargs
+        ):
+            if request.cancelled:
+                break
+            tokens.append(token)
+            self.token_generated.emit(request.id, token)
+            if request.stop_when is not None and request.stop_when(token):
+                request.stopped_early = True
+                break
\ No newline at end of file
@@ -0,0 +1,113 @@
+from pathlib import Path
+import re
+
+DEFAULT_PATTERNS = [
+    ".git/", ".hg/", ".svn/", "__pycache__/", "node_modules/", ".venv/", "venv/",
+    ".history/", "/models/", "*.pyc", ".DS_Store"
+]
+
+class IgnoreRules:
+    """Decides which paths under a root are hidden from trees, watchers and indexes.
+    
+    Supports the common .gitignore syntax: "#" comments, "!" negation, a
+    trailing "/" for directories only, a leading or inner "/" to anchor a
+    pattern to the root, and "*", "?" and "**" wildcards. Patterns come
+    from DEFAULT_PATTERNS followed by the root's .gitignore; the last
+    matching pattern wins.
+    """
+    
+    def __init__(self, root, patterns=None, use_gitignore=True):
+        self.root = Path(root)
+        self.rules = []  # (regex, negated, directory only)
+        for pattern in DEFAULT_PATTERNS if patterns is None else patterns:
+            self.add_pattern(pattern)
+        if use_gitignore:
+            self.load_gitignore(self.root / ".gitignore")
+    
+    def load_gitignore(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self.add_pattern(line.rstrip("\n"))
+        except OSError:
+            pass
+    
+    def add_pattern(self, pattern):
+        pattern = pattern.strip()
+        if not pattern or pattern.startswith("#"):
+            return
+        negated = pattern.startswith("!")
+        if negated:
+            pattern = pattern[1:]
+        directory_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+        
+        regex = self.translate(pattern)
+        if not anchored:
+            regex = r"(?:.*/)?" + regex
+        self.rules.append((re.compile(regex + r"\Z"), negated, directory_only))
+    
+    @staticmethod
+    def translate(pattern):
+        """Translate a glob to a regex where "*" stays within one path segment."""
+        regex = []
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith("**/", i):
+                regex.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern.startswith("**", i):
+                regex.append(".*")
+                i += 2
+                continue
+            char = pattern[i]
+            end = pattern.find("]", i + 1)
+            if char == "*":
+                regex.append("[^/]*")
+            elif char == "?":
+                regex.append("[^/]")
+            elif char == "[" and end != -1:
+                group = pattern[i + 1:end]
+                if group.startswith("!"):
+                    group = "^" + group[1:]
+                regex.append("[" + group.replace("\\", "\\\\") + "]")
+                i = end
+            else:
+                regex.append(re.escape(char))
+            i += 1
+        return "".join(regex)
+    
+    def relative(self, path):
+        path = Path(path)
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return path.as_posix()
+    
+    def is_ignored(self, path, is_dir=None):
+        """Whether path, or any directory above it within the root, is ignored."""
+        relative = self.relative(path)
+        if is_dir is None:
+            is_dir = Path(path).is_dir()
+        parts = relative.split("/")
+        for depth in range(1, len(parts) + 1):
+            last = depth == len(parts)
+            if self.matches("/".join(parts[:depth]), is_dir if last else True):
+                return True
+        return False
+    
+    def matches(self, relative, is_dir):
+        ignored = False
+        for regex, negated, directory_only in self.rules:
+            if directory_only and not is_dir:
+                continue
+            if regex.match(relative):
+                ignored = not negated
+        return ignored
+    
+    def is_ignored_entry(self, directory, name, is_dir):
+        """Check one entry of a directory whose own path is known not to be ignored."""
+        return self.matches(self.relative(Path(directory) / name), is_dir)
\ No newline at end of file
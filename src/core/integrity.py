@@ -0,0 +1,56 @@
+from pathlib import Path
+import hashlib
+import json
+import os
+
+VERIFIED = "verified"
+UNVERIFIED = "unverified"
+MISMATCH = "mismatch"
+MISSING = "missing"
+
+def sidecar_path(path):
+    path = Path(path)
+    return path.with_name(path.name + ".sha256.json")
+
+def file_sha256(path, chunk_size=4 * 1024 * 1024):
+    """Hash a file in chunks without loading it into memory."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def write_sidecar(path, sha256):
+    """Record a file's hash together with the size and mtime it was computed for."""
+    stat = os.stat(path)
+    with open(sidecar_path(path), 'w') as f:
+        json.dump({"sha256": sha256, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}, f)
+
+def cached_sha256(path):
+    """Return the hash from the sidecar if it still matches the file, else None."""
+    try:
+        stat = os.stat(path)
+        with open(sidecar_path(path), 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("size") != stat.st_size or data.get("mtime_ns") != stat.st_mtime_ns:
+        return None
+    return data.get("sha256")
+
+def verification_state(path, expected_sha256):
+    """Get the integrity state of a file from its sidecar, without hashing it."""
+    if not Path(path).exists():
+        return MISSING
+    actual = cached_sha256(path)
+    if not expected_sha256 or not actual:
+        return UNVERIFIED
+    return VERIFIED if actual == expected_sha256.lower() else MISMATCH
+
+def verify_file(path, expected_sha256):
+    """Hash the file if its sidecar is stale, then return its integrity state."""
+    if not Path(path).exists():
+        return MISSING
+    if expected_sha256 and cached_sha256(path) is None:
+        write_sidecar(path, file_sha256(path))
+    return verification_state(path, expected_sha256)
\ No newline at end of file
@@ -0,0 +1,97 @@
+from pathlib import Path
+import json
+import os
+
+class ModelRegistry:
+    """Models that can be downloaded and loaded, persisted to a JSON file.
+    
+    Built-in models come from builtin and cannot be removed. Models added at
+    runtime are saved with the default model and the model each feature is
+    routed to; features without a route use the model currently loaded.
+    """
+    
+    REQUIRED_FIELDS = ("name", "description", "file", "url", "size", "type")
+    DEFAULTS = {"context_length": 2048, "prompt_template": "{0}", "sha256": None}
+    
+    def __init__(self, path, builtin):
+        self.path = Path(path)
+        self.builtin = builtin
+        self.models = dict(builtin)  # name: config
+        self.default_model = next(iter(builtin))
+        self.feature_models = {}  # feature: model name
+        self.load()
+    
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for name, info in data.get("models", {}).items():
+            if name not in self.builtin:
+                self.models[name] = {**self.DEFAULTS, **info}
+        if data.get("default") in self.models:
+            self.default_model = data["default"]
+        self.feature_models = {feature: name for feature, name in data.get("features", {}).items()
+                               if name in self.models}
+    
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "models": {name: info for name, info in self.models.items() if name not in self.builtin},
+            "default": self.default_model,
+            "features": self.feature_models
+        }
+        temp_path = self.path.with_suffix(".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
+        os.replace(temp_path, self.path)
+    
+    def names(self):
+        return list(self.models)
+    
+    def get(self, name=None):
+        """Config of a model, or of the default model."""
+        name = name or self.default_model
+        if name not in self.models:
+            raise ValueError(f"Model '{name}' not found")
+        return self.models[name]
+    
+    def add(self, name, info):
+        if name in self.models:
+            raise ValueError(f"Model '{name}' already exists")
+        missing_fields = [field for field in self.REQUIRED_FIELDS if field not in info]
+        if missing_fields:
+            raise ValueError(f"Missing required fields: {', '.join(missing_fields)}")
+        self.models[name] = {**self.DEFAULTS, **info}
+        self.save()
+    
+    def remove(self, name):
+        """Forget a model and any routes to it; returns its config."""
+        if name in self.builtin:
+            raise ValueError("Cannot remove default models")
+        info = self.get(name)
+        del self.models[name]
+        if self.default_model == name:
+            self.default_model = next(iter(self.builtin))
+        self.feature_models = {feature: model for feature, model in self.feature_models.items() if model != name}
+        self.save()
+        return info
+    
+    def set_default(self, name):
+        self.get(name)
+        self.default_model = name
+        self.save()
+    
+    def model_for(self, feature):
+        """Model a feature is routed to, or None for the current model."""
+        return self.feature_models.get(feature)
+    
+    def set_feature_model(self, feature, name):
+        """Route a feature to a model, or back to the current model with None."""
+        if name is None:
+            self.feature_models.pop(feature, None)
+        else:
+            self.get(name)
+            self.feature_models[feature] = name
+        self.save()
\ No newline at end of file
@@ -0,0 +1,134 @@
+from collections import deque
+from pathlib import Path
+import json
+import re
+import threading
+from .conversation import estimate_tokens
+
+# Fallbacks for what the rules file leaves out; the routes themselves are only
+# in the file, and without it every feature runs on the current model
+DEFAULT_RULES = {
+    "small_model": None,
+    "features": {},
+    "default": "large",
+    "auto": {"max_prompt_tokens": None, "max_lines": None, "heavy_words": []}
+}
+
+class ModelRouter:
+    """Chooses the model each feature's prompt runs on and times every route.
+    
+    Rules are read from a JSON file, reloaded when it changes, on top of
+    DEFAULT_RULES. A feature maps to the "small" tier, the "large" tier
+    (the current model), "auto" or a registered model name, unless the
+    registry routes it explicitly. "auto" picks the small tier for short
+    prompts without heavy_words; the small tier falls back to the large one
+    when no small model is downloaded. Routes are named "feature:tier".
+    """
+    
+    def __init__(self, path, model_manager, samples=1000):
+        self.path = Path(path)
+        self.model_manager = model_manager
+        self.samples = samples
+        self.rules = DEFAULT_RULES
+        self.rules_mtime = None
+        self.heavy_pattern = None
+        self.latencies = {}  # route: deque of seconds, newest last
+        self.counts = {}  # route: requests recorded
+        self.models = {}  # route: model it last ran on
+        self.lock = threading.Lock()
+        self.load_rules()
+    
+    def load_rules(self):
+        """Re-read the rules file if it changed since it was last read."""
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self.rules_mtime and self.heavy_pattern is not None:
+            return
+        rules = json.loads(json.dumps(DEFAULT_RULES))
+        if mtime is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    custom = json.load(f)
+                for key, value in custom.items():
+                    if isinstance(value, dict) and isinstance(rules.get(key), dict):
+                        rules[key].update(value)
+                    else:
+                        rules[key] = value
+            except (OSError, ValueError) as e:
+                print(f"Error reading routing rules: {e}")
+        words = "|".join(re.escape(word) for word in rules["auto"]["heavy_words"])
+        self.heavy_pattern = re.compile(rf"\b(?:{words})\b", re.IGNORECASE) if words else None
+        self.rules = rules
+        self.rules_mtime = mtime
+    
+    def small_model(self):
+        """The small tier's model if it is downloaded, else None."""
+        registry = self.model_manager.registry
+        large = self.model_manager.current_model_name or registry.default_model
+        name = self.rules.get("small_model")
+        if name:
+            if name in registry.models and self.model_manager.is_model_available(name):
+                return name
+            return None
+        downloaded = [model for model in registry.names()
+                      if model != large and self.model_manager.is_model_available(model)]
+        if not downloaded:
+            return None
+        smallest = min(downloaded, key=self.model_manager.model_memory)
+        if self.model_manager.model_memory(smallest) >= self.model_manager.model_memory(large):
+            return None
+        return smallest
+    
+    def is_light(self, prompt):
+        """Whether "auto" sends prompt to the small tier."""
+        auto = self.rules["auto"]
+        if auto["max_prompt_tokens"] is not None and estimate_tokens(prompt) > auto["max_prompt_tokens"]:
+            return False
+        if auto["max_lines"] is not None and prompt.count("\n") + 1 > auto["max_lines"]:
+            return False
+        return self.heavy_pattern is None or self.heavy_pattern.search(prompt) is None
+    
+    def choose(self, feature, prompt=""):
+        """The route name and the model to run prompt on, None meaning the current model."""
+        explicit = self.model_manager.model_for_feature(feature)
+        if explicit is not None:
+            return f"{feature}:{explicit}", explicit
+        self.load_rules()
+        target = self.rules["features"].get(feature, self.rules["default"])
+        if target == "auto":
+            target = "small" if self.is_light(prompt) else "large"
+        if target == "small":
+            model = self.small_model()
+            return (f"{feature}:small", model) if model is not None else (f"{feature}:large", None)
+        if target == "large" or target not in self.model_manager.registry.models:
+            return f"{feature}:large", None
+        return f"{feature}:{target}", target
+    
+    def record(self, route, seconds, model=None):
+        """Add a request's generation time to its route's metrics."""
+        with self.lock:
+            if route not in self.latencies:
+                self.latencies[route] = deque(maxlen=self.samples)
+                self.counts[route] = 0
+            self.latencies[route].append(seconds)
+            self.counts[route] += 1
+            self.models[route] = model
+    
+    def stats(self):
+        """Per-route request counts and latency (mean, p50, p95, max in seconds) over recent requests."""
+        with self.lock:
+            routes = {route: (sorted(samples), self.counts[route], self.models[route])
+                      for route, samples in self.latencies.items()}
+        stats = {}
+        for route, (samples, count, model) in sorted(routes.items()):
+            stats[route] = {
+                "model": model,
+                "requests": count,
+                "mean": round(sum(samples) / len(samples), 4),
+                "p50": round(samples[len(samples) // 2], 4),
+                "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+                "max": round(samples[-1], 4)
+            }
+        return stats
\ No newline at end of file
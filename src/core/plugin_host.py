@@ -0,0 +1,54 @@
+"""Run one plugin in its own process for PluginManager.
+
+Usage: python plugin_host.py PLUGIN_FILE [MEMORY_MB]
+
+Requests are read from stdin as JSON lines {"hook": name, "args": [...]}
+and each is answered on stdout with {"result": value} or {"error": message}.
+"""
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+def limit_memory(megabytes):
+    try:
+        import resource
+    except ImportError:
+        return  # not available on Windows
+    limit = megabytes * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def load_module(path):
+    path = Path(path)
+    # A package plugin is loaded with its directory so its relative imports resolve
+    locations = [str(path.parent)] if path.name == "__init__.py" else None
+    spec = importlib.util.spec_from_file_location("sandboxed_plugin", path, submodule_search_locations=locations)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["sandboxed_plugin"] = module
+    spec.loader.exec_module(module)
+    return module
+
+def main():
+    path = sys.argv[1]
+    if len(sys.argv) > 2 and int(sys.argv[2]):
+        limit_memory(int(sys.argv[2]))
+    # Anything the plugin prints must not be mistaken for a reply
+    replies = sys.stdout
+    sys.stdout = sys.stderr
+    module = None
+    
+    for line in sys.stdin:
+        request = json.loads(line)
+        try:
+            if module is None:
+                module = load_module(path)
+            reply = json.dumps({"result": getattr(module, request["hook"])(*request["args"])})
+        except MemoryError:
+            reply = json.dumps({"error": "Plugin exceeded its memory limit"})
+        except Exception as e:
+            reply = json.dumps({"error": f"{type(e).__name__}: {e}"})
+        replies.write(reply + "\n")
+        replies.flush()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,40 +1,298 @@
 from PyQt6.QtCore import QObject, pyqtSignal
 from pathlib import Path
+import ast
+import importlib.util
+import json
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+
+HOOKS = ("pre_chat", "post_chat")
+INFO_KEYS = ("description", "version", "author", "sandbox", "timeout", "memory_mb")
+HOST_SCRIPT = Path(__file__).with_name("plugin_host.py")
+
+def entry_file(path):
+    """The file holding a plugin's hooks: the module itself or a package's __init__.py."""
+    path = Path(path)
+    return path / "__init__.py" if path.is_dir() else path
+
+def read_plugin_info(path):
+    """Manifest entry for a plugin file or package, read with ast so none of its code runs.
+    
+    Metadata comes from a module-level PLUGIN_INFO dict literal and the hooks
+    from top-level functions named like them. Raises ValueError if the code
+    does not parse or defines no hooks.
+    """
+    source_path = entry_file(path)
+    try:
+        tree = ast.parse(source_path.read_text(encoding="utf-8"))
+    except (OSError, UnicodeDecodeError, SyntaxError) as e:
+        raise ValueError(f"Cannot read plugin {source_path}: {e}")
+    info = {}
+    hooks = []
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == "PLUGIN_INFO"
+                                                for target in node.targets):
+            try:
+                value = ast.literal_eval(node.value)
+            except ValueError:
+                raise ValueError("PLUGIN_INFO must be a dict literal")
+            if isinstance(value, dict):
+                info = {key: value[key] for key in INFO_KEYS if key in value}
+        elif isinstance(node, ast.FunctionDef) and node.name in HOOKS:
+            hooks.append(node.name)
+    if not hooks:
+        raise ValueError(f"Plugin defines none of the hooks {', '.join(HOOKS)}")
+    return {"sandbox": False, "timeout": 2.0, "memory_mb": 256, **info, "hooks": hooks}
+
+class SandboxedPlugin:
+    """A plugin running in a child process, limited in time per call and in memory.
+    
+    The process is started on the first call and kept for later ones. A call
+    running past timeout kills it, and the next call starts a fresh one.
+    """
+    
+    def __init__(self, path, timeout=2.0, memory_mb=256):
+        self.path = Path(path)
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.process = None
+        self.replies = None
+        self.lock = threading.Lock()
+    
+    def start(self):
+        self.process = subprocess.Popen(
+            [sys.executable, str(HOST_SCRIPT), str(self.path), str(self.memory_mb)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, encoding="utf-8"
+        )
+        self.replies = queue.Queue()
+        threading.Thread(target=self.read_replies, args=(self.process, self.replies), daemon=True).start()
+    
+    @staticmethod
+    def read_replies(process, replies):
+        for line in process.stdout:
+            replies.put(line)
+        replies.put(None)  # the process exited
+    
+    def call(self, hook, *args):
+        with self.lock:
+            if self.process is None or self.process.poll() is not None:
+                self.start()
+            try:
+                self.process.stdin.write(json.dumps({"hook": hook, "args": args}) + "\n")
+                self.process.stdin.flush()
+                line = self.replies.get(timeout=self.timeout)
+            except queue.Empty:
+                self.stop()
+                raise TimeoutError(f"Plugin did not answer within {self.timeout}s")
+            except OSError:
+                line = None
+            if line is None:
+                self.stop()
+                raise RuntimeError("Plugin process exited")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply["result"]
+    
+    def stop(self):
+        if self.process is None:
+            return
+        self.process.kill()
+        self.process.wait()
+        self.process.stdin.close()
+        self.process.stdout.close()
+        self.process = None
 
 class PluginManager(QObject):
-    """Manages application plugins."""
+    """Manages application plugins.
+    
+    A plugin is a .py file or package in plugins_dir defining hook functions:
+    pre_chat(message) returns the message to send and post_chat(response,
+    message) the response to show. plugins.json indexes their metadata so
+    that listing plugins never imports them; an enabled plugin is imported on
+    its first hook call, in-process or, with "sandbox": true in its
+    PLUGIN_INFO, in a child process limited by "timeout" and "memory_mb".
+    """
     
     plugin_loaded = pyqtSignal(str)  # plugin name
     plugin_unloaded = pyqtSignal(str)  # plugin name
     plugin_error = pyqtSignal(str, str)  # plugin name, error message
     
-    def __init__(self):
+    def __init__(self, plugins_dir="plugins"):
         super().__init__()
-        self.plugins_dir = Path("plugins")
+        self.plugins_dir = Path(plugins_dir)
         self.plugins_dir.mkdir(exist_ok=True)
-        self.loaded_plugins = {}
+        self.manifest_path = self.plugins_dir / "plugins.json"
+        self.manifest = self.load_manifest()
+        self.loaded_plugins = {}  # name: module or SandboxedPlugin
+        self.lock = threading.RLock()
+        self.scan()
+    
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def save_manifest(self):
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=4)
+    
+    def scan(self):
+        """Bring the manifest up to date with plugins_dir, re-reading only changed plugins."""
+        found = {}
+        for path in self.plugins_dir.iterdir():
+            if path.name.startswith(("_", ".")):
+                continue
+            if (path.is_file() and path.suffix == ".py") or (path / "__init__.py").is_file():
+                found[path.stem if path.is_file() else path.name] = path
+        
+        changed = False
+        for name in [name for name in self.manifest if name not in found]:
+            self.release(name)
+            del self.manifest[name]
+            changed = True
+        for name, path in found.items():
+            entry = self.manifest.get(name, {})
+            mtime = entry_file(path).stat().st_mtime_ns
+            if entry.get("mtime") == mtime:
+                continue
+            self.release(name)
+            changed = True
+            try:
+                info = read_plugin_info(path)
+            except ValueError as e:
+                print(f"Error indexing plugin {name}: {e}")
+                self.manifest.pop(name, None)
+                continue
+            self.manifest[name] = {**info, "module": entry_file(path).relative_to(self.plugins_dir).as_posix(),
+                                   "mtime": mtime, "enabled": entry.get("enabled", False)}
+        if changed:
+            self.save_manifest()
+    
+    def install_plugin(self, file_path):
+        """Copy a plugin file or package into plugins_dir and index it; returns its name."""
+        source = Path(file_path)
+        read_plugin_info(source)  # refuse anything that is not a plugin before copying
+        name = source.stem if source.is_file() else source.name
+        self.release(name)
+        target = self.plugins_dir / source.name
+        if source.is_dir():
+            shutil.copytree(source, target, dirs_exist_ok=True)
+        else:
+            shutil.copy2(source, target)
+        self.manifest.pop(name, None)  # re-read even if the copy kept the mtime
+        self.scan()
+        if name not in self.manifest:
+            raise ValueError(f"Plugin {name} could not be indexed")
+        return name
+    
+    def remove_plugin(self, plugin_name):
+        """Unload a plugin and delete it from plugins_dir."""
+        self.unload_plugin(plugin_name)
+        entry = self.manifest.pop(plugin_name, None)
+        if entry is not None:
+            path = self.plugins_dir / entry["module"]
+            if path.name == "__init__.py":
+                shutil.rmtree(path.parent)
+            else:
+                path.unlink(missing_ok=True)
+            self.save_manifest()
     
     def load_plugin(self, plugin_name):
-        """Load a plugin (placeholder)."""
+        """Enable a plugin; its code is imported when a hook first needs it."""
         try:
-            print(f"Would load plugin: {plugin_name}")
+            if plugin_name not in self.manifest:
+                raise KeyError(f"Unknown plugin: {plugin_name}")
+            self.manifest[plugin_name]["enabled"] = True
+            self.save_manifest()
             self.plugin_loaded.emit(plugin_name)
         except Exception as e:
             print(f"Error loading plugin: {e}")
             self.plugin_error.emit(plugin_name, str(e))
     
     def unload_plugin(self, plugin_name):
-        """Unload a plugin (placeholder)."""
+        """Disable a plugin and drop its module or process."""
         try:
-            print(f"Would unload plugin: {plugin_name}")
+            self.release(plugin_name)
+            if plugin_name in self.manifest:
+                self.manifest[plugin_name]["enabled"] = False
+                self.save_manifest()
             self.plugin_unloaded.emit(plugin_name)
         except Exception as e:
             print(f"Error unloading plugin: {e}")
             self.plugin_error.emit(plugin_name, str(e))
     
+    def release(self, plugin_name):
+        with self.lock:
+            plugin = self.loaded_plugins.pop(plugin_name, None)
+        if isinstance(plugin, SandboxedPlugin):
+            plugin.stop()
+        sys.modules.pop(f"plugins.{plugin_name}", None)
+    
+    def shutdown(self):
+        for name in list(self.loaded_plugins):
+            self.release(name)
+    
+    def import_plugin(self, plugin_name):
+        """The plugin's module, or its SandboxedPlugin, importing it on first use."""
+        with self.lock:
+            plugin = self.loaded_plugins.get(plugin_name)
+            if plugin is not None:
+                return plugin
+            entry = self.manifest[plugin_name]
+            path = self.plugins_dir / entry["module"]
+            if entry.get("sandbox"):
+                plugin = SandboxedPlugin(path, entry["timeout"], entry["memory_mb"])
+            else:
+                module_name = f"plugins.{plugin_name}"
+                locations = [str(path.parent)] if path.name == "__init__.py" else None
+                spec = importlib.util.spec_from_file_location(module_name, path, submodule_search_locations=locations)
+                plugin = importlib.util.module_from_spec(spec)
+                sys.modules[module_name] = plugin  # lets a package import its own submodules
+                try:
+                    spec.loader.exec_module(plugin)
+                except BaseException:
+                    del sys.modules[module_name]
+                    raise
+            self.loaded_plugins[plugin_name] = plugin
+            return plugin
+    
+    def call_hook(self, plugin_name, hook, *args):
+        plugin = self.import_plugin(plugin_name)
+        if isinstance(plugin, SandboxedPlugin):
+            return plugin.call(hook, *args)
+        return getattr(plugin, hook)(*args)
+    
+    def run_hook(self, hook, value, *args):
+        """Pass value through hook of each enabled plugin, in name order.
+        
+        A plugin that fails, times out or returns something other than a
+        string leaves the value unchanged.
+        """
+        # Copied first, as hooks run on the generation worker while the UI may rescan
+        names = sorted(name for name, entry in list(self.manifest.items())
+                       if entry.get("enabled") and hook in entry["hooks"])
+        for name in names:
+            try:
+                result = self.call_hook(name, hook, value, *args)
+            except Exception as e:
+                print(f"Error in plugin {name}: {e}")
+                self.plugin_error.emit(name, str(e))
+                continue
+            if isinstance(result, str):
+                value = result
+        return value
+    
     def get_available_plugins(self):
-        """Get list of available plugins (placeholder)."""
-        return []  # Return empty list for now
+        """Installed plugins and their metadata, with "status" active or inactive."""
+        self.scan()
+        return {name: {**entry, "status": "active" if entry.get("enabled") else "inactive"}
+                for name, entry in sorted(self.manifest.items())}
     
     def get_loaded_plugins(self):
         """Get list of currently loaded plugins."""
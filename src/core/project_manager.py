@@ -1,15 +1,25 @@
 from pathlib import Path
 import json
 import shutil
+import threading
 from PyQt6.QtCore import QObject, pyqtSignal
+from .code_index import CodeIndex
+from .embedding_index import EmbeddingIndex
+from .file_watcher import CREATED, MODIFIED, DELETED
 
 class Project:
     def __init__(self, name, path, description=""):
         self.name = name
         self.path = Path(path)
         self.description = description
-        self.files = []
+        self.index = None
+        self.embeddings = None
         self.settings = {}
+    
+    @property
+    def files(self):
+        """Indexed source files of the project."""
+        return self.index.paths() if self.index is not None else []
         
     def to_dict(self):
         return {
@@ -29,6 +39,7 @@ class ProjectManager(QObject):
     project_opened = pyqtSignal(object)  # Emits Project object
     project_closed = pyqtSignal()
     project_saved = pyqtSignal()
+    index_ready = pyqtSignal(object)  # Emits CodeIndex once built
     
     def __init__(self):
         super().__init__()
@@ -36,6 +47,7 @@ class ProjectManager(QObject):
         self.workspace_dir.mkdir(exist_ok=True)
         self.current_project = None
         self.recent_projects = self.load_recent_projects()
+        self.embedder = None  # embed(texts) for retrieval, e.g. the model backend's
         
     def load_recent_projects(self):
         config_file = Path("config/recent_projects.json")
@@ -67,7 +79,9 @@ class ProjectManager(QObject):
         with open(project_path / "project.json", 'w') as f:
             json.dump(project.to_dict(), f, indent=4)
             
+        self.close_index()
         self.current_project = project
+        self.open_index(project)
         self.add_to_recent_projects(str(project_path))
         self.project_opened.emit(project)
         return project
@@ -85,7 +99,9 @@ class ProjectManager(QObject):
             project_data = json.load(f)
             
         project = Project.from_dict(project_data)
+        self.close_index()
         self.current_project = project
+        self.open_index(project)
         self.add_to_recent_projects(str(path))
         self.project_opened.emit(project)
         return project
@@ -93,6 +109,7 @@ class ProjectManager(QObject):
     def close_project(self):
         if self.current_project:
             self.save_project()
+            self.close_index()
             self.current_project = None
             self.project_closed.emit()
             
@@ -110,4 +127,51 @@ class ProjectManager(QObject):
             self.recent_projects.remove(path)
         self.recent_projects.insert(0, path)
         self.recent_projects = self.recent_projects[:10]  # Keep only 10 most recent
-        self.save_recent_projects() 
\ No newline at end of file
+        self.save_recent_projects()
+    
+    @property
+    def index(self):
+        return self.current_project.index if self.current_project else None
+    
+    @property
+    def embeddings(self):
+        return self.current_project.embeddings if self.current_project else None
+    
+    def open_index(self, project):
+        """Load the project's indexes and bring them up to date in the background."""
+        project.index = CodeIndex(project.path)
+        if self.embedder is not None:
+            project.embeddings = EmbeddingIndex(project.path, project.index.index_dir / "embeddings", self.embedder)
+        index, embeddings = project.index, project.embeddings
+        
+        def build():
+            index.build()
+            self.index_ready.emit(index)
+            if embeddings is not None:
+                try:
+                    embeddings.sync(index)
+                except Exception as e:
+                    print(f"Error embedding project files: {e}")
+        
+        threading.Thread(target=build, daemon=True).start()
+    
+    def close_index(self):
+        if self.current_project and self.current_project.index is not None:
+            self.current_project.index.close()
+            self.current_project.index = None
+        if self.current_project and self.current_project.embeddings is not None:
+            self.current_project.embeddings.close()
+            self.current_project.embeddings = None
+    
+    def track_files(self, file_manager):
+        """Keep the open project's index in step with file changes, ours and external."""
+        file_manager.file_created.connect(lambda path: self.update_index(CREATED, path))
+        file_manager.file_modified.connect(lambda path: self.update_index(MODIFIED, path))
+        file_manager.file_deleted.connect(lambda path: self.update_index(DELETED, path))
+    
+    def update_index(self, change, path):
+        if self.index is not None:
+            self.index.update([(change, path)])
+            # Changed files are re-embedded once a burst of changes settles
+            if self.embeddings is not None:
+                self.embeddings.schedule_sync(self.index)
\ No newline at end of file
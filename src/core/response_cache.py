@@ -0,0 +1,149 @@
+from pathlib import Path
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import threading
+import time
+
+class ResponseCache:
+    """Caches model responses in an in-memory LRU with an optional disk tier."""
+    
+    def __init__(self, max_entries=256, cache_dir=None, max_disk_bytes=100 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.entries = OrderedDict()  # key: response
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.disk_index = {}  # key: (size, last access)
+        self.disk_bytes = 0
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self.load_disk_index()
+    
+    @staticmethod
+    def make_key(model_name, template, params, code, **fields):
+        """Build a cache key from everything that affects the response."""
+        payload = json.dumps({
+            "model": model_name,
+            "template": hashlib.sha256(template.encode("utf-8")).hexdigest(),
+            "params": params,
+            "code": hashlib.sha256(code.encode("utf-8")).hexdigest(),
+            "fields": fields
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key):
+        """Return the cached response for key, or None."""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            
+            response = self.read_from_disk(key)
+            if response is not None:
+                self.remember(key, response)
+                self.hits += 1
+                self.disk_hits += 1
+                return response
+            
+            self.misses += 1
+            return None
+    
+    def put(self, key, response):
+        """Store a response in both tiers."""
+        with self.lock:
+            self.remember(key, response)
+            self.write_to_disk(key, response)
+    
+    def clear(self):
+        """Drop every cached response."""
+        with self.lock:
+            self.entries.clear()
+            for key in list(self.disk_index):
+                self.remove_from_disk(key)
+    
+    def stats(self):
+        """Get hit/miss counters and cache sizes."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self.entries),
+                "disk_entries": len(self.disk_index),
+                "disk_bytes": self.disk_bytes
+            }
+    
+    def remember(self, key, response):
+        self.entries[key] = response
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+    
+    def entry_path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.json"
+    
+    def load_disk_index(self):
+        """Index the disk tier once so eviction never has to rescan it."""
+        for path in self.cache_dir.glob("*/*.json"):
+            stat = path.stat()
+            self.disk_index[path.stem] = (stat.st_size, stat.st_mtime)
+            self.disk_bytes += stat.st_size
+    
+    def read_from_disk(self, key):
+        if not self.cache_dir or key not in self.disk_index:
+            return None
+        path = self.entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                response = json.load(f)["response"]
+        except (OSError, ValueError, KeyError):
+            self.remove_from_disk(key)
+            return None
+        
+        # Touch the entry so eviction drops least recently used files first
+        size, _ = self.disk_index[key]
+        now = time.time()
+        os.utime(path, (now, now))
+        self.disk_index[key] = (size, now)
+        return response
+    
+    def write_to_disk(self, key, response):
+        if not self.cache_dir:
+            return
+        path = self.entry_path(key)
+        path.parent.mkdir(exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"response": response}, f)
+        
+        if key in self.disk_index:
+            self.disk_bytes -= self.disk_index[key][0]
+        size = path.stat().st_size
+        self.disk_index[key] = (size, time.time())
+        self.disk_bytes += size
+        self.evict_disk()
+    
+    def remove_from_disk(self, key):
+        size, _ = self.disk_index.pop(key, (0, 0))
+        self.disk_bytes -= size
+        try:
+            self.entry_path(key).unlink()
+        except OSError:
+            pass
+    
+    def evict_disk(self):
+        """Remove least recently used files until the disk tier fits its budget."""
+        if self.disk_bytes <= self.max_disk_bytes:
+            return
+        for key in sorted(self.disk_index, key=lambda k: self.disk_index[k][1]):
+            self.remove_from_disk(key)
+            if self.disk_bytes <= self.max_disk_bytes:
+                break
\ No newline at end of file
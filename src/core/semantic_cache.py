@@ -0,0 +1,122 @@
+from collections import OrderedDict
+import threading
+import time
+import numpy as np
+
+class SemanticCache:
+    """Answers reused for questions close in meaning to ones already answered.
+    
+    Prompts are embedded with embed (a backend's embed call) and kept as
+    normalised rows of a float32 matrix, so the nearest cached prompt is
+    found with one matrix-vector product. A lookup hits when its cosine
+    similarity reaches threshold. Entries expire ttl seconds after they are
+    stored, and at most max_entries are kept with the least recently used
+    dropped first. Each entry belongs to the model that gave the answer, and
+    lookups only match entries of the model asked for.
+    """
+    
+    def __init__(self, embed, threshold=0.92, ttl=24 * 3600, max_entries=1000):
+        self.embed = embed
+        self.threshold = threshold
+        self.ttl = ttl  # seconds, or None to keep entries until evicted
+        self.max_entries = max_entries
+        self.model_ids = {}  # model name: id stored per row
+        self.row_models = np.full(max_entries, -1)  # id of the model each row's answer came from
+        self.vectors = None  # (max_entries, dimension), allocated on the first put
+        self.valid = np.zeros(max_entries, dtype=bool)
+        self.created = np.zeros(max_entries)
+        self.entries = OrderedDict()  # row: (prompt, answer), least recently used first
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def embed_prompt(self, prompt):
+        vector = np.asarray(self.embed(prompt), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def lookup(self, prompt, model_name=None):
+        """The cached answer nearest to prompt as {"prompt", "answer", "similarity"}, or None."""
+        vector = self.embed_prompt(prompt)
+        with self.lock:
+            self.expire()
+            row, similarity = self.nearest(vector, self.model_id(model_name))
+            if row is None or similarity < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(row)
+            cached_prompt, answer = self.entries[row]
+            return {"prompt": cached_prompt, "answer": answer, "similarity": similarity}
+    
+    def put(self, prompt, answer, model_name=None):
+        """Cache the answer to prompt, replacing the entry for the same prompt if there is one."""
+        vector = self.embed_prompt(prompt)
+        with self.lock:
+            model_id = self.model_id(model_name)
+            if self.vectors is None or self.vectors.shape[1] != len(vector):
+                self.clear()
+                self.vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+            self.expire()
+            row, similarity = self.nearest(vector, model_id)
+            if row is None or similarity < 1 - 1e-6:
+                row = self.free_row()
+            self.vectors[row] = vector
+            self.valid[row] = True
+            self.row_models[row] = model_id
+            self.created[row] = time.time()
+            self.entries[row] = (prompt, answer)
+            self.entries.move_to_end(row)
+    
+    def model_id(self, model_name):
+        return self.model_ids.setdefault(model_name, len(self.model_ids))
+    
+    def nearest(self, vector, model_id):
+        """The row of model_id's entries nearest to vector and its similarity."""
+        if self.vectors is None or not self.entries or len(vector) != self.vectors.shape[1]:
+            return None, 0.0
+        candidates = self.valid & (self.row_models == model_id)
+        if not candidates.any():
+            return None, 0.0
+        scores = self.vectors @ vector
+        scores[~candidates] = -np.inf
+        row = int(np.argmax(scores))
+        return row, float(scores[row])
+    
+    def free_row(self):
+        if len(self.entries) >= self.max_entries:
+            row, _ = self.entries.popitem(last=False)
+            self.valid[row] = False
+            self.evictions += 1
+            return row
+        return int(np.argmin(self.valid))
+    
+    def expire(self):
+        if self.ttl is None or not self.entries:
+            return
+        expired = np.flatnonzero(self.valid & (self.created <= time.time() - self.ttl))
+        for row in expired:
+            self.valid[row] = False
+            del self.entries[int(row)]
+        self.expirations += len(expired)
+    
+    def clear(self):
+        """Drop every cached answer."""
+        with self.lock:
+            self.valid[:] = False
+            self.entries.clear()
+    
+    def stats(self):
+        """Get hit/miss counters, the hit rate and the number of entries."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self.entries),
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
\ No newline at end of file
@@ -0,0 +1,160 @@
+import ast
+
+NESTING_NODES = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.With, ast.AsyncWith, ast.Try)
+# match (3.10) and except* (3.11) only exist on newer Pythons
+if hasattr(ast, "Match"):
+    NESTING_NODES += (ast.Match,)
+if hasattr(ast, "TryStar"):
+    NESTING_NODES += (ast.TryStar,)
+CASE_NODES = (ast.match_case,) if hasattr(ast, "match_case") else ()
+
+SCOPE_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+def decision_points(node):
+    """How many extra paths through the code a node adds (McCabe)."""
+    if isinstance(node, (ast.If, ast.For, ast.AsyncFor, ast.While, ast.IfExp, ast.ExceptHandler, ast.Assert)):
+        return 1
+    if isinstance(node, ast.BoolOp):
+        return len(node.values) - 1
+    if isinstance(node, ast.comprehension):
+        return 1 + len(node.ifs)
+    if isinstance(node, CASE_NODES):
+        return 1
+    return 0
+
+def measure(node):
+    """Cyclomatic complexity and maximum block nesting of a scope, excluding nested scopes."""
+    complexity = 1
+    max_depth = 0
+    
+    def visit(parent, depth):
+        nonlocal complexity, max_depth
+        for child in ast.iter_child_nodes(parent):
+            if isinstance(child, SCOPE_NODES):
+                continue
+            complexity += decision_points(child)
+            child_depth = depth
+            # An elif is written at the depth of its if
+            is_elif = (isinstance(child, ast.If) and isinstance(parent, ast.If)
+                       and parent.orelse == [child])
+            if isinstance(child, NESTING_NODES) and not is_elif:
+                child_depth += 1
+            max_depth = max(max_depth, child_depth)
+            visit(child, child_depth)
+    
+    visit(node, 0)
+    return complexity, max_depth
+
+def expression_text(node, code):
+    """An expression's source, normalised by ast.unparse where there is one (3.9+)."""
+    if hasattr(ast, "unparse"):
+        return ast.unparse(node)
+    return ast.get_source_segment(code, node)
+
+def argument_names(arguments):
+    names = [arg.arg for arg in arguments.posonlyargs + arguments.args]
+    if arguments.vararg:
+        names.append("*" + arguments.vararg.arg)
+    names.extend(arg.arg for arg in arguments.kwonlyargs)
+    if arguments.kwarg:
+        names.append("**" + arguments.kwarg.arg)
+    return names
+
+def analyze_python(code):
+    """Structure and complexity facts for Python source, computed with ast.
+    
+    Returns {"structure": ..., "complexity": ...}, or None if the code does
+    not parse. Cyclomatic complexity is McCabe's: one plus each branch,
+    loop, exception handler, boolean operator and comprehension clause.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+    
+    classes = []
+    functions = []
+    cyclomatic = {}
+    nesting = {}
+    
+    def visit(body, scope, in_class):
+        for node in body:
+            if isinstance(node, ast.ClassDef):
+                qualname = f"{scope}.{node.name}" if scope else node.name
+                classes.append({
+                    "name": qualname,
+                    "line": node.lineno,
+                    "end_line": node.end_lineno,
+                    "bases": [expression_text(base, code) for base in node.bases],
+                    "methods": [child.name for child in node.body
+                                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))]
+                })
+                visit(node.body, qualname, True)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                qualname = f"{scope}.{node.name}" if scope else node.name
+                complexity, depth = measure(node)
+                functions.append({
+                    "name": qualname,
+                    "line": node.lineno,
+                    "end_line": node.end_lineno,
+                    "args": argument_names(node.args),
+                    "async": isinstance(node, ast.AsyncFunctionDef),
+                    "method": in_class,
+                    "decorators": [expression_text(decorator, code) for decorator in node.decorator_list],
+                    "docstring": ast.get_docstring(node) is not None
+                })
+                cyclomatic[qualname] = complexity
+                nesting[qualname] = depth
+                visit(node.body, qualname, False)
+            else:
+                # Definitions inside if/try blocks still belong to this scope
+                for child in ast.iter_child_nodes(node):
+                    if isinstance(child, SCOPE_NODES):
+                        visit([child], scope, in_class)
+    
+    visit(tree.body, "", False)
+    
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append("." * node.level + (node.module or ""))
+    global_names = [target.id for node in tree.body if isinstance(node, (ast.Assign, ast.AnnAssign))
+                    for target in (node.targets if isinstance(node, ast.Assign) else [node.target])
+                    if isinstance(target, ast.Name)]
+    lines = code.splitlines()
+    module_complexity, module_depth = measure(tree)
+    
+    values = list(cyclomatic.values())
+    return {
+        "structure": {
+            "classes": classes,
+            "functions": functions,
+            "imports": sorted(set(imports)),
+            "globals": global_names,
+            "lines": len(lines),
+            "code_lines": sum(1 for line in lines if line.strip() and not line.strip().startswith("#"))
+        },
+        "complexity": {
+            "cyclomatic": cyclomatic,
+            "nesting_depth": nesting,
+            "module_cyclomatic": module_complexity,
+            "max_cyclomatic": max(values, default=module_complexity),
+            "average_cyclomatic": round(sum(values) / len(values), 2) if values else module_complexity,
+            "max_nesting_depth": max([module_depth, *nesting.values()])
+        }
+    }
+
+def summarize_facts(facts):
+    """A few lines describing the facts, for prompts."""
+    structure = facts["structure"]
+    complexity = facts["complexity"]
+    lines = [f"{structure['code_lines']} lines of code, imports: {', '.join(structure['imports']) or 'none'}"]
+    for cls in structure["classes"]:
+        lines.append(f"class {cls['name']}({', '.join(cls['bases'])}) with methods {', '.join(cls['methods']) or 'none'}")
+    for function in structure["functions"]:
+        lines.append(f"{function['name']}: cyclomatic complexity {complexity['cyclomatic'][function['name']]}, "
+                     f"nesting depth {complexity['nesting_depth'][function['name']]}"
+                     + ("" if function["docstring"] else ", no docstring"))
+    return "\n".join(lines)
\ No newline at end of file
@@ -0,0 +1,166 @@
+import json
+import re
+
+FENCED_BLOCK_PATTERN = re.compile(r"```(?:json|JSON)?[ \t]*\n(.*?)```", re.DOTALL)
+TRAILING_COMMA_PATTERN = re.compile(r",(\s*[}\]])")
+
+SCHEMAS = {
+    "analyze_code_structure": {
+        "type": "object",
+        "required": ["structure", "complexity", "issues", "best_practices"],
+        "properties": {
+            "structure": {"type": "object"},
+            "complexity": {"type": "object"},
+            "issues": {"type": "array", "items": {"type": ["string", "object"]}},
+            "best_practices": {"type": ["array", "object", "string"]}
+        }
+    },
+    "review_code_structure": {
+        "type": "object",
+        "required": ["issues", "best_practices"],
+        "properties": {
+            "issues": {"type": "array", "items": {"type": ["string", "object"]}},
+            "best_practices": {"type": ["array", "object", "string"]}
+        }
+    }
+}
+
+# Repeats the original prompt, as each attempt is a new one-off prompt without history
+REPAIR_TEMPLATE = """{prompt}
+
+Your previous answer was not valid JSON for the required schema.
+
+Problems:
+{errors}
+
+Previous answer:
+{response}
+
+Reply with only the corrected JSON object matching this schema:
+{schema}"""
+
+class StreamingJSONParser:
+    """Tracks a JSON value as it is generated, to stop as soon as it closes.
+    
+    feed() takes each streamed token and returns True once the first value
+    starting with one of opening has been closed, so it can be passed to
+    the generation worker as stop_when. Braces inside strings are ignored.
+    """
+    
+    def __init__(self, opening="{"):
+        self.opening = opening
+        self.chunks = []
+        self.length = 0
+        self.start = None
+        self.end = None
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+    
+    @property
+    def complete(self):
+        return self.end is not None
+    
+    def feed(self, chunk):
+        if self.end is not None:
+            return True
+        offset = self.length
+        self.chunks.append(chunk)
+        self.length += len(chunk)
+        for i, char in enumerate(chunk):
+            if self.start is None:
+                if char in self.opening:
+                    self.start = offset + i
+                    self.depth = 1
+            elif self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.end = offset + i + 1
+                    return True
+        return False
+    
+    def text(self):
+        """The value's text so far, or None if it has not started."""
+        if self.start is None:
+            return None
+        return "".join(self.chunks)[self.start:self.end]
+
+def loads_lenient(text):
+    """json.loads, retrying without trailing commas."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return json.loads(TRAILING_COMMA_PATTERN.sub(r"\1", text))
+
+def extract_json(text, opening="{"):
+    """Find and parse the JSON value in a model response.
+    
+    Tries fenced ```json blocks first, then the first balanced value in the
+    text (also closing a fence the model never finished). Raises ValueError
+    if nothing parses.
+    """
+    for block in FENCED_BLOCK_PATTERN.findall(text):
+        try:
+            return loads_lenient(block.strip())
+        except ValueError:
+            continue
+    parser = StreamingJSONParser(opening)
+    parser.feed(text)
+    candidate = parser.text()
+    if candidate is None:
+        raise ValueError("No JSON object found in the response")
+    if not parser.complete:
+        raise ValueError("The JSON object in the response is incomplete")
+    return loads_lenient(candidate)
+
+JSON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+    "null": type(None)
+}
+
+def validate(value, schema, path="$"):
+    """Check value against a JSON schema subset and return a list of problems.
+    
+    Supports type (a name or list of names), required, properties, items
+    and enum, which is what the feature schemas use.
+    """
+    errors = []
+    types = schema.get("type")
+    if types is not None:
+        names = [types] if isinstance(types, str) else types
+        # bool is an int in Python but not a JSON number
+        if not any(isinstance(value, JSON_TYPES[name]) and not (isinstance(value, bool) and name in ("number", "integer"))
+                   for name in names):
+            return [f"{path} should be {' or '.join(names)}"]
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path} should be one of {schema['enum']}")
+    if isinstance(value, dict):
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path} is missing \"{key}\"")
+        for key, subschema in schema.get("properties", {}).items():
+            if key in value:
+                errors.extend(validate(value[key], subschema, f"{path}.{key}"))
+    if isinstance(value, list) and "items" in schema:
+        for i, item in enumerate(value):
+            errors.extend(validate(item, schema["items"], f"{path}[{i}]"))
+    return errors
+
+def schema_instructions(schema):
+    return f"Respond with only a JSON object matching this schema, without any other text:\n{json.dumps(schema)}"
\ No newline at end of file
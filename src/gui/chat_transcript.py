@@ -0,0 +1,298 @@
+from collections import OrderedDict
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QApplication
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRectF, QPointF
+from PyQt6.QtGui import QTextLayout, QTextOption, QPalette, QPainter, QPen, QKeySequence
+
+class Message:
+    """One chat message; width, height and size cache its measured size."""
+    __slots__ = ("text", "is_user", "width", "height", "size")
+    
+    def __init__(self, text, is_user):
+        self.text = text
+        self.is_user = is_user
+        self.width = None  # viewport width the height was measured at
+        self.height = 0
+        self.size = None
+
+class TranscriptModel(QAbstractListModel):
+    """Chat messages kept as plain records for TranscriptView.
+    
+    Messages are addressed by their number in the conversation, counted
+    from the first message added; messages loaded before it with
+    prepend_messages() get negative numbers. Only the messages from first on
+    are rows of the model, so a view lays out a bounded window however long
+    the conversation is; show_earlier() and trim() move the start of the
+    window.
+    """
+    
+    IsUserRole = Qt.ItemDataRole.UserRole
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.messages = []
+        self.first = 0  # index in messages of row 0
+        self.offset = 0  # index in messages of message number 0
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.messages) - self.first
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        message = self.messages[self.first + index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return message.text
+        if role == self.IsUserRole:
+            return message.is_user
+        return None
+    
+    def message(self, row):
+        """The Message in a row."""
+        return self.messages[self.first + row]
+    
+    def text(self, number):
+        return self.messages[self.offset + number].text
+    
+    def add_message(self, text, is_user=True):
+        """Append a message and return its number."""
+        row = len(self.messages) - self.first
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.messages.append(Message(text, is_user))
+        self.endInsertRows()
+        return len(self.messages) - 1 - self.offset
+    
+    def add_messages(self, messages):
+        """Append (text, is_user) pairs in one insertion."""
+        messages = [Message(text, is_user) for text, is_user in messages]
+        if not messages:
+            return
+        row = len(self.messages) - self.first
+        self.beginInsertRows(QModelIndex(), row, row + len(messages) - 1)
+        self.messages.extend(messages)
+        self.endInsertRows()
+    
+    def prepend_messages(self, messages):
+        """Insert (text, is_user) pairs before every other message, as rows if row 0 is the first message."""
+        messages = [Message(text, is_user) for text, is_user in messages]
+        if not messages:
+            return
+        if self.first:
+            self.messages[:0] = messages
+            self.first += len(messages)
+        else:
+            self.beginInsertRows(QModelIndex(), 0, len(messages) - 1)
+            self.messages[:0] = messages
+            self.endInsertRows()
+        self.offset += len(messages)
+    
+    def set_text(self, number, text):
+        position = self.offset + number
+        message = self.messages[position]
+        message.text = text
+        message.width = None
+        if position >= self.first:
+            index = self.index(position - self.first)
+            self.dataChanged.emit(index, index)
+    
+    def append_text(self, number, chunk):
+        """Append a chunk of streamed text to a message."""
+        self.set_text(number, self.text(number) + chunk)
+    
+    def show_earlier(self, count):
+        """Add up to count earlier messages to the top; returns how many were added."""
+        count = min(count, self.first)
+        if count:
+            self.beginInsertRows(QModelIndex(), 0, count - 1)
+            self.first -= count
+            self.endInsertRows()
+        return count
+    
+    def trim(self, rows):
+        """Drop the earliest rows so that at most rows remain."""
+        count = self.rowCount() - rows
+        if count > 0:
+            self.beginRemoveRows(QModelIndex(), 0, count - 1)
+            self.first += count
+            self.endRemoveRows()
+    
+    def clear(self):
+        self.beginResetModel()
+        self.messages = []
+        self.first = self.offset = 0
+        self.endResetModel()
+
+class MessageDelegate(QStyledItemDelegate):
+    """Paints messages as bubbles from cached QTextLayouts.
+    
+    A message's height is kept on it for the width it was measured at, so a
+    relayout after an append only measures the new message. Text layouts are
+    kept in a small LRU cache, which in practice holds the visible messages.
+    """
+    
+    MARGIN = 50  # indent on the side away from the speaker
+    PADDING_X = 10
+    PADDING_Y = 6
+    SPACING = 10
+    RADIUS = 10
+    
+    def __init__(self, view, model, cache_size=256):
+        super().__init__(view)
+        self.view = view
+        self.model = model
+        self.cache_size = cache_size
+        self.layouts = OrderedDict()  # (text, width): (QTextLayout, height)
+        self.viewport_width = 0
+    
+    def text_width(self):
+        return max(1, self.viewport_width - self.MARGIN - 2 * self.PADDING_X)
+    
+    def layout_text(self, text, width):
+        key = (text, width)
+        cached = self.layouts.get(key)
+        if cached is not None:
+            self.layouts.move_to_end(key)
+            return cached
+        
+        # QTextLayout breaks lines at U+2028, not at newlines
+        layout = QTextLayout(text.replace("\n", "\u2028"), self.view.font())
+        option = QTextOption()
+        option.setWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
+        layout.setTextOption(option)
+        height = 0.0
+        layout.beginLayout()
+        while True:
+            line = layout.createLine()
+            if not line.isValid():
+                break
+            line.setLineWidth(width)
+            line.setPosition(QPointF(0, height))
+            height += line.height()
+        layout.endLayout()
+        
+        cached = (layout, max(height, self.view.fontMetrics().height()))
+        self.layouts[key] = cached
+        if len(self.layouts) > self.cache_size:
+            self.layouts.popitem(last=False)
+        return cached
+    
+    def measure(self, message):
+        """Item size of a message at the viewport width, cached on the message."""
+        if message.width != self.viewport_width:
+            text_height = self.layout_text(message.text, self.text_width())[1]
+            message.height = int(text_height + 0.999) + 2 * self.PADDING_Y + self.SPACING
+            message.size = QSize(self.viewport_width, message.height)
+            message.width = self.viewport_width
+        return message.size
+    
+    def sizeHint(self, option, index):
+        # Called for every message on each relayout, so the cached size is returned directly
+        message = self.model.messages[self.model.first + index.row()]
+        if message.width == self.viewport_width:
+            return message.size
+        return self.measure(message)
+    
+    def paint(self, painter, option, index):
+        message = self.model.message(index.row())
+        layout, _ = self.layout_text(message.text, self.text_width())
+        
+        rect = QRectF(option.rect).adjusted(0, self.SPACING / 2, 0, -self.SPACING / 2)
+        palette = option.palette
+        if message.is_user:
+            rect.setLeft(rect.left() + self.MARGIN)
+            background = palette.color(QPalette.ColorRole.Highlight)
+            foreground = palette.color(QPalette.ColorRole.HighlightedText)
+        else:
+            rect.setRight(rect.right() - self.MARGIN)
+            background = palette.color(QPalette.ColorRole.Button)
+            foreground = palette.color(QPalette.ColorRole.Text)
+        
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.setPen(QPen(palette.color(QPalette.ColorRole.Text), 1))
+        else:
+            painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(background)
+        painter.drawRoundedRect(rect, self.RADIUS, self.RADIUS)
+        painter.setPen(foreground)
+        layout.draw(painter, QPointF(rect.left() + self.PADDING_X, rect.top() + self.PADDING_Y))
+        painter.restore()
+
+class TranscriptView(QListView):
+    """Chat transcript that only lays out and paints a window of recent messages.
+    
+    Messages live in a TranscriptModel rather than as widgets. Relayouts
+    ask the delegate for the size of every row, so the model exposes at most
+    window_size messages while following the conversation; scrolling to the
+    top reveals page_size earlier ones at a time, and once the model has no
+    more, asks load_earlier(count) for up to count (text, is_user) pairs
+    from before them. Selected messages can be copied with the usual
+    shortcut.
+    """
+    
+    def __init__(self, parent=None, window_size=500, page_size=100):
+        super().__init__(parent)
+        self.window_size = window_size
+        self.page_size = page_size
+        self.load_earlier = None
+        self.transcript = TranscriptModel(self)
+        self.setModel(self.transcript)
+        self.delegate = MessageDelegate(self, self.transcript)
+        self.delegate.viewport_width = self.viewport().width()
+        self.setItemDelegate(self.delegate)
+        self.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
+        self.verticalScrollBar().valueChanged.connect(self.on_scrolled)
+    
+    def resizeEvent(self, event):
+        # Also sent when the viewport resizes, e.g. as the scroll bar appears
+        self.delegate.viewport_width = self.viewport().width()
+        super().resizeEvent(event)
+    
+    def scroll_to_latest(self):
+        """Scroll to the newest message, dropping rows beyond the window above it."""
+        self.transcript.trim(self.window_size)
+        self.scrollToBottom()
+    
+    def on_scrolled(self, value):
+        scroll_bar = self.verticalScrollBar()
+        if value != scroll_bar.minimum():
+            return
+        old_maximum = scroll_bar.maximum()
+        if self.transcript.first:
+            self.transcript.show_earlier(self.page_size)
+        elif self.load_earlier is not None:
+            messages = self.load_earlier(self.page_size)
+            if len(messages) < self.page_size:
+                self.load_earlier = None  # nothing earlier is left
+            if not messages:
+                return
+            self.transcript.prepend_messages(messages)
+        else:
+            return
+        # Keep the same messages in view as rows are added above them
+        self.executeDelayedItemsLayout()
+        scroll_bar.setValue(value + scroll_bar.maximum() - old_maximum)
+    
+    def dataChanged(self, top_left, bottom_right, roles=()):
+        # QListView relayouts every row on dataChanged, which streamed text
+        # only needs when it wraps onto a new line
+        rows = range(top_left.row(), bottom_right.row() + 1)
+        for row in rows:
+            message = self.transcript.message(row)
+            old_height = message.height
+            if self.delegate.measure(message).height() != old_height:
+                super().dataChanged(top_left, bottom_right, roles)
+                return
+        for row in rows:
+            self.update(self.transcript.index(row))
+    
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.StandardKey.Copy):
+            rows = sorted(index.row() for index in self.selectedIndexes())
+            if rows:
+                QApplication.clipboard().setText("\n\n".join(self.transcript.message(row).text for row in rows))
+            return
+        super().keyPressEvent(event)
\ No newline at end of file
@@ -0,0 +1,283 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import bisect
+import os
+from PyQt6.QtCore import Qt, QAbstractItemModel, QModelIndex, pyqtSignal, pyqtSlot
+from core.ignore_rules import IgnoreRules
+from core.file_watcher import CREATED, DELETED
+
+class FileNode:
+    """One file or directory in the tree; children is None until the directory is scanned.
+    
+    child_keys holds the children's sort keys, in the same order, for bisect.
+    """
+    
+    __slots__ = ("name", "path", "is_dir", "parent", "children", "child_keys", "loading")
+    
+    def __init__(self, name, path, is_dir, parent=None):
+        self.name = name
+        self.path = path
+        self.is_dir = is_dir
+        self.parent = parent
+        self.children = None
+        self.child_keys = None
+        self.loading = False
+    
+    def sort_key(self):
+        return (not self.is_dir, self.name.lower(), self.name)
+
+def entry_key(entry):
+    name, is_dir = entry
+    return (not is_dir, name.lower(), name)
+
+class FileTreeModel(QAbstractItemModel):
+    """Lazily populated model of a project directory.
+    
+    Only expanded directories are read: a view asks canFetchMore when a
+    directory is expanded, and fetchMore scans it on a worker thread. The
+    sorted entries come back in batches of batch_size rows, so the view
+    stays responsive while a huge directory fills in. Paths matching the
+    project's IgnoreRules (.gitignore, node_modules, models/, ...) are
+    skipped. apply_changes keeps scanned directories in sync with
+    FileWatcher batches without rescanning them.
+    """
+    
+    PathRole = Qt.ItemDataRole.UserRole
+    
+    directory_loaded = pyqtSignal(str)
+    scan_finished = pyqtSignal(str, int, list, bool)  # directory, generation, entries, done
+    
+    def __init__(self, parent=None, batch_size=1000, max_workers=2):
+        super().__init__(parent)
+        self.batch_size = batch_size
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="file-tree")
+        self.root = None
+        self.ignore_rules = None
+        self.directories = {}  # path: FileNode, for directories only
+        self.pending_changes = {}  # directory being scanned: [(change, path)]
+        self.generation = 0
+        self.scan_finished.connect(self.on_scan_finished)
+    
+    def set_root(self, root, ignore_rules=None):
+        """Show the directory root, or nothing if root is None."""
+        self.beginResetModel()
+        # Scans still running for the old root are ignored when they report
+        self.generation += 1
+        self.directories = {}
+        self.pending_changes = {}
+        self.root = None
+        self.ignore_rules = None
+        if root is not None:
+            root = Path(root)
+            self.root = FileNode(root.name, str(root), True)
+            self.directories[self.root.path] = self.root
+            self.ignore_rules = ignore_rules or IgnoreRules(root)
+        self.endResetModel()
+        if self.root is not None:
+            self.fetch(self.root)
+    
+    def root_path(self):
+        return Path(self.root.path) if self.root is not None else None
+    
+    def close(self):
+        # Queued scans see the new generation and return without reading
+        self.generation += 1
+        self.executor.shutdown(wait=False)
+    
+    # Qt model interface
+    
+    def node(self, index):
+        return index.internalPointer() if index.isValid() else self.root
+    
+    def index(self, row, column, parent=QModelIndex()):
+        node = self.node(parent)
+        if node is None or node.children is None or column != 0 or not 0 <= row < len(node.children):
+            return QModelIndex()
+        return self.createIndex(row, column, node.children[row])
+    
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self.root:
+            return QModelIndex()
+        return self.createIndex(self.row_of(parent), 0, parent)
+    
+    def rowCount(self, parent=QModelIndex()):
+        node = self.node(parent)
+        if node is None or node.children is None:
+            return 0
+        return len(node.children)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+    
+    def hasChildren(self, parent=QModelIndex()):
+        node = self.node(parent)
+        if node is None or not node.is_dir:
+            return False
+        # Unscanned directories show an expander; scanning happens on expand
+        return node.children is None or bool(node.children)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return node.name
+        if role in (Qt.ItemDataRole.ToolTipRole, self.PathRole):
+            return node.path
+        return None
+    
+    def canFetchMore(self, parent):
+        node = self.node(parent)
+        return node is not None and node.is_dir and node.children is None and not node.loading
+    
+    def fetchMore(self, parent):
+        node = self.node(parent)
+        if node is not None and node.is_dir and node.children is None and not node.loading:
+            self.fetch(node)
+    
+    # Lookups
+    
+    def row_of(self, node):
+        """Row of node within its parent, found by binary search on the sort order."""
+        siblings = node.parent.children
+        row = bisect.bisect_left(node.parent.child_keys, node.sort_key())
+        while siblings[row] is not node:
+            row += 1
+        return row
+    
+    def index_for_path(self, path):
+        """Index of a scanned path, or an invalid index if it is not in the tree."""
+        node = self.find(path)
+        if node is None or node is self.root:
+            return QModelIndex()
+        return self.createIndex(self.row_of(node), 0, node)
+    
+    def find(self, path):
+        path = str(path)
+        if path in self.directories:
+            return self.directories[path]
+        parent = self.directories.get(str(Path(path).parent))
+        if parent is None or parent.children is None:
+            return None
+        name = Path(path).name
+        for node in parent.children:
+            if node.name == name:
+                return node
+        return None
+    
+    def file_path(self, index):
+        node = self.node(index)
+        return node.path if node is not None else None
+    
+    def is_dir(self, index):
+        node = self.node(index)
+        return node is not None and node.is_dir
+    
+    # Scanning
+    
+    def fetch(self, node):
+        node.loading = True
+        self.executor.submit(self.scan, node.path, self.ignore_rules, self.generation)
+    
+    def scan(self, directory, ignore_rules, generation):
+        """Read one directory on a worker thread and report it in sorted batches."""
+        if generation != self.generation:
+            return
+        entries = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if not ignore_rules.is_ignored_entry(directory, entry.name, is_dir):
+                        entries.append((entry.name, is_dir))
+        except OSError:
+            pass
+        entries.sort(key=entry_key)
+        try:
+            for start in range(0, len(entries), self.batch_size):
+                batch = entries[start:start + self.batch_size]
+                self.scan_finished.emit(directory, generation, batch, start + self.batch_size >= len(entries))
+            if not entries:
+                self.scan_finished.emit(directory, generation, [], True)
+        except RuntimeError:
+            pass  # the model was deleted while scanning
+    
+    @pyqtSlot(str, int, list, bool)
+    def on_scan_finished(self, directory, generation, entries, done):
+        node = self.directories.get(directory)
+        if generation != self.generation or node is None or not node.loading:
+            return
+        if node.children is None:
+            node.children = []
+            node.child_keys = []
+        if entries:
+            parent = self.index_for_path(directory)
+            first = len(node.children)
+            self.beginInsertRows(parent, first, first + len(entries) - 1)
+            for name, is_dir in entries:
+                node.children.append(self.make_node(node, name, is_dir))
+                node.child_keys.append(entry_key((name, is_dir)))
+            self.endInsertRows()
+        if done:
+            node.loading = False
+            # Replay changes that arrived while the directory was being read
+            self.apply_changes(self.pending_changes.pop(directory, []))
+            self.directory_loaded.emit(directory)
+    
+    def make_node(self, parent, name, is_dir):
+        child = FileNode(name, os.path.join(parent.path, name), is_dir, parent)
+        if is_dir:
+            self.directories[child.path] = child
+        return child
+    
+    # Incremental updates
+    
+    @pyqtSlot(list)
+    def apply_changes(self, changes):
+        """Apply a FileWatcher batch of (change, path) to the scanned part of the tree."""
+        if self.root is None:
+            return
+        for change, path in sorted(changes, key=lambda c: len(Path(c[1]).parts)):
+            parent = self.directories.get(str(Path(path).parent))
+            if parent is None or (parent.children is None and not parent.loading):
+                continue  # not scanned yet; it is read when expanded
+            if parent.loading:
+                self.pending_changes.setdefault(parent.path, []).append((change, path))
+            elif change == CREATED:
+                self.insert_path(parent, Path(path))
+            elif change == DELETED:
+                self.remove_path(parent, Path(path))
+    
+    def insert_path(self, parent, path):
+        if self.find(path) is not None or not os.path.lexists(path):
+            return
+        is_dir = path.is_dir() and not path.is_symlink()
+        if self.ignore_rules.is_ignored_entry(parent.path, path.name, is_dir):
+            return
+        key = entry_key((path.name, is_dir))
+        row = bisect.bisect(parent.child_keys, key)
+        self.beginInsertRows(self.index_for_path(parent.path), row, row)
+        parent.children.insert(row, self.make_node(parent, path.name, is_dir))
+        parent.child_keys.insert(row, key)
+        self.endInsertRows()
+    
+    def remove_path(self, parent, path):
+        node = self.find(path)
+        if node is None:
+            return
+        row = self.row_of(node)
+        self.beginRemoveRows(self.index_for_path(parent.path), row, row)
+        del parent.children[row]
+        del parent.child_keys[row]
+        self.endRemoveRows()
+        if node.is_dir:
+            prefix = node.path + os.sep
+            for directory in [d for d in self.directories if d == node.path or d.startswith(prefix)]:
+                del self.directories[directory]
+                self.pending_changes.pop(directory, None)
\ No newline at end of file
@@ -1,6 +1,7 @@
 from PyQt6.QtWidgets import QMainWindow, QTabWidget, QMessageBox, QVBoxLayout, QWidget, QStatusBar, QApplication
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QPalette, QColor
+from pathlib import Path
 from gui.tabs.chat_tab import ChatTab
 from gui.tabs.code_tab import CodeTab
 from gui.tabs.image_tab import ImageTab
@@ -11,10 +12,14 @@ from gui.download_dialog import DownloadProgressDialog
 from gui.theme_manager import ThemeManager
 from core.model_manager import ModelManager
 from core.chat_manager import ChatManager
+from core.chat_store import ChatStore
+from core.ai_features import AIFeatures
+from core.semantic_cache import SemanticCache
 from core.plugin_manager import PluginManager
 from core.voice_manager import VoiceManager
 from core.image_manager import ImageManager
 from core.project_manager import ProjectManager
+from core.file_manager import FileManager
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -25,11 +30,26 @@ class MainWindow(QMainWindow):
         # Initialize managers
         self.theme_manager = ThemeManager()
         self.model_manager = ModelManager(self)
-        self.chat_manager = ChatManager(self.model_manager)
         self.plugin_manager = PluginManager()
+        # Conversations are kept across sessions
+        self.chat_store = ChatStore(Path("workspace") / "chat_history.db")
+        self.chat_manager = ChatManager(self.model_manager, self.plugin_manager, self.chat_store,
+                                        self.create_semantic_cache())
+        self.model_manager.model_switched.connect(self.chat_manager.on_model_switched)
+        self.chat_manager.offer_cached_answers = (
+            self.model_manager.settings.get("semantic_cache", {}).get("mode") == "offer")
         self.voice_manager = VoiceManager()
         self.image_manager = ImageManager()
         self.project_manager = ProjectManager()
+        self.file_manager = FileManager()
+        self.project_manager.track_files(self.file_manager)
+        if self.model_manager.settings.get("retrieval"):
+            # Project files are embedded for retrieval-augmented prompts, on the worker
+            self.project_manager.embedder = self.model_manager.embed
+        # Prompts include related code from the open project's indexes
+        self.ai_features = AIFeatures(self.chat_manager)
+        self.project_manager.project_opened.connect(self.use_project_indexes)
+        self.project_manager.project_closed.connect(self.use_project_indexes)
         
         # Initialize UI
         self.setup_ui()
@@ -37,8 +57,23 @@ class MainWindow(QMainWindow):
         # Apply theme
         self.apply_theme()
         
-        # Check for model and prompt download if needed
-        self.check_model()
+        # Check for the model and start loading it once the window is shown
+        QTimer.singleShot(0, self.check_model)
+    
+    def use_project_indexes(self, project=None):
+        """Point AIFeatures' retrieval at the open project's indexes."""
+        self.ai_features.code_index = self.project_manager.index
+        self.ai_features.embedding_index = self.project_manager.embeddings
+    
+    def create_semantic_cache(self):
+        """The semantic answer cache if enabled in model settings, else None."""
+        options = self.model_manager.settings.get("semantic_cache", {})
+        if not options.get("enabled"):
+            return None
+        return SemanticCache(
+            self.model_manager.embed,
+            **{key: options[key] for key in ("threshold", "ttl", "max_entries") if key in options}
+        )
     
     def setup_ui(self):
         # Create central widget and layout
@@ -54,7 +89,8 @@ class MainWindow(QMainWindow):
         
         # Create tabs
         self.chat_tab = ChatTab(self.chat_manager, self.voice_manager, self.model_manager)
-        self.code_tab = CodeTab(self.chat_manager, self.project_manager, self.model_manager)
+        self.code_tab = CodeTab(self.chat_manager, self.project_manager, self.model_manager,
+                                self.file_manager, self.ai_features)
         self.image_tab = ImageTab(self.image_manager, self.model_manager)
         self.project_tab = ProjectTab(self.project_manager)
         self.plugin_tab = PluginTab(self.plugin_manager)
@@ -75,6 +111,11 @@ class MainWindow(QMainWindow):
         
         # Connect theme manager signal
         self.theme_manager.theme_changed.connect(self.apply_theme)
+        
+        # Reflect model state in the status bar
+        self.model_manager.model_loading.connect(lambda: self.status_bar.showMessage("Loading model..."))
+        self.model_manager.model_loaded.connect(lambda: self.status_bar.showMessage("Model ready"))
+        self.model_manager.model_error.connect(lambda error: self.status_bar.showMessage(error))
     
     def apply_theme(self):
         theme = self.theme_manager.get_current_theme()
@@ -193,7 +234,9 @@ class MainWindow(QMainWindow):
     
     def check_model(self):
         """Check if the model needs to be downloaded."""
-        if not self.model_manager.is_model_available():
+        if self.model_manager.is_model_available():
+            self.model_manager.start()
+        else:
             reply = QMessageBox.question(
                 self,
                 "Model Download Required",
@@ -204,7 +247,7 @@ class MainWindow(QMainWindow):
             )
             
             if reply == QMessageBox.StandardButton.Yes:
-                self.model_manager.download_model()
+                self.start_download()
             else:
                 QMessageBox.warning(
                     self,
@@ -212,7 +255,25 @@ class MainWindow(QMainWindow):
                     "The application will have limited functionality without the AI model."
                 )
     
+    def start_download(self):
+        """Download the model with a progress dialog for pause/cancel/bandwidth control."""
+        dialog = DownloadProgressDialog(self)
+        dialog.set_model_manager(self.model_manager)
+        dialog.set_total_size((self.model_manager.registry.get()["size"] or 0) / (1024 * 1024))
+        self.model_manager.download_stats.connect(dialog.update_progress)
+        self.model_manager.download_completed.connect(dialog.accept)
+        self.model_manager.download_failed.connect(dialog.reject)
+        dialog.show()
+        self.model_manager.download_model()
+    
     def closeEvent(self, event):
         """Handle application close event."""
         # Save any necessary state here
+        self.model_manager.shutdown()
+        self.code_tab.shutdown()
+        self.project_tab.shutdown()
+        self.file_manager.close()
+        self.project_manager.close_index()
+        self.plugin_manager.shutdown()
+        self.chat_store.close()
         event.accept()
\ No newline at end of file
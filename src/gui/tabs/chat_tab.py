@@ -1,49 +1,9 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTextEdit, 
-                           QPushButton, QLabel, QScrollArea, QFrame)
+                           QPushButton, QLabel, QFrame, QLineEdit, QListWidget,
+                           QListWidgetItem, QApplication)
 from PyQt6.QtCore import Qt, pyqtSlot
 from PyQt6.QtGui import QTextCursor, QFont, QColor, QPalette
-
-class MessageWidget(QFrame):
-    """Widget for displaying a single chat message."""
-    def __init__(self, text, is_user=True, parent=None):
-        super().__init__(parent)
-        self.setup_ui(text, is_user)
-    
-    def setup_ui(self, text, is_user):
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(10, 5, 10, 5)
-        
-        # Message bubble
-        message = QLabel(text)
-        message.setWordWrap(True)
-        message.setTextFormat(Qt.TextFormat.RichText)
-        message.setOpenExternalLinks(True)
-        
-        # Style the message
-        if is_user:
-            self.setStyleSheet("""
-                MessageWidget {
-                    background-color: palette(highlight);
-                    border-radius: 10px;
-                    margin-left: 50px;
-                }
-                QLabel {
-                    color: palette(highlighted-text);
-                }
-            """)
-        else:
-            self.setStyleSheet("""
-                MessageWidget {
-                    background-color: palette(button);
-                    border-radius: 10px;
-                    margin-right: 50px;
-                }
-                QLabel {
-                    color: palette(text);
-                }
-            """)
-        
-        layout.addWidget(message)
+from gui.chat_transcript import TranscriptView
 
 class ChatTab(QWidget):
     def __init__(self, chat_manager, voice_manager, model_manager):
@@ -51,7 +11,29 @@ class ChatTab(QWidget):
         self.chat_manager = chat_manager
         self.voice_manager = voice_manager
         self.model_manager = model_manager
+        self.pending_request = None
+        self.pending_message = None  # transcript number of the response being streamed
+        self.history_page_size = 100
+        self.oldest_loaded = None  # id of the earliest stored message shown
         self.setup_ui()
+        if self.chat_manager.store is not None:
+            self.load_history()
+        
+        # Render streamed responses as they arrive from the worker
+        self.chat_manager.response_chunk.connect(self.on_response_chunk)
+        self.chat_manager.response_finished.connect(self.on_response_finished)
+        self.chat_manager.response_failed.connect(self.on_response_failed)
+        self.chat_manager.response_cancelled.connect(self.on_response_cancelled)
+        self.chat_manager.cached_answer_offered.connect(self.on_cached_answer_offered)
+        
+        # Let the user know while the model loads in the background
+        if self.model_manager is not None:
+            self.model_manager.model_loading.connect(
+                lambda: self.message_input.setPlaceholderText("Loading model... you can type already")
+            )
+            self.model_manager.model_loaded.connect(
+                lambda: self.message_input.setPlaceholderText("Type your message here...")
+            )
     
     def setup_ui(self):
         """Set up the chat tab UI."""
@@ -59,19 +41,35 @@ class ChatTab(QWidget):
         layout.setSpacing(10)
         layout.setContentsMargins(10, 10, 10, 10)
         
-        # Chat history scroll area
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        # Search through past conversations
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search past answers...")
+        self.search_input.returnPressed.connect(self.search_history)
+        self.search_input.setVisible(self.chat_manager.store is not None)
+        layout.addWidget(self.search_input)
+        
+        self.search_results = QListWidget()
+        self.search_results.setVisible(False)
+        self.search_results.setMaximumHeight(150)
+        self.search_results.itemActivated.connect(self.copy_search_result)
+        layout.addWidget(self.search_results)
         
-        # Container for messages
-        self.message_container = QWidget()
-        self.message_layout = QVBoxLayout(self.message_container)
-        self.message_layout.setSpacing(10)
-        self.message_layout.addStretch()
+        # Chat history; only the messages in view are laid out
+        self.transcript_view = TranscriptView(page_size=self.history_page_size)
+        self.transcript = self.transcript_view.transcript
+        layout.addWidget(self.transcript_view)
         
-        scroll.setWidget(self.message_container)
-        layout.addWidget(scroll)
+        # Offers an earlier answer to a similar question while a new one is generated
+        self.cached_answer_bar = QFrame()
+        cached_answer_layout = QHBoxLayout(self.cached_answer_bar)
+        cached_answer_layout.setContentsMargins(5, 0, 5, 0)
+        self.cached_answer_label = QLabel()
+        cached_answer_layout.addWidget(self.cached_answer_label, 1)
+        use_cached_button = QPushButton("Use Previous Answer")
+        use_cached_button.clicked.connect(self.use_cached_answer)
+        cached_answer_layout.addWidget(use_cached_button)
+        self.cached_answer_bar.setVisible(False)
+        layout.addWidget(self.cached_answer_bar)
         
         # Input area
         input_frame = QFrame()
@@ -105,7 +103,7 @@ class ChatTab(QWidget):
         # Send button
         self.send_button = QPushButton("Send")
         self.send_button.setDefault(True)
-        self.send_button.clicked.connect(self.send_message)
+        self.send_button.clicked.connect(self.on_send_clicked)
         button_layout.addWidget(self.send_button)
         
         # Voice button
@@ -132,31 +130,126 @@ class ChatTab(QWidget):
                 return True
         return super().eventFilter(obj, event)
     
+    def load_history(self):
+        """Show the latest page of the stored conversation; earlier pages load on scrolling up."""
+        messages = self.load_earlier_messages(self.history_page_size)
+        self.transcript.add_messages(messages)
+        # With nothing stored there is no boundary, and paging would repeat this session's messages
+        if messages:
+            self.transcript_view.load_earlier = self.load_earlier_messages
+        self.scroll_to_bottom()
+    
+    def load_earlier_messages(self, count):
+        store = self.chat_manager.store
+        page = store.page(self.chat_manager.conversation, before=self.oldest_loaded, limit=count)
+        if page:
+            self.oldest_loaded = page[0]["id"]
+        return [(message["content"], message["role"] == "user") for message in page]
+    
+    @pyqtSlot()
+    def search_history(self):
+        """List past answers to questions like the one searched for."""
+        query = self.search_input.text().strip()
+        self.search_results.clear()
+        if query:
+            for result in self.chat_manager.store.find_answers(query, limit=20):
+                item = QListWidgetItem(f"{result['question'][:80]}  →  {result['answer'][:120]}")
+                item.setToolTip(result["answer"])
+                item.setData(Qt.ItemDataRole.UserRole, result["answer"])
+                self.search_results.addItem(item)
+        self.search_results.setVisible(self.search_results.count() > 0)
+    
+    def copy_search_result(self, item):
+        """Copy a past answer so it can be reused."""
+        QApplication.clipboard().setText(item.data(Qt.ItemDataRole.UserRole))
+    
     def add_message(self, text, is_user=True):
-        """Add a message to the chat history."""
-        message = MessageWidget(text, is_user)
-        self.message_layout.insertWidget(self.message_layout.count() - 1, message)
+        """Add a message to the chat history and return its number."""
+        number = self.transcript.add_message(text, is_user)
         
-        # Scroll to bottom
-        scroll = self.message_container.parent()
-        if isinstance(scroll, QScrollArea):
-            scroll.verticalScrollBar().setValue(scroll.verticalScrollBar().maximum())
+        self.scroll_to_bottom()
+        return number
+    
+    def scroll_to_bottom(self):
+        """Scroll the chat history to the latest message."""
+        self.transcript_view.scroll_to_latest()
+    
+    @pyqtSlot()
+    def on_send_clicked(self):
+        """Send the message, or stop the response being generated."""
+        if self.pending_request is not None:
+            self.chat_manager.cancel(self.pending_request)
+        else:
+            self.send_message()
     
     @pyqtSlot()
     def send_message(self):
         """Send a message to the AI."""
+        if self.pending_request is not None:
+            return
+        
         message = self.message_input.toPlainText().strip()
         if message:
             # Add user message
             self.add_message(message, True)
             self.message_input.clear()
             
-            try:
-                # Get AI response
-                response = self.chat_manager.get_response(message)
-                self.add_message(response, False)
-            except Exception as e:
-                self.add_message(f"Error: {str(e)}", False)
+            # The response is streamed into an empty message by the worker
+            self.pending_message = self.add_message("", False)
+            self.pending_request = self.chat_manager.send_message(message)
+            self.send_button.setText("Stop")
+    
+    @pyqtSlot(int, str)
+    def on_response_chunk(self, request_id, chunk):
+        """Append a streamed chunk to the message being generated."""
+        if request_id != self.pending_request:
+            return
+        self.transcript.append_text(self.pending_message, chunk)
+        self.scroll_to_bottom()
+    
+    @pyqtSlot(int, str)
+    def on_response_finished(self, request_id, response):
+        if request_id != self.pending_request:
+            return
+        self.transcript.set_text(self.pending_message, response)
+        self.finish_response()
+    
+    @pyqtSlot(int, str)
+    def on_response_failed(self, request_id, error):
+        if request_id != self.pending_request:
+            return
+        self.transcript.set_text(self.pending_message, f"Error: {error}")
+        self.finish_response()
+    
+    @pyqtSlot(int)
+    def on_response_cancelled(self, request_id):
+        if request_id != self.pending_request:
+            return
+        if not self.transcript.text(self.pending_message):
+            self.transcript.set_text(self.pending_message, "(stopped)")
+        self.finish_response()
+    
+    @pyqtSlot(int, str, float)
+    def on_cached_answer_offered(self, request_id, answer, similarity):
+        if request_id != self.pending_request:
+            return
+        self.cached_answer_label.setText(f"A similar question was answered before ({similarity:.0%} match).")
+        self.cached_answer_label.setToolTip(answer)
+        self.cached_answer_bar.setVisible(True)
+    
+    @pyqtSlot()
+    def use_cached_answer(self):
+        """Stop generating and show the earlier answer instead."""
+        if self.pending_request is not None:
+            self.chat_manager.use_cached_answer(self.pending_request)
+    
+    def finish_response(self):
+        """Reset the input state once the pending response is done."""
+        self.cached_answer_bar.setVisible(False)
+        self.pending_request = None
+        self.pending_message = None
+        self.send_button.setText("Send")
+        self.scroll_to_bottom()
     
     @pyqtSlot()
     def toggle_voice_input(self):
@@ -1,83 +1,140 @@
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTextEdit, 
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTextEdit,
                            QPushButton, QComboBox, QSplitter, QLabel,
-                           QTreeView, QFrame, QMenu, QFileDialog, QScrollArea)
+                           QTreeView, QFrame, QMenu, QFileDialog, QScrollArea,
+                           QLineEdit, QListWidget, QListWidgetItem)
 from PyQt6.QtCore import Qt, pyqtSlot, QSize
-from PyQt6.QtGui import (QStandardItemModel, QStandardItem, QFont, 
+from PyQt6.QtGui import (QFont,
                         QSyntaxHighlighter, QTextCharFormat, QColor,
-                        QFontMetrics)
+                        QFontMetrics, QTextCursor)
+from pathlib import Path
+import re
+from core.file_watcher import MODIFIED
+from core.code_index import format_snippets
+from gui.file_tree_model import FileTreeModel
 
 class PythonHighlighter(QSyntaxHighlighter):
-    """Syntax highlighter for Python code."""
+    """Syntax highlighter for Python code.
+    
+    Each block is scanned once with a single precompiled pattern. Keywords
+    and builtins are matched as identifiers and looked up in a dict, and the
+    block state records an unterminated triple-quoted string so only the
+    blocks whose state changes are re-highlighted while typing.
+    """
+    
+    NORMAL = 0
+    IN_TRIPLE_SINGLE = 1
+    IN_TRIPLE_DOUBLE = 2
+    
+    KEYWORDS = [
+        "and", "as", "assert", "async", "await", "break", "class", "continue",
+        "def", "del", "elif", "else", "except", "False", "finally", "for",
+        "from", "global", "if", "import", "in", "is", "lambda", "None",
+        "nonlocal", "not", "or", "pass", "raise", "return", "True",
+        "try", "while", "with", "yield"
+    ]
+    BUILTINS = [
+        "abs", "all", "any", "bin", "bool", "chr", "dict", "dir",
+        "enumerate", "eval", "exec", "filter", "float", "format",
+        "frozenset", "getattr", "globals", "hasattr", "hash", "help",
+        "hex", "id", "input", "int", "isinstance", "issubclass", "iter",
+        "len", "list", "locals", "map", "max", "min", "next", "object",
+        "oct", "open", "ord", "pow", "print", "property", "range",
+        "repr", "reversed", "round", "set", "setattr", "slice",
+        "sorted", "staticmethod", "str", "sum", "super", "tuple",
+        "type", "vars", "zip"
+    ]
+    
+    TOKEN_PATTERN = re.compile(r"""
+        (?P<comment>\#.*)
+      | (?P<triple>[rRbBuUfF]{0,2}(?:'''|\"\"\"))
+      | (?P<string>[rRbBuUfF]{0,2}(?:"[^"\\]*(?:\\.[^"\\]*)*"?|'[^'\\]*(?:\\.[^'\\]*)*'?))
+      | (?P<number>\b(?:0[xXoObB][0-9a-fA-F_]+|[0-9][0-9_]*(?:\.[0-9]*)?(?:[eE][+-]?[0-9]+)?j?)\b)
+      | (?P<word>[A-Za-z_][A-Za-z0-9_]*)
+    """, re.VERBOSE)
+    
+    # Closing delimiter of a triple-quoted string, skipping escaped characters
+    TRIPLE_END_PATTERNS = {
+        IN_TRIPLE_SINGLE: re.compile(r"(?:\\.|[^\\])*?'''"),
+        IN_TRIPLE_DOUBLE: re.compile(r'(?:\\.|[^\\])*?"""')
+    }
+    
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.highlighting_rules = []
         
         # Keywords
         keyword_format = QTextCharFormat()
         keyword_format.setForeground(QColor("#FF7043"))
         keyword_format.setFontWeight(QFont.Weight.Bold)
-        keywords = [
-            "and", "as", "assert", "break", "class", "continue", "def",
-            "del", "elif", "else", "except", "False", "finally", "for",
-            "from", "global", "if", "import", "in", "is", "lambda", "None",
-            "nonlocal", "not", "or", "pass", "raise", "return", "True",
-            "try", "while", "with", "yield"
-        ]
-        self.add_mapping(keywords, keyword_format)
         
         # Built-in functions
         builtin_format = QTextCharFormat()
         builtin_format.setForeground(QColor("#42A5F5"))
-        builtins = [
-            "abs", "all", "any", "bin", "bool", "chr", "dict", "dir",
-            "enumerate", "eval", "exec", "filter", "float", "format",
-            "frozenset", "getattr", "globals", "hasattr", "hash", "help",
-            "hex", "id", "input", "int", "isinstance", "issubclass", "iter",
-            "len", "list", "locals", "map", "max", "min", "next", "object",
-            "oct", "open", "ord", "pow", "print", "property", "range",
-            "repr", "reversed", "round", "set", "setattr", "slice",
-            "sorted", "staticmethod", "str", "sum", "super", "tuple",
-            "type", "vars", "zip"
-        ]
-        self.add_mapping(builtins, builtin_format)
+        
+        self.word_formats = {}
+        self.add_mapping(self.BUILTINS, builtin_format)
+        self.add_mapping(self.KEYWORDS, keyword_format)
         
         # Strings
         string_format = QTextCharFormat()
         string_format.setForeground(QColor("#66BB6A"))
-        self.highlighting_rules.append((
-            r'"[^"\\]*(\\.[^"\\]*)*"|\'[^\'\\]*(\\.[^\'\\]*)*\'',
-            string_format
-        ))
         
         # Numbers
         number_format = QTextCharFormat()
         number_format.setForeground(QColor("#AB47BC"))
-        self.highlighting_rules.append((
-            r'\b[0-9]+\b',
-            number_format
-        ))
         
         # Comments
         comment_format = QTextCharFormat()
         comment_format.setForeground(QColor("#78909C"))
         comment_format.setFontItalic(True)
-        self.highlighting_rules.append((
-            r'#[^\n]*',
-            comment_format
-        ))
+        
+        self.formats = {
+            "comment": comment_format,
+            "string": string_format,
+            "triple": string_format,
+            "number": number_format
+        }
     
     def add_mapping(self, words, format):
         """Add a list of words with their format to the highlighting rules."""
         for word in words:
-            pattern = r'\b' + word + r'\b'
-            self.highlighting_rules.append((pattern, format))
+            self.word_formats[word] = format
     
     def highlightBlock(self, text):
         """Apply syntax highlighting to the given block of text."""
-        import re
-        for pattern, format in self.highlighting_rules:
-            for match in re.finditer(pattern, text):
-                self.setFormat(match.start(), match.end() - match.start(), format)
+        self.setCurrentBlockState(self.NORMAL)
+        position = 0
+        
+        # Finish a triple-quoted string carried over from the previous block
+        state = self.previousBlockState()
+        if state in self.TRIPLE_END_PATTERNS:
+            position = self.highlight_triple(text, 0, state)
+        
+        while position < len(text):
+            match = self.TOKEN_PATTERN.search(text, position)
+            if match is None:
+                break
+            kind = match.lastgroup
+            if kind == "word":
+                format = self.word_formats.get(match.group())
+                if format is not None:
+                    self.setFormat(match.start(), match.end() - match.start(), format)
+            elif kind == "triple":
+                state = self.IN_TRIPLE_SINGLE if match.group().endswith("'") else self.IN_TRIPLE_DOUBLE
+                self.setFormat(match.start(), match.end() - match.start(), self.formats[kind])
+                position = self.highlight_triple(text, match.end(), state)
+                continue
+            else:
+                self.setFormat(match.start(), match.end() - match.start(), self.formats[kind])
+            position = match.end()
+    
+    def highlight_triple(self, text, start, state):
+        """Format a triple-quoted string from start and return where it ends."""
+        match = self.TRIPLE_END_PATTERNS[state].match(text, start)
+        end = match.end() if match else len(text)
+        self.setFormat(start, end - start, self.formats["triple"])
+        if match is None:
+            self.setCurrentBlockState(state)
+        return end
 
 class CodeEditor(QTextEdit):
     """Enhanced code editor with line numbers and syntax highlighting."""
@@ -113,12 +170,29 @@ class CodeEditor(QTextEdit):
         """)
 
 class CodeTab(QWidget):
-    def __init__(self, chat_manager, project_manager, model_manager):
+    def __init__(self, chat_manager, project_manager, model_manager, file_manager=None, ai_features=None):
         super().__init__()
         self.chat_manager = chat_manager
         self.project_manager = project_manager
         self.model_manager = model_manager
+        self.file_manager = file_manager
+        # Retrieves related project code for questions when given
+        self.ai_features = ai_features
+        self.pending_request = None
+        self.project_root = None
+        self.current_file = None
         self.setup_ui()
+        
+        # Show the open project's files and keep them in sync with the disk
+        self.project_manager.project_opened.connect(self.on_project_opened)
+        self.project_manager.project_closed.connect(self.on_project_closed)
+        if self.file_manager is not None:
+            self.file_manager.files_changed.connect(self.apply_file_changes)
+        
+        # Answers are streamed in from the generation worker
+        self.chat_manager.response_chunk.connect(self.on_response_chunk)
+        self.chat_manager.response_finished.connect(self.on_response_finished)
+        self.chat_manager.response_failed.connect(self.on_response_failed)
     
     def setup_ui(self):
         """Set up the code tab UI."""
@@ -146,12 +220,24 @@ class CodeTab(QWidget):
         header.setStyleSheet("font-weight: bold; padding: 5px;")
         file_layout.addWidget(header)
         
+        # Project search: symbol names first, then text
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search symbols and text...")
+        self.search_input.returnPressed.connect(self.search_project)
+        file_layout.addWidget(self.search_input)
+        
+        self.search_results = QListWidget()
+        self.search_results.setVisible(False)
+        self.search_results.itemActivated.connect(self.open_search_result)
+        self.search_results.itemClicked.connect(self.open_search_result)
+        file_layout.addWidget(self.search_results)
+        
         # File tree
         self.file_tree = QTreeView()
         self.file_tree.setHeaderHidden(True)
         self.file_tree.setAnimated(True)
         self.file_tree.setIndentation(20)
-        self.file_model = QStandardItemModel()
+        self.file_model = FileTreeModel(self)
         self.file_tree.setModel(self.file_model)
         file_layout.addWidget(self.file_tree)
         
@@ -217,6 +303,12 @@ class CodeTab(QWidget):
         chat_label.setStyleSheet("font-weight: bold; padding: 5px;")
         chat_layout.addWidget(chat_label)
         
+        # AI response view
+        self.response_view = QTextEdit()
+        self.response_view.setReadOnly(True)
+        self.response_view.setPlaceholderText("Answers will appear here")
+        chat_layout.addWidget(self.response_view)
+        
         # Chat input area
         chat_input_layout = QHBoxLayout()
         
@@ -279,26 +371,121 @@ class CodeTab(QWidget):
     
     def file_selected(self, index):
         """Handle file selection in the tree view."""
-        item = self.file_model.itemFromIndex(index)
-        if item and not item.hasChildren():
-            try:
-                file_path = item.data()
+        path = self.file_model.file_path(index)
+        if path and not self.file_model.is_dir(index) and Path(path).is_file():
+            self.load_file(path)
+    
+    def load_file(self, file_path, line=None):
+        try:
+            if file_path != self.current_file or not self.code_editor.document().isModified():
                 with open(file_path, 'r') as f:
                     self.code_editor.setPlainText(f.read())
-            except Exception as e:
-                self.show_error(f"Error opening file: {str(e)}")
+                self.code_editor.document().setModified(False)
+                self.current_file = file_path
+            if line is not None:
+                block = self.code_editor.document().findBlockByNumber(line - 1)
+                self.code_editor.setTextCursor(QTextCursor(block))
+                self.code_editor.ensureCursorVisible()
+        except Exception as e:
+            self.show_error(f"Error opening file: {str(e)}")
+    
+    def search_project(self):
+        """List symbols named like the query, or lines containing it."""
+        query = self.search_input.text().strip()
+        index = self.project_manager.index
+        self.search_results.clear()
+        if not query or index is None:
+            self.search_results.setVisible(False)
+            return
+        
+        for symbol in index.find_symbols(query, prefix=True, limit=50):
+            self.add_search_result(f"{symbol['qualname']} ({symbol['kind']})", symbol["path"], symbol["line"])
+        if not self.search_results.count():
+            for match in index.search(query, limit=50):
+                self.add_search_result(f"{Path(match['path']).name}:{match['line']}  {match['text'].strip()}",
+                                       match["path"], match["line"])
+        self.search_results.setVisible(self.search_results.count() > 0)
+    
+    def add_search_result(self, text, path, line):
+        item = QListWidgetItem(text)
+        item.setToolTip(path)
+        item.setData(Qt.ItemDataRole.UserRole, (path, line))
+        self.search_results.addItem(item)
+    
+    def open_search_result(self, item):
+        path, line = item.data(Qt.ItemDataRole.UserRole)
+        self.load_file(path, line)
+    
+    def on_project_opened(self, project):
+        self.set_project_root(project.path)
+    
+    def on_project_closed(self):
+        self.set_project_root(None)
+    
+    def set_project_root(self, root):
+        """Show a directory in the file tree and watch it for changes."""
+        self.project_root = Path(root).resolve() if root else None
+        self.file_model.set_root(self.project_root)
+        if self.file_manager is not None:
+            self.file_manager.stop_watching()
+            if self.project_root is not None:
+                self.file_manager.watch_directory(self.project_root, ignore_rules=self.file_model.ignore_rules)
+    
+    def shutdown(self):
+        """Stop the file tree's background scans."""
+        self.file_model.close()
+    
+    @pyqtSlot(list)
+    def apply_file_changes(self, changes):
+        """Update only the affected tree rows for a batch of file changes."""
+        if self.project_root is None:
+            return
+        self.file_model.apply_changes(changes)
+        for change, path in changes:
+            if change == MODIFIED and path == self.current_file:
+                # Reload files changed on disk unless there are unsaved edits
+                if not self.code_editor.document().isModified():
+                    self.load_file(self.current_file)
     
     def send_message(self):
         """Send a message about the code to the AI."""
         message = self.chat_input.toPlainText().strip()
         if message:
+            # A new question makes the previous answer stale
+            if self.pending_request is not None:
+                self.chat_manager.cancel(self.pending_request)
+            
             code = self.code_editor.toPlainText()
-            try:
-                response = self.chat_manager.get_code_help(message, code)
-                # TODO: Display response in a better way
-                self.chat_input.clear()
-            except Exception as e:
-                self.show_error(f"Error: {str(e)}")
+            context = ""
+            if self.ai_features is not None and self.project_manager.index is not None:
+                # Retrieval embeds the question, so it runs on the worker with the request
+                current_file = self.current_file
+                context = lambda: self.ai_features.project_context(code, query=message, exclude=current_file)
+            elif self.project_manager.index is not None:
+                context = format_snippets(self.project_manager.index.related_snippets(
+                    code, limit=3, exclude=self.current_file))
+            self.response_view.clear()
+            self.pending_request = self.chat_manager.ask_about_code(message, code, context)
+            self.chat_input.clear()
+    
+    @pyqtSlot(int, str)
+    def on_response_chunk(self, request_id, chunk):
+        """Append a streamed chunk to the answer view."""
+        if request_id == self.pending_request:
+            self.response_view.moveCursor(QTextCursor.MoveOperation.End)
+            self.response_view.insertPlainText(chunk)
+    
+    @pyqtSlot(int, str)
+    def on_response_finished(self, request_id, response):
+        if request_id == self.pending_request:
+            self.response_view.setPlainText(response)
+            self.pending_request = None
+    
+    @pyqtSlot(int, str)
+    def on_response_failed(self, request_id, error):
+        if request_id == self.pending_request:
+            self.pending_request = None
+            self.show_error(f"Error: {error}")
     
     def show_error(self, message):
         """Show an error message."""
@@ -2,11 +2,14 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout,
                                QPushButton, QLabel, QListWidget,
                                QListWidgetItem, QFrame, QScrollArea,
                                QFileDialog, QMessageBox)
-from PyQt6.QtCore import Qt, pyqtSlot
+from PyQt6.QtCore import Qt, pyqtSlot, pyqtSignal
 from PyQt6.QtGui import QIcon, QColor
 
 class PluginListItem(QFrame):
     """Custom widget for displaying plugin information."""
+    toggled = pyqtSignal(str, bool)  # plugin name, enable
+    remove_requested = pyqtSignal(str)  # plugin name
+    
     def __init__(self, plugin_name, plugin_info, parent=None):
         super().__init__(parent)
         self.setup_ui(plugin_name, plugin_info)
@@ -44,6 +47,11 @@ class PluginListItem(QFrame):
             author_label.setStyleSheet("color: palette(mid); font-size: 12px;")
             meta_layout.addWidget(author_label)
         
+        if plugin_info.get('sandbox'):
+            sandbox_label = QLabel("sandboxed")
+            sandbox_label.setStyleSheet("color: palette(mid); font-size: 12px;")
+            meta_layout.addWidget(sandbox_label)
+        
         meta_layout.addStretch()
         info_layout.addLayout(meta_layout)
         
@@ -65,8 +73,14 @@ class PluginListItem(QFrame):
         # Action button
         action_btn = QPushButton("Disable" if status == 'active' else "Enable")
         action_btn.setMaximumWidth(80)
+        action_btn.clicked.connect(lambda: self.toggled.emit(plugin_name, status != 'active'))
         status_layout.addWidget(action_btn, alignment=Qt.AlignmentFlag.AlignRight)
         
+        remove_btn = QPushButton("Remove")
+        remove_btn.setMaximumWidth(80)
+        remove_btn.clicked.connect(lambda: self.remove_requested.emit(plugin_name))
+        status_layout.addWidget(remove_btn, alignment=Qt.AlignmentFlag.AlignRight)
+        
         layout.addLayout(status_layout)
         
         # Set frame style
@@ -196,6 +210,8 @@ class PluginTab(QWidget):
         else:
             for plugin_name, plugin_info in plugins.items():
                 item = PluginListItem(plugin_name, plugin_info)
+                item.toggled.connect(self.toggle_plugin)
+                item.remove_requested.connect(self.remove_plugin)
                 self.plugin_layout.addWidget(item)
         
         # Add stretch at the end
@@ -226,9 +242,24 @@ class PluginTab(QWidget):
                     f"Failed to install plugin: {str(e)}"
                 )
     
-    def remove_plugin(self):
-        """Remove selected plugin (placeholder)."""
-        selected = self.plugin_list.currentItem()
-        if selected:
-            plugin_name = selected.text()
-            print(f"Would remove plugin: {plugin_name}") 
\ No newline at end of file
+    def toggle_plugin(self, plugin_name, enable):
+        """Enable or disable a plugin."""
+        if enable:
+            self.plugin_manager.load_plugin(plugin_name)
+        else:
+            self.plugin_manager.unload_plugin(plugin_name)
+        self.update_plugin_list()
+    
+    def remove_plugin(self, plugin_name):
+        """Remove an installed plugin."""
+        reply = QMessageBox.question(
+            self,
+            "Remove Plugin",
+            f"Remove the plugin {plugin_name}?"
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            try:
+                self.plugin_manager.remove_plugin(plugin_name)
+            except OSError as e:
+                QMessageBox.critical(self, "Error", f"Failed to remove plugin: {str(e)}")
+            self.update_plugin_list()
\ No newline at end of file
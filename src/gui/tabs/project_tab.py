@@ -6,6 +6,7 @@ from PyQt6.QtCore import Qt, pyqtSlot
 from PyQt6.QtGui import QStandardItemModel, QStandardItem, QIcon
 from pathlib import Path
 import json
+from gui.file_tree_model import FileTreeModel
 
 class ProjectDialog(QDialog):
     """Dialog for creating or editing projects."""
@@ -213,6 +214,14 @@ class ProjectTab(QWidget):
         self.details_content.setReadOnly(True)
         details_layout.addWidget(self.details_content)
         
+        # Project files, read lazily as folders are expanded
+        self.files_tree = QTreeView()
+        self.files_tree.setHeaderHidden(True)
+        self.files_tree.setIndentation(20)
+        self.files_model = FileTreeModel(self)
+        self.files_tree.setModel(self.files_model)
+        details_layout.addWidget(self.files_tree)
+        
         # Project actions
         actions_layout = QHBoxLayout()
         
@@ -246,6 +255,10 @@ class ProjectTab(QWidget):
         self.project_manager.project_closed.connect(self.update_project_list)
         self.project_manager.project_saved.connect(self.update_project_list)
     
+    def shutdown(self):
+        """Stop the file tree's background scans."""
+        self.files_model.close()
+    
     def create_new_project(self):
         """Create a new project."""
         dialog = ProjectDialog(parent=self)
@@ -356,6 +369,7 @@ class ProjectTab(QWidget):
                     with open(Path(path) / "project.json", 'r') as f:
                         project_data = json.load(f)
                         self.details_title.setText(project_data["name"])
+                        self.files_model.set_root(path)
                         self.details_content.setHtml(f"""
                             <h3>Project Details</h3>
                             <p><b>Name:</b> {project_data["name"]}</p>
@@ -374,5 +388,6 @@ class ProjectTab(QWidget):
         # Clear details if no valid project selected
         self.details_title.setText("Project Details")
         self.details_content.clear()
+        self.files_model.set_root(None)
         self.edit_btn.setEnabled(False)
         self.delete_btn.setEnabled(False)
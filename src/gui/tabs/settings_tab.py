@@ -1,9 +1,8 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                            QLabel, QGroupBox, QFormLayout, QProgressBar,
-                           QFrame, QStackedWidget)
+                           QFrame, QStackedWidget, QComboBox)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QColor
-from pathlib import Path
 
 class SettingsSidebar(QFrame):
     def __init__(self, parent=None):
@@ -37,8 +36,11 @@ class SettingsTab(QWidget):
         self.model_manager.download_started.connect(self.on_download_started)
         self.model_manager.download_completed.connect(self.on_download_completed)
         self.model_manager.download_failed.connect(self.on_download_failed)
+        self.model_manager.model_loading.connect(self.on_model_loading)
         self.model_manager.model_loaded.connect(self.on_model_loaded)
         self.model_manager.model_error.connect(self.on_model_error)
+        self.model_manager.model_switched.connect(self.on_model_loaded)
+        self.model_manager.model_unloaded.connect(self.on_model_loaded)
         
         self.setup_ui()
     
@@ -84,14 +86,36 @@ class SettingsTab(QWidget):
         self.model_status_label = QLabel("Not loaded")
         model_layout.addRow("Status:", self.model_status_label)
         
-        # Model Name
-        self.model_name_label = QLabel("No model selected")
-        model_layout.addRow("Model:", self.model_name_label)
+        # Registered models; choosing one switches to it in the background
+        self.model_combo = QComboBox()
+        for name, info in self.model_manager.get_available_models().items():
+            self.model_combo.addItem(info["name"], name)
+        self.model_combo.setCurrentIndex(self.model_combo.findData(self.model_manager.registry.default_model))
+        self.model_combo.currentIndexChanged.connect(self.change_model)
+        model_layout.addRow("Model:", self.model_combo)
+        
+        # Models loaded side by side
+        self.resident_label = QLabel("-")
+        model_layout.addRow("In memory:", self.resident_label)
         
         # Model Size
         self.model_size_label = QLabel("-")
         model_layout.addRow("Size:", self.model_size_label)
         
+        # Checksum state
+        self.integrity_label = QLabel("-")
+        model_layout.addRow("Integrity:", self.integrity_label)
+        
+        # Load Policy
+        self.load_policy_combo = QComboBox()
+        self.load_policy_combo.addItem("Warm up on start", "warm_up")
+        self.load_policy_combo.addItem("Load on first use", "on_first_use")
+        self.load_policy_combo.setCurrentIndex(
+            self.load_policy_combo.findData(self.model_manager.get_load_policy())
+        )
+        self.load_policy_combo.currentIndexChanged.connect(self.change_load_policy)
+        model_layout.addRow("Load model:", self.load_policy_combo)
+        
         # Download Progress
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
@@ -138,34 +162,61 @@ class SettingsTab(QWidget):
     
     def update_model_status(self):
         """Update the model status display."""
-        model_config = next(iter(self.model_manager.DEFAULT_MODEL_CONFIG.values()))
-        model_path = Path("models") / model_config["file"]
+        model_name = self.model_combo.currentData()
+        model_config = self.model_manager.registry.get(model_name)
+        size_gb = (model_config["size"] or 0) / 1_000_000_000
+        self.model_size_label.setText(f"{size_gb:.1f} GB" if size_gb else "-")
         
-        if self.model_manager.is_model_loaded():
+        resident = self.model_manager.get_resident_models()
+        used_gb = self.model_manager.resident_memory() / 1024 ** 3
+        budget_gb = self.model_manager.ram_budget / 1024 ** 3
+        self.resident_label.setText(
+            f"{', '.join(self.model_manager.registry.get(name)['name'] for name in resident) or 'None'} "
+            f"({used_gb:.1f} of {budget_gb:.1f} GB)"
+        )
+        
+        # Read from the checksum sidecar, so this never hashes the model
+        integrity_state = self.model_manager.get_verification_state(model_name)
+        integrity_colors = {"verified": "#4CAF50", "mismatch": "#F44336"}
+        self.integrity_label.setText(integrity_state.title())
+        self.integrity_label.setStyleSheet(f"color: {integrity_colors.get(integrity_state, '#9E9E9E')};")
+        
+        if self.model_manager.is_model_loading():
+            self.model_status_label.setText("Loading model...")
+            self.model_status_label.setStyleSheet("color: #2196F3;")  # Blue
+            self.download_button.setEnabled(False)
+            self.download_button.setText("Loading...")
+        elif self.model_manager.get_current_model() == model_name:
             self.model_status_label.setText("Model is loaded and ready")
             self.model_status_label.setStyleSheet("color: #4CAF50;")  # Green
-            self.model_name_label.setText(model_config["name"])
-            size_gb = model_config["size"] / 1_000_000_000
-            self.model_size_label.setText(f"{size_gb:.1f} GB")
             self.download_button.setEnabled(False)
             self.download_button.setText("Model Loaded")
-        elif self.model_manager.is_model_available():
+        elif self.model_manager.is_model_available(model_name):
             self.model_status_label.setText("Model downloaded but not loaded")
             self.model_status_label.setStyleSheet("color: #FFA500;")  # Orange
-            self.model_name_label.setText(model_config["name"])
-            size_gb = model_config["size"] / 1_000_000_000
-            self.model_size_label.setText(f"{size_gb:.1f} GB")
             self.download_button.setEnabled(True)
-            self.download_button.setText("Reload Model")
+            self.download_button.setText("Load Model")
         else:
             self.model_status_label.setText("Model not downloaded")
             self.model_status_label.setStyleSheet("color: #F44336;")  # Red
-            self.model_name_label.setText(model_config["name"])
-            size_gb = model_config["size"] / 1_000_000_000
-            self.model_size_label.setText(f"{size_gb:.1f} GB")
             self.download_button.setEnabled(True)
             self.download_button.setText("Download Model")
     
+    def change_model(self, index):
+        """Switch to the chosen model if it is downloaded; it loads on the worker."""
+        model_name = self.model_combo.itemData(index)
+        if self.model_manager.is_model_available(model_name):
+            self.model_manager.switch_model(model_name)
+        self.update_model_status()
+    
+    def change_load_policy(self, index):
+        """Persist the selected model load policy."""
+        self.model_manager.set_load_policy(self.load_policy_combo.itemData(index))
+    
+    def on_model_loading(self):
+        """Handle the model starting to load in the background."""
+        self.update_model_status()
+    
     def on_model_loaded(self):
         """Handle successful model loading."""
         self.update_model_status()
@@ -178,8 +229,12 @@ class SettingsTab(QWidget):
         self.download_button.setText("Retry Download")
         
     def download_model(self):
-        """Start model download."""
-        self.model_manager.download_model()
+        """Download the chosen model, or load it if it is already downloaded."""
+        model_name = self.model_combo.currentData()
+        if self.model_manager.is_model_available(model_name):
+            self.model_manager.switch_model(model_name)
+        else:
+            self.model_manager.download_model(model_name)
     
     def update_download_progress(self, progress):
         """Update download progress bar."""
@@ -0,0 +1,23 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shutil
+import pytest
+from src.core.model_manager import ModelManager
+from tests.fakes import RecordingBackend
+
+ROUTING_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "routing.json")
+
+@pytest.fixture
+def model_manager(monkeypatch, tmp_path):
+    """A ModelManager on a RecordingBackend, working in tmp_path with the shipped
+    routing rules, whose models all count as downloaded."""
+    (tmp_path / "config").mkdir()
+    # Keeps the file's old mtime, so rules a test writes are always reloaded
+    shutil.copy2(ROUTING_FILE, tmp_path / "config" / "routing.json")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ModelManager, "is_model_available", lambda self, model_name=None: True)
+    model_manager = ModelManager(backend=RecordingBackend())
+    model_manager.get_model_path().touch()
+    return model_manager
\ No newline at end of file
@@ -0,0 +1,123 @@
+import time
+from contextlib import contextmanager
+
+from PyQt6.QtCore import QCoreApplication
+from src.core.backends import StubBackend
+from src.core.generation_worker import GenerationWorker
+from src.core.model_registry import ModelRegistry
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+def wait_for(condition, timeout=5):
+    """Process queued signals until condition() is true."""
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        app.processEvents()
+        time.sleep(0.01)
+
+class FakeModel:
+    """Stands in for GPT4All, yielding a fixed response token by token."""
+    def __init__(self, tokens, delay=0):
+        self.tokens = tokens
+        self.delay = delay
+        self.prompts = []
+        self.sessions = []  # system prompt of each chat session opened
+    
+    @contextmanager
+    def chat_session(self, system_prompt="", prompt_template="{0}"):
+        self.sessions.append(system_prompt)
+        yield self
+    
+    def generate(self, prompt, streaming=False, callback=None, **kwargs):
+        self.prompts.append(prompt)
+        if not streaming:
+            return "".join(self.tokens)
+        return self._stream(callback)
+    
+    def _stream(self, callback):
+        for token in self.tokens:
+            time.sleep(self.delay)
+            if callback is not None and callback(0, token) is False:
+                return
+            yield token
+
+class FakeModelManager:
+    """Runs a FakeModel on a real GenerationWorker."""
+    DEFAULT_MODEL_CONFIG = {"fake": {"context_length": 2048}}
+    current_model_name = "fake"
+    
+    def __init__(self, tokens, delay=0):
+        self.model = FakeModel(tokens, delay)
+        self.registry = ModelRegistry("fake_models.json", self.DEFAULT_MODEL_CONFIG)  # never saved
+        self.worker = GenerationWorker(self)
+    
+    def stream_response(self, prompt, should_stop=None, session=None, model=None, **kwargs):
+        if should_stop is not None:
+            kwargs["callback"] = lambda token_id, response: not should_stop()
+        if session is not None:
+            yield from session.stream(self.model, prompt, **kwargs)
+        else:
+            yield from self.model.generate(prompt, streaming=True, **kwargs)
+    
+    def submit(self, prompt, **kwargs):
+        return self.worker.submit(prompt, **kwargs)
+    
+    def ensure_model_loaded(self, model_name=None):
+        pass
+    
+    def route(self, feature, prompt=""):
+        return f"{feature}:large", None
+    
+    def record_latency(self, route, seconds, model_name=None):
+        pass
+    
+    def model_name_for(self, model_name=None):
+        return model_name or self.current_model_name
+
+class FakeChatManager:
+    """Counts generations instead of running a model."""
+    def __init__(self):
+        self.model_manager = type("ModelManager", (), {"current_model_name": "test-model",
+                                                   "route": lambda self, feature, prompt: (feature, None),
+                                                   "model_name_for": lambda self, model_name=None: model_name or "test-model"})()
+        self.prompts = []
+    
+    def process_message(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return f"response {len(self.prompts)}"
+
+class ScriptedChatManager(FakeChatManager):
+    """Replies with the given responses in turn, streaming them to stop_when."""
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = list(responses)
+    
+    def process_message(self, prompt, stop_when=None, **kwargs):
+        self.prompts.append(prompt)
+        response = self.responses.pop(0)
+        tokens = []
+        for token in response.split(" "):
+            tokens.append(token + " ")
+            if stop_when is not None and stop_when(token + " "):
+                break
+        return "".join(tokens)
+
+class RecordingBackend(StubBackend):
+    """Counts loads and echoes prompts back."""
+    requires_model_file = True
+    
+    def __init__(self):
+        super().__init__(responder=lambda prompt: "echo: " + prompt)
+        self.loads = 0
+    
+    def load(self, model_path, config):
+        super().load(model_path, config)
+        self.loads += 1
+
+def add_models(model_manager, memory_mb):
+    """Register and "download" models of the given memory_mb sizes."""
+    for name, memory in memory_mb.items():
+        model_manager.add_model(name, {"name": name, "description": "", "file": f"{name}.gguf", "url": "",
+                                       "size": None, "type": "llama", "memory_mb": memory})
+        model_manager.get_model_path(name).touch()
\ No newline at end of file
@@ -0,0 +1,63 @@
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from src.core.backends import StubBackend, create_backend
+
+def test_stub_is_deterministic():
+    first = StubBackend().generate("Explain this code")
+    second = StubBackend().generate("Explain this code")
+    
+    assert first == second
+    assert first != StubBackend().generate("Something else")
+
+def test_stub_streams_and_stops_on_callback():
+    backend = StubBackend(response_tokens=10)
+    tokens = list(backend.generate("hi", streaming=True))
+    assert "".join(tokens) == backend.generate("hi")
+    assert len(tokens) == 10
+    
+    seen = []
+    def callback(token_id, response):
+        seen.append(response)
+        return len(seen) < 3
+    assert len(list(backend.generate("hi", streaming=True, callback=callback))) == 2
+    assert len(backend.generate("hi", max_tokens=4).split()) == 4
+
+def test_stub_latency_and_throughput():
+    backend = StubBackend(latency=0.05, tokens_per_second=200, response_tokens=10)
+    
+    start = time.perf_counter()
+    backend.generate("hi")
+    
+    assert time.perf_counter() - start >= 0.05 + 10 / 200
+
+def test_stub_session_evaluates_only_new_turns():
+    backend = StubBackend(prompt_tokens_per_second=1000)
+    history = "word " * 200
+    
+    with backend.chat_session(system_prompt=history):
+        start = time.perf_counter()
+        backend.generate("first")
+        first_turn = time.perf_counter() - start
+        start = time.perf_counter()
+        backend.generate("second")
+        second_turn = time.perf_counter() - start
+    
+    assert first_turn >= 0.2
+    assert second_turn < 0.1
+
+def test_stub_embeddings_are_normalised():
+    backend = StubBackend(embedding_size=32)
+    vector, same, other = backend.embed(["read the file", "read the file", "train a model"])
+    
+    assert len(vector) == 32
+    assert sum(value * value for value in vector) == pytest.approx(1.0)
+    assert vector == same
+    assert vector != other
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_backend("missing")
\ No newline at end of file
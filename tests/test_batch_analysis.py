@@ -0,0 +1,88 @@
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from src.core.ai_features import AIFeatures
+from src.core.response_cache import ResponseCache
+from src.core.code_index import CodeIndex
+from src.core.batch_analysis import BatchAnalyzer
+from tests.fakes import FakeChatManager
+
+FEATURES = ["generate_documentation", "suggest_tests"]
+
+def make_analyzer(tmp_path, workers=2):
+    root = tmp_path / "project"
+    if not root.exists():
+        (root / "pkg").mkdir(parents=True)
+        (root / "pkg" / "a.py").write_text("def a():\n    return 1\n")
+        (root / "pkg" / "b.js").write_text("function b() { return 2; }\n")
+        (root / "README.md").write_text("Not analysed\n")
+    chat_manager = FakeChatManager()
+    # A fresh cache each time so every scheduled job reaches the model
+    ai_features = AIFeatures(chat_manager, cache=ResponseCache())
+    code_index = CodeIndex(root, index_dir=tmp_path / "index", save_interval=60)
+    return BatchAnalyzer(ai_features, root, tmp_path / "out" / "analysis.jsonl", features=FEATURES,
+                         workers=workers, code_index=code_index), chat_manager
+
+def read_records(tmp_path):
+    with open(tmp_path / "out" / "analysis.jsonl") as f:
+        return [json.loads(line) for line in f]
+
+def test_runs_every_feature_for_source_files(tmp_path):
+    analyzer, chat_manager = make_analyzer(tmp_path)
+    report = analyzer.run()
+    
+    records = read_records(tmp_path)
+    assert sorted((r["path"], r["feature"]) for r in records) == [
+        ("pkg/a.py", "generate_documentation"), ("pkg/a.py", "suggest_tests"),
+        ("pkg/b.js", "generate_documentation"), ("pkg/b.js", "suggest_tests")
+    ]
+    assert {r["language"] for r in records} == {"Python", "JavaScript"}
+    assert all(r["status"] == "ok" and r["tokens"] > 0 for r in records)
+    assert len(chat_manager.prompts) == 4
+    assert (report["jobs"], report["completed"], report["files"]) == (4, 4, 2)
+    assert report["files_per_minute"] > 0 and report["tokens_per_second"] > 0
+    assert report["structured"]["requests"] == 0
+
+def test_rerun_only_analyses_changed_files(tmp_path):
+    make_analyzer(tmp_path)[0].run()
+    
+    analyzer, chat_manager = make_analyzer(tmp_path)
+    report = analyzer.run()
+    assert (report["jobs"], report["skipped"]) == (0, 4)
+    assert chat_manager.prompts == []
+    
+    (tmp_path / "project" / "pkg" / "a.py").write_text("def a():\n    return 3\n")
+    analyzer, chat_manager = make_analyzer(tmp_path)
+    report = analyzer.run()
+    assert (report["jobs"], report["skipped"]) == (2, 2)
+    assert all("return 3" in prompt for prompt in chat_manager.prompts)
+
+def test_interrupted_run_resumes(tmp_path):
+    analyzer, _ = make_analyzer(tmp_path, workers=1)
+    report = analyzer.run(on_result=lambda record: analyzer.stop())
+    assert report["interrupted"]
+    # The job in flight when stopping is still recorded
+    finished = report["completed"]
+    assert 1 <= finished < 4
+    
+    analyzer, chat_manager = make_analyzer(tmp_path)
+    report = analyzer.run()
+    assert report["jobs"] == 4 - finished
+    assert len(read_records(tmp_path)) == 4
+
+def test_failed_jobs_are_retried(tmp_path):
+    analyzer, chat_manager = make_analyzer(tmp_path)
+    chat_manager.process_message = lambda prompt, **kwargs: (_ for _ in ()).throw(RuntimeError("model crashed"))
+    report = analyzer.run()
+    assert report["failed"] == 4
+    assert read_records(tmp_path)[0]["error"] == "model crashed"
+    
+    analyzer, _ = make_analyzer(tmp_path)
+    assert analyzer.run()["completed"] == 4
+
+def test_unknown_feature():
+    with pytest.raises(ValueError):
+        BatchAnalyzer(None, ".", "out.jsonl", features=["debug_code"])
@@ -0,0 +1,75 @@
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from src.core.blob_store import BlobStore, matching_length
+from src.core.file_manager import FileManager
+
+def make_content(size=200_000, seed=0):
+    rng = random.Random(seed)
+    return bytes(rng.randrange(256) for _ in range(size))
+
+def edit(content, offset, text):
+    return content[:offset] + text + content[offset + len(text):]
+
+def test_versions_are_stored_as_small_deltas(tmp_path):
+    store = BlobStore(tmp_path, cache_size=0)
+    versions = [make_content()]
+    for i in range(5):
+        versions.append(edit(versions[-1], 1000 * (i + 1), b"changed"))
+    
+    digests = [store.put(versions[0])]
+    for version in versions[1:]:
+        digests.append(store.put(version, base=digests[-1]))
+    
+    assert store.disk_usage() < len(versions[0]) * 1.1
+    assert [store.get(digest) for digest in digests] == versions
+
+def test_delta_chains_are_capped(tmp_path):
+    store = BlobStore(tmp_path, max_chain=3)
+    digest = store.put(make_content(10_000))
+    content = store.get(digest)
+    for i in range(10):
+        content = edit(content, i, b"x" * 8)
+        digest = store.put(content, base=digest)
+        assert store.chain_depth(digest) <= 3
+
+def test_garbage_collection_keeps_delta_bases(tmp_path):
+    store = BlobStore(tmp_path, cache_size=0)
+    first = store.put(make_content(10_000))
+    second = store.put(edit(store.get(first), 10, b"second"), base=first)
+    unrelated = store.put(make_content(10_000, seed=1))
+    
+    store.collect_garbage([second])
+    
+    assert store.get(second) is not None
+    assert store.exists(first)
+    assert not store.exists(unrelated)
+
+@pytest.mark.parametrize("a, b, prefix, suffix", [
+    (b"", b"", 0, 0),
+    (b"abc", b"abc", 3, 3),
+    (b"abcdef", b"abXdef", 2, 3),
+    (b"a" * 10000 + b"b", b"a" * 10000 + b"c", 10000, 0),
+])
+def test_matching_length(a, b, prefix, suffix):
+    assert matching_length(a, b) == prefix
+    assert matching_length(a, b, reverse=True) == suffix
+
+def test_restore_and_diff_versions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    file_manager = FileManager()
+    file_manager.create_file("workspace/a.py", "x = 1\ny = 2\n")
+    file_manager.write_file("workspace/a.py", "x = 1\ny = 3\n")
+    
+    diff = file_manager.diff_versions("workspace/a.py")
+    assert "-y = 2\n" in diff and "+y = 3\n" in diff
+    
+    assert file_manager.restore_version("workspace/a.py", 0) == "x = 1\ny = 2\n"
+    assert file_manager.read_file("workspace/a.py") == "x = 1\ny = 2\n"
+    assert len(file_manager.file_history["workspace/a.py"]) == 3
+    with pytest.raises(KeyError):
+        file_manager.read_version("workspace/a.py", 10)
+    file_manager.close()
\ No newline at end of file
@@ -0,0 +1,100 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.chat_manager import ChatManager
+from tests.fakes import FakeModelManager, wait_for
+
+def test_send_message_streams_chunks():
+    model_manager = FakeModelManager(["Hel", "lo", "!"])
+    chat_manager = ChatManager(model_manager)
+    chunks = []
+    finished = []
+    chat_manager.response_chunk.connect(lambda request_id, chunk: chunks.append(chunk))
+    chat_manager.response_finished.connect(lambda request_id, response: finished.append(response))
+    
+    chat_manager.send_message("Hi")
+    wait_for(lambda: finished)
+    model_manager.worker.stop()
+    
+    assert chunks == ["Hel", "lo", "!"]
+    assert finished == ["Hello!"]
+    assert list(chat_manager.history) == [("user", "Hi"), ("assistant", "Hello!")]
+
+def test_get_response_blocks_until_done():
+    model_manager = FakeModelManager(["4", "2"])
+    chat_manager = ChatManager(model_manager)
+    
+    assert chat_manager.get_response("Answer?") == "42"
+    assert list(chat_manager.history) == [("user", "Answer?"), ("assistant", "42")]
+    model_manager.worker.stop()
+
+def test_session_only_sends_the_new_turn():
+    model_manager = FakeModelManager(["42"])
+    chat_manager = ChatManager(model_manager)
+    
+    chat_manager.get_response("What is six times seven?")
+    chat_manager.get_response("And halved?")
+    model_manager.worker.stop()
+    
+    assert model_manager.model.prompts == ["What is six times seven?", "And halved?"]
+    assert len(model_manager.model.sessions) == 1
+
+def test_cleared_session_is_reopened_with_history_replayed():
+    model_manager = FakeModelManager(["42"])
+    chat_manager = ChatManager(model_manager)
+    
+    chat_manager.get_response("What is six times seven?")
+    chat_manager.session.invalidate()
+    chat_manager.get_response("And halved?")
+    chat_manager.clear_history()
+    chat_manager.get_response("Hello")
+    model_manager.worker.stop()
+    
+    sessions = model_manager.model.sessions
+    assert len(sessions) == 3
+    assert "What is six times seven?" in sessions[1] and "42" in sessions[1]
+    assert "What is six times seven?" not in sessions[2]
+
+def test_get_response_reports_errors():
+    class BrokenModelManager(FakeModelManager):
+        def stream_response(self, prompt, should_stop=None, **kwargs):
+            raise RuntimeError("No model is currently loaded")
+            yield
+    
+    model_manager = BrokenModelManager([])
+    chat_manager = ChatManager(model_manager)
+    
+    assert chat_manager.get_response("Hi") == "Error: No model is currently loaded"
+    assert list(chat_manager.history) == []
+    model_manager.worker.stop()
+
+def test_worker_runs_requests_in_order():
+    model_manager = FakeModelManager(["ok"])
+    requests = [model_manager.submit(f"prompt {i}") for i in range(5)]
+    for request in requests:
+        request.wait(5)
+    model_manager.worker.stop()
+    
+    assert model_manager.model.prompts == [f"prompt {i}" for i in range(5)]
+
+def test_worker_cancels_queued_and_running_requests():
+    model_manager = FakeModelManager(["tok"] * 100, delay=0.01)
+    worker = model_manager.worker
+    cancelled = []
+    worker.request_cancelled.connect(cancelled.append)
+    
+    running = worker.submit("long prompt")
+    queued = worker.submit("stale prompt")
+    worker.cancel(queued.id)
+    wait_for(lambda: worker.current_request is running)
+    worker.cancel(running.id)
+    
+    assert running.wait(5) is not None
+    assert len(running.response) < len("tok") * 100
+    queued.wait(5)
+    wait_for(lambda: len(cancelled) == 2)
+    worker.stop()
+    
+    assert model_manager.model.prompts == ["long prompt"]
+    assert cancelled == [running.id, queued.id]
\ No newline at end of file
@@ -0,0 +1,83 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.chat_manager import ChatManager
+from src.core.chat_store import ChatStore, match_query
+from tests.fakes import FakeModelManager
+
+def test_pages_end_at_the_newest_message(tmp_path):
+    store = ChatStore(tmp_path / "chat.db", batch_size=7)
+    conversation = store.new_conversation()
+    for i in range(25):
+        store.append(conversation, "user" if i % 2 == 0 else "assistant", f"message {i}")
+    store.append(conversation + 1, "user", "another conversation")
+    store.flush()
+    
+    assert store.count(conversation) == 25
+    page = store.page(conversation, limit=10)
+    assert [message["content"] for message in page] == [f"message {i}" for i in range(15, 25)]
+    earlier = store.page(conversation, before=page[0]["id"], limit=10)
+    assert [message["content"] for message in earlier] == [f"message {i}" for i in range(5, 15)]
+    assert len(store.page(conversation, before=earlier[0]["id"], limit=10)) == 5
+    store.close()
+
+def test_history_survives_reopening(tmp_path):
+    store = ChatStore(tmp_path / "chat.db")
+    assert store.latest_conversation() is None
+    store.append(store.new_conversation(), "user", "Hello")
+    store.close()
+    
+    store = ChatStore(tmp_path / "chat.db")
+    assert store.latest_conversation() == 1
+    assert store.page(1)[0]["content"] == "Hello"
+    assert store.new_conversation() == 2
+    store.close()
+
+def test_search_finds_past_answers(tmp_path):
+    store = ChatStore(tmp_path / "chat.db")
+    exchanges = [
+        ("How do I reverse a list in Python?", "Use reversed(items) or items[::-1]."),
+        ("What is a closure?", "A function that keeps the variables of its enclosing scope."),
+        ("How do I sort a list?", "Call sorted(items) or items.sort()."),
+    ]
+    for question, answer in exchanges:
+        conversation = store.new_conversation()
+        store.append(conversation, "user", question)
+        store.append(conversation, "assistant", answer)
+    store.flush()
+    
+    results = store.search("sorted items")
+    assert [result["content"] for result in results] == ["Call sorted(items) or items.sort()."]
+    assert "[sorted]" in results[0]["snippet"]
+    assert [result["role"] for result in store.search("list", role="user")] == ["user", "user"]
+    
+    answers = store.find_answers("reverse this list")
+    assert answers[0]["answer"] == "Use reversed(items) or items[::-1]."
+    assert {answer["question"] for answer in answers} == {exchanges[0][0], exchanges[2][0]}
+    store.close()
+
+def test_query_syntax_is_not_interpreted(tmp_path):
+    assert match_query('a "b" OR c*') == '"a" "b" "OR" "c"'
+    assert match_query("x y", any_term=True) == '"x" OR "y"'
+    
+    store = ChatStore(tmp_path / "chat.db")
+    store.append(store.new_conversation(), "user", "NEAR(this) AND that")
+    store.flush()
+    assert len(store.search('NEAR(this) AND "that')) == 1
+    assert store.search("*") == [] and store.find_answers("?!") == []
+    store.close()
+
+def test_chat_manager_continues_the_stored_conversation(tmp_path):
+    store = ChatStore(tmp_path / "chat.db")
+    manager = ChatManager(FakeModelManager(["Hi", "!"]), store=store)
+    assert manager.get_response("Hello") == "Hi!"
+    store.flush()
+    
+    restored = ChatManager(FakeModelManager([]), store=store)
+    assert restored.conversation == manager.conversation
+    assert [content for _, content in restored.history] == ["Hello", "Hi!"]
+    
+    restored.clear_history()
+    assert restored.conversation == manager.conversation + 1
+    store.close()
\ No newline at end of file
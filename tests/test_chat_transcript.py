@@ -0,0 +1,60 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# GUI modules import core the way src/main.py runs them
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from PyQt6.QtCore import QCoreApplication
+from gui.chat_transcript import TranscriptModel
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+def rows(model):
+    return [model.data(model.index(row)) for row in range(model.rowCount())]
+
+def test_messages_are_addressed_by_number():
+    model = TranscriptModel()
+    assert model.add_message("Hi", True) == 0
+    number = model.add_message("", False)
+    changed = []
+    model.dataChanged.connect(lambda top_left, bottom_right: changed.append(top_left.row()))
+    
+    model.append_text(number, "Hel")
+    model.append_text(number, "lo")
+    assert rows(model) == ["Hi", "Hello"]
+    assert changed == [1, 1]
+    assert model.data(model.index(0), TranscriptModel.IsUserRole) is True
+
+def test_window_of_rows():
+    model = TranscriptModel()
+    model.add_messages([(f"message {i}", i % 2 == 0) for i in range(10)])
+    
+    model.trim(3)
+    assert rows(model) == ["message 7", "message 8", "message 9"]
+    # Numbers stay valid when their message is outside the window
+    model.set_text(2, "edited")
+    assert model.text(2) == "edited"
+    assert model.add_message("latest", False) == 10
+    
+    assert model.show_earlier(5) == 5
+    assert rows(model)[:2] == ["edited", "message 3"]
+    assert model.show_earlier(5) == 2
+    assert model.rowCount() == 11
+    
+    model.clear()
+    assert model.rowCount() == 0 and model.add_message("new") == 0
+
+def test_prepended_messages_get_negative_numbers():
+    model = TranscriptModel()
+    model.add_messages([("message 2", True), ("message 3", False)])
+    
+    model.prepend_messages([("message 0", True), ("message 1", False)])
+    assert rows(model) == ["message 0", "message 1", "message 2", "message 3"]
+    assert model.text(-2) == "message 0" and model.text(0) == "message 2"
+    assert model.add_message("message 4") == 2
+    
+    # Outside the window, prepended messages wait for show_earlier
+    model.trim(2)
+    model.prepend_messages([("older", True)])
+    assert rows(model) == ["message 3", "message 4"]
+    assert model.show_earlier(10) == 4 and rows(model)[0] == "older"
@@ -0,0 +1,133 @@
+import sys
+import os
+import shutil
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.code_index import CodeIndex, extract_symbols, format_snippets
+from src.core.file_watcher import CREATED, MODIFIED, DELETED
+from src.core.ai_features import AIFeatures
+from src.core.response_cache import ResponseCache
+from tests.fakes import FakeChatManager
+
+MODELS = '''
+MAX_USERS = 100
+
+class User:
+    def __init__(self, name):
+        self.name = name
+
+    def greeting(self):
+        return f"Hello {self.name}"
+
+def load_users(path):
+    return [User(line) for line in open(path)]
+'''
+
+def make_project(tmp_path):
+    root = tmp_path / "project"
+    (root / "app").mkdir(parents=True)
+    (root / "node_modules").mkdir()
+    (root / "app" / "models.py").write_text(MODELS)
+    (root / "app" / "views.py").write_text("from .models import load_users\n\ndef index():\n    return load_users('users.txt')\n")
+    (root / "README.md").write_text("Run the app with python -m app\n")
+    (root / "node_modules" / "lib.js").write_text("function load_users() {}\n")
+    return root
+
+def open_index(tmp_path, root):
+    index = CodeIndex(root, index_dir=tmp_path / "index", save_interval=60)
+    index.build()
+    return index
+
+def test_extract_symbols():
+    symbols = {s["qualname"]: s for s in extract_symbols(MODELS)}
+    
+    assert symbols["MAX_USERS"]["kind"] == "variable"
+    assert symbols["User"]["kind"] == "class"
+    assert symbols["User.greeting"]["kind"] == "method"
+    assert (symbols["load_users"]["kind"], symbols["load_users"]["line"], symbols["load_users"]["end_line"]) == ("function", 11, 12)
+    assert extract_symbols("def broken(:") == []
+
+def test_build_and_query(tmp_path):
+    root = make_project(tmp_path)
+    index = open_index(tmp_path, root)
+    
+    assert index.files.keys() == {"app/models.py", "app/views.py", "README.md"}
+    assert index.find_symbols("load_users") == [{
+        "name": "load_users", "qualname": "load_users", "kind": "function",
+        "line": 11, "end_line": 12, "path": str(root / "app" / "models.py")
+    }]
+    assert [s["qualname"] for s in index.find_symbols("gree", prefix=True)] == ["User.greeting"]
+    
+    matches = index.search("LOAD_USERS(")
+    assert [(m["path"], m["line"]) for m in matches] == [(str(root / "app" / "models.py"), 11),
+                                                          (str(root / "app" / "views.py"), 4)]
+    assert index.search("not in any file") == []
+    index.close()
+
+def test_rebuild_reads_only_changed_files(tmp_path):
+    root = make_project(tmp_path)
+    open_index(tmp_path, root).close()
+    
+    index = CodeIndex(root, index_dir=tmp_path / "index", save_interval=60)
+    assert index.build() == 0
+    (root / "app" / "views.py").write_text("def index():\n    return 'changed'\n")
+    (root / "README.md").unlink()
+    assert index.build() == 2
+    assert index.search("return load_users") == []
+    index.close()
+
+def test_update_from_change_events(tmp_path):
+    root = make_project(tmp_path)
+    index = open_index(tmp_path, root)
+    
+    (root / "app" / "forms.py").write_text("class UserForm:\n    pass\n")
+    (root / "app" / "models.py").write_text("def load_accounts():\n    pass\n")
+    (root / "app" / "views.py").unlink()
+    index.update([
+        (CREATED, str(root / "app" / "forms.py")),
+        (MODIFIED, str(root / "app" / "models.py")),
+        (DELETED, str(root / "app" / "views.py")),
+        (CREATED, str(root / "node_modules" / "lib.js"))
+    ])
+    
+    assert index.find_symbols("UserForm")[0]["path"] == str(root / "app" / "forms.py")
+    assert index.find_symbols("load_users") == []
+    assert index.find_symbols("load_accounts")
+    assert "app/views.py" not in index.files
+    assert "node_modules/lib.js" not in index.files
+    assert not any(gram for gram, paths in index.postings.items() if "app/views.py" in paths)
+    
+    shutil.rmtree(root / "app")
+    index.update([(DELETED, str(root / "app"))])
+    assert index.files.keys() == {"README.md"}
+    assert index.symbols == {}
+    index.close()
+
+def test_related_snippets(tmp_path):
+    root = make_project(tmp_path)
+    index = open_index(tmp_path, root)
+    code = "def show(path):\n    for user in load_users(path):\n        print(User.greeting(user))\n"
+    
+    snippets = index.related_snippets(code)
+    assert [s["name"] for s in snippets] == ["load_users", "User", "User.greeting"]
+    assert snippets[0]["text"].startswith("def load_users(path):")
+    assert index.related_snippets(code, exclude=root / "app" / "models.py") == []
+    assert "Related code from the project:" in format_snippets(snippets)
+    index.close()
+
+def test_ai_features_include_project_context(tmp_path):
+    root = make_project(tmp_path)
+    index = open_index(tmp_path, root)
+    chat_manager = FakeChatManager()
+    ai_features = AIFeatures(chat_manager, cache=ResponseCache(cache_dir=tmp_path / "cache"), code_index=index)
+    
+    ai_features.explain_code("users = load_users('a.txt')", "Python")
+    assert chat_manager.prompts[0].startswith("Related code from the project:")
+    assert "def load_users(path):" in chat_manager.prompts[0]
+    
+    # Changing a definition the code uses changes the cache key
+    (root / "app" / "models.py").write_text("def load_users(path):\n    return []\n")
+    index.update([(MODIFIED, str(root / "app" / "models.py"))])
+    ai_features.explain_code("users = load_users('a.txt')", "Python")
+    assert len(chat_manager.prompts) == 2
+    index.close()
@@ -0,0 +1,57 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.conversation import ConversationBuffer
+
+def word_counter(calls):
+    """Count one token per word, recording each call."""
+    def count(text):
+        calls.append(text)
+        return len(text.split())
+    return count
+
+def test_render_includes_recent_history():
+    buffer = ConversationBuffer(context_length=1000, response_tokens=100,
+                                system_prompt="Be brief.", prompt_template="[INST] {0} [/INST]")
+    buffer.append("user", "Hello")
+    buffer.append("assistant", "Hi there")
+    
+    assert buffer.render("How are you?") == (
+        "Be brief.\n[INST] Hello [/INST] Hi there\n[INST] How are you? [/INST]"
+    )
+
+def test_oldest_turns_are_dropped_and_summarised():
+    calls = []
+    buffer = ConversationBuffer(context_length=120, response_tokens=20, token_counter=word_counter(calls))
+    for i in range(20):
+        buffer.append("user", f"question number {i}")
+        buffer.append("assistant", f"answer number {i}")
+    
+    prompt = buffer.render("final question")
+    
+    assert prompt.endswith("final question")
+    assert "answer number 19" in prompt
+    assert "question number 0\n" not in prompt
+    assert prompt.startswith("Earlier in this conversation:")
+    assert len(prompt.split()) <= 100
+
+def test_token_counts_are_cached_per_message():
+    calls = []
+    buffer = ConversationBuffer(context_length=1000, token_counter=word_counter(calls))
+    for i in range(10):
+        buffer.append("user", f"message {i}")
+    calls.clear()
+    
+    buffer.render("one more")
+    buffer.render("and another")
+    
+    # Only the new messages are counted, never the stored history
+    assert calls == ["one more", "and another"]
+
+def test_history_is_bounded():
+    buffer = ConversationBuffer(max_messages=4)
+    for i in range(10):
+        buffer.append("user", str(i))
+    
+    assert [content for _, content in buffer] == ["6", "7", "8", "9"]
\ No newline at end of file
@@ -0,0 +1,188 @@
+import sys
+import os
+import hashlib
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import requests
+from src.core.downloader import SegmentedDownloader, DownloadCancelled
+from src.core import integrity
+
+PAYLOAD = bytes(range(256)) * 4096  # 1 MiB
+PAYLOAD_SHA256 = hashlib.sha256(PAYLOAD).hexdigest()
+
+class FileServer:
+    """Serves PAYLOAD locally, optionally with Range support and injected failures."""
+    def __init__(self, ranges=True, fail_after=None):
+        self.ranges = ranges
+        self.fail_after = fail_after  # drop the connection after this many bytes, once
+        self.bytes_served = 0
+        self.range_requests = []
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def do_GET(self):
+                start, end = 0, len(PAYLOAD) - 1
+                header = self.headers.get("Range")
+                if server.ranges and header:
+                    first, last = header.split("=")[1].split("-")
+                    start, end = int(first), int(last or end)
+                    server.range_requests.append((start, end))
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{len(PAYLOAD)}")
+                else:
+                    self.send_response(200)
+                body = PAYLOAD[start:end + 1]
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                
+                if server.fail_after is not None and len(body) > server.fail_after:
+                    body = body[:server.fail_after]
+                    server.fail_after = None
+                    self.wfile.write(body)
+                    server.bytes_served += len(body)
+                    self.close_connection = True
+                    return
+                self.wfile.write(body)
+                server.bytes_served += len(body)
+        
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/model.gguf"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def server():
+    servers = []
+    def make(**kwargs):
+        servers.append(FileServer(**kwargs))
+        return servers[-1]
+    yield make
+    for s in servers:
+        s.close()
+
+def test_parallel_range_download(server, tmp_path):
+    srv = server()
+    progress = []
+    downloader = SegmentedDownloader(
+        srv.url, tmp_path / "model.gguf", segments=4, buffer_size=64 * 1024,
+        chunk_size=16 * 1024, progress_callback=lambda *args: progress.append(args)
+    )
+    
+    path = downloader.run()
+    
+    assert path.read_bytes() == PAYLOAD
+    assert downloader.sha256 == PAYLOAD_SHA256
+    assert len([r for r in srv.range_requests if r != (0, 0)]) == 4
+    assert not (tmp_path / "model.gguf.part").exists()
+    assert not (tmp_path / "model.gguf.part.json").exists()
+    # Progress is throttled by time, not emitted per chunk
+    assert 1 <= len(progress) < 10
+    assert progress[-1][:2] == (len(PAYLOAD), len(PAYLOAD))
+
+def test_interrupted_download_resumes(server, tmp_path):
+    srv = server(fail_after=300 * 1024)
+    dest = tmp_path / "model.gguf"
+    first = SegmentedDownloader(srv.url, dest, segments=1, buffer_size=64 * 1024,
+                                chunk_size=16 * 1024, max_retries=0)
+    with pytest.raises(requests.RequestException):
+        first.run()
+    
+    checkpoint = json.loads((tmp_path / "model.gguf.part.json").read_text())
+    resumed_from = checkpoint["segments"][0]["downloaded"]
+    assert resumed_from > 0
+    
+    second = SegmentedDownloader(srv.url, dest, segments=1)
+    second.run()
+    
+    assert dest.read_bytes() == PAYLOAD
+    assert second.sha256 == PAYLOAD_SHA256
+    assert srv.range_requests[-1] == (resumed_from, len(PAYLOAD) - 1)
+
+def test_retries_segment_from_last_byte(server, tmp_path):
+    srv = server(fail_after=200 * 1024)
+    retries = []
+    downloader = SegmentedDownloader(srv.url, tmp_path / "model.gguf", segments=2,
+                                     buffer_size=32 * 1024, chunk_size=16 * 1024,
+                                     retry_delay=0, retry_callback=lambda *args: retries.append(args))
+    
+    assert downloader.run().read_bytes() == PAYLOAD
+    assert downloader.sha256 == PAYLOAD_SHA256
+    assert retries == [(1, 3)]
+
+def test_server_without_range_support(server, tmp_path):
+    srv = server(ranges=False)
+    downloader = SegmentedDownloader(srv.url, tmp_path / "model.gguf", segments=4)
+    
+    assert downloader.run().read_bytes() == PAYLOAD
+    assert downloader.sha256 == PAYLOAD_SHA256
+
+def test_cancel_removes_partial_download(server, tmp_path):
+    srv = server()
+    downloader = SegmentedDownloader(srv.url, tmp_path / "model.gguf", segments=2,
+                                     buffer_size=16 * 1024, chunk_size=16 * 1024)
+    downloader.set_bandwidth_limit(256 * 1024)
+    threading.Timer(0.2, downloader.cancel).start()
+    
+    with pytest.raises(DownloadCancelled):
+        downloader.run()
+    
+    assert list(tmp_path.iterdir()) == []
+
+def test_pause_and_resume(server, tmp_path):
+    srv = server()
+    downloader = SegmentedDownloader(srv.url, tmp_path / "model.gguf", segments=2,
+                                     buffer_size=16 * 1024, chunk_size=16 * 1024)
+    downloader.pause()
+    thread = threading.Thread(target=downloader.run)
+    thread.start()
+    thread.join(0.3)
+    assert thread.is_alive()
+    
+    downloader.resume()
+    thread.join(5)
+    assert (tmp_path / "model.gguf").read_bytes() == PAYLOAD
+
+def test_concurrent_checkpoints_stay_valid(tmp_path):
+    downloader = SegmentedDownloader("http://localhost/model.gguf", tmp_path / "model.gguf")
+    downloader.total_size = 100
+    downloader.segments = [{"start": 0, "end": 99, "downloaded": 0}]
+    errors = []
+    
+    def save():
+        try:
+            for _ in range(50):
+                downloader.save_checkpoint()
+        except OSError as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=save) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    assert json.loads((tmp_path / "model.gguf.part.json").read_text())["total_size"] == 100
+
+def test_sidecar_caches_hash_until_file_changes(tmp_path):
+    path = tmp_path / "model.gguf"
+    path.write_bytes(PAYLOAD)
+    
+    assert integrity.verification_state(path, PAYLOAD_SHA256) == integrity.UNVERIFIED
+    assert integrity.verify_file(path, PAYLOAD_SHA256) == integrity.VERIFIED
+    assert integrity.verification_state(path, PAYLOAD_SHA256) == integrity.VERIFIED
+    assert integrity.verification_state(path, "0" * 64) == integrity.MISMATCH
+    
+    path.write_bytes(PAYLOAD[:-1])
+    assert integrity.cached_sha256(path) is None
+    assert integrity.verification_state(path, PAYLOAD_SHA256) == integrity.UNVERIFIED
\ No newline at end of file
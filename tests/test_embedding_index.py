@@ -0,0 +1,120 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from src.core.backends import StubBackend
+from src.core.code_index import CodeIndex
+from src.core.embedding_index import EmbeddingIndex, chunk_lines
+from src.core.ai_features import AIFeatures
+from src.core.response_cache import ResponseCache
+from src.core.file_watcher import MODIFIED
+from src.core.chat_manager import ChatManager
+from tests.fakes import FakeChatManager, FakeModelManager, wait_for
+
+FILES = {
+    "billing.py": "def charge_invoice(invoice, card):\n    payment = card.charge(invoice.total)\n    return payment\n",
+    "auth.py": "def login_user(username, password):\n    session = check_password(username, password)\n    return session\n",
+    "report.py": "def monthly_report(invoices):\n    return sum(invoice.total for invoice in invoices)\n"
+}
+
+class CountingEmbedder:
+    """StubBackend embeddings, counting the texts embedded."""
+    def __init__(self):
+        self.backend = StubBackend(embedding_size=128)
+        self.texts = []
+    
+    def __call__(self, texts):
+        self.texts.extend([texts] if isinstance(texts, str) else texts)
+        return self.backend.embed(texts)
+
+def make_indexes(tmp_path, embed):
+    root = tmp_path / "project"
+    root.mkdir(exist_ok=True)
+    for name, text in FILES.items():
+        if not (root / name).exists():
+            (root / name).write_text(text)
+    code_index = CodeIndex(root, index_dir=tmp_path / "index", save_interval=60)
+    code_index.build()
+    embeddings = EmbeddingIndex(root, tmp_path / "embeddings", embed)
+    return root, code_index, embeddings
+
+def test_chunk_lines():
+    text = "\n".join(f"line {i}" for i in range(1, 101))
+    chunks = chunk_lines(text, size=40, overlap=10)
+    
+    assert [(start, end) for start, end, _ in chunks] == [(1, 40), (31, 70), (61, 100)]
+    assert chunks[1][2].startswith("line 31\n")
+    assert chunk_lines("\n\n\n") == []
+
+def test_search_ranks_by_cosine_similarity(tmp_path):
+    embed = CountingEmbedder()
+    root, code_index, embeddings = make_indexes(tmp_path, embed)
+    
+    assert embeddings.sync(code_index) == 3
+    hits = embeddings.search("login user password session", k=2)
+    assert hits[0]["path"] == str(root / "auth.py")
+    assert hits[0]["text"].startswith("def login_user")
+    assert len(hits) == 2 and hits[0]["score"] >= hits[1]["score"]
+    # Stored rows are unit vectors, so scores are cosine similarities
+    assert np.allclose(np.linalg.norm(embeddings.vectors[:embeddings.count], axis=1), 1)
+
+def test_only_changed_files_are_reembedded(tmp_path):
+    embed = CountingEmbedder()
+    root, code_index, embeddings = make_indexes(tmp_path, embed)
+    embeddings.sync(code_index)
+    embeddings.close()
+    code_index.close()
+    
+    embed.texts.clear()
+    root, code_index, embeddings = make_indexes(tmp_path, embed)
+    assert embeddings.sync(code_index) == 0
+    assert embed.texts == []
+    
+    (root / "auth.py").write_text("def logout_user(session):\n    session.close()\n")
+    code_index.update([(MODIFIED, str(root / "auth.py"))])
+    (root / "report.py").unlink()
+    code_index.build()
+    assert embeddings.sync(code_index) == 1
+    assert embed.texts == ["auth.py\ndef logout_user(session):\n    session.close()"]
+    # The freed rows are reused rather than growing the matrix
+    assert embeddings.count == 3
+    assert {hit["path"] for hit in embeddings.search("invoice", k=5)} == {str(root / "billing.py"), str(root / "auth.py")}
+
+def test_ai_features_inject_retrieved_chunks(tmp_path):
+    root, code_index, embeddings = make_indexes(tmp_path, CountingEmbedder())
+    embeddings.sync(code_index)
+    chat_manager = FakeChatManager()
+    ai_features = AIFeatures(chat_manager, cache=ResponseCache(cache_dir=tmp_path / "cache"),
+                             embedding_index=embeddings)
+    ai_features.retrieval_chunks = 1
+    
+    ai_features.ask_about_project("How is the user login password session checked?")
+    prompt = chat_manager.prompts[0]
+    assert prompt.startswith(f"Related code from the project:\n\n# {root / 'auth.py'}:1-3\ndef login_user")
+    assert "charge_invoice" not in prompt
+    
+    # Context is cut to the token budget
+    ai_features.context_tokens = 10
+    ai_features.ask_about_project("How are invoices charged?")
+    assert "Related code" not in chat_manager.prompts[1]
+
+
+def test_code_questions_retrieve_context_on_the_worker(tmp_path):
+    root, code_index, embeddings = make_indexes(tmp_path, CountingEmbedder())
+    embeddings.sync(code_index)
+    model_manager = FakeModelManager(["ok"])
+    chat_manager = ChatManager(model_manager)
+    ai_features = AIFeatures(chat_manager, cache=ResponseCache(), code_index=code_index, embedding_index=embeddings)
+    finished = []
+    chat_manager.response_finished.connect(lambda request_id, response: finished.append(request_id))
+    
+    context = lambda: ai_features.project_context("x = 1", query="charge the invoice card",
+                                                  exclude=str(root / "auth.py"))
+    request_id = chat_manager.ask_about_code("How is an invoice charged?", "x = 1", context)
+    wait_for(lambda: request_id in finished)
+    model_manager.worker.stop()
+    
+    prompt = model_manager.model.prompts[0]
+    assert "def charge_invoice" in prompt and "def login_user" not in prompt
+    assert prompt.endswith("Code:\nx = 1")
\ No newline at end of file
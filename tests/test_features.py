@@ -5,6 +5,7 @@ import time
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.core.model_manager import ModelManager
+from src.core.backends import StubBackend
 from src.core.chat_manager import ChatManager
 from src.core.ai_features import AIFeatures
 from src.core.file_manager import FileManager
@@ -25,8 +26,8 @@ def wait_for_download(model_manager, model_name):
         print("Waiting for download to complete...")
 
 def test_code_analysis():
-    # Initialize managers
-    model_manager = ModelManager()
+    # Initialize managers; the stub backend runs without the 4 GB model
+    model_manager = ModelManager(backend=StubBackend())
     chat_manager = ChatManager(model_manager)
     ai_features = AIFeatures(chat_manager)
     file_manager = FileManager()
@@ -0,0 +1,69 @@
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.file_journal import FileJournal
+from src.core.file_manager import FileManager
+
+def test_versions_survive_reopening(tmp_path):
+    journal = FileJournal(tmp_path)
+    journal.record_version("a.py", b"one", "1")
+    journal.record_version("a.py", b"two", "2")
+    journal.record_version("b.py", b"one", "3")
+    journal.record_delete("b.py")
+    journal.close()
+    
+    reopened = FileJournal(tmp_path)
+    history = reopened.history("a.py")
+    assert [version["timestamp"] for version in history] == ["1", "2"]
+    assert reopened.read_blob(history[-1]["hash"]) == b"two"
+    assert reopened.history("b.py") == []
+    reopened.close()
+
+def test_identical_content_is_stored_once(tmp_path):
+    journal = FileJournal(tmp_path)
+    journal.record_version("a.py", b"same", "1")
+    journal.record_version("a.py", b"same", "2")
+    journal.record_version("b.py", b"same", "3")
+    journal.close()
+    
+    assert len(journal.history("a.py")) == 1
+    assert len(list((tmp_path / "objects").glob("*/*"))) == 1
+
+def test_torn_last_line_is_ignored(tmp_path):
+    journal = FileJournal(tmp_path)
+    journal.record_version("a.py", b"one", "1")
+    journal.close()
+    with open(tmp_path / "journal.jsonl", 'a') as f:
+        f.write('{"op": "version", "pa')
+    
+    journal = FileJournal(tmp_path)
+    assert len(journal.history("a.py")) == 1
+    journal.close()
+
+def test_compaction_drops_superseded_lines_and_blobs(tmp_path):
+    journal = FileJournal(tmp_path, max_versions=3, compact_min_lines=20)
+    for i in range(50):
+        journal.record_version("a.py", str(i).encode(), str(i))
+    journal.close()
+    
+    lines = (tmp_path / "journal.jsonl").read_text().splitlines()
+    assert len(lines) <= 20
+    assert [version["timestamp"] for version in FileJournal(tmp_path, max_versions=3).history("a.py")] == ["47", "48", "49"]
+    assert len(list((tmp_path / "objects").glob("*/*"))) <= 20
+
+def test_file_manager_imports_old_history(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "workspace").mkdir()
+    with open(tmp_path / "workspace" / "file_history.json", 'w') as f:
+        json.dump({"old.py": [{"hash": "abc", "timestamp": "1"}]}, f)
+    
+    file_manager = FileManager()
+    file_manager.create_file("workspace/new.py", "print(1)")
+    file_manager.close()
+    
+    file_manager = FileManager()
+    assert file_manager.file_history["old.py"] == [{"hash": "abc", "timestamp": "1"}]
+    assert len(file_manager.file_history["workspace/new.py"]) == 1
+    file_manager.close()
\ No newline at end of file
@@ -0,0 +1,108 @@
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# GUI modules import core the way src/main.py runs them
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from PyQt6.QtCore import QCoreApplication, QModelIndex
+from gui.file_tree_model import FileTreeModel
+from core.file_watcher import CREATED, DELETED
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        app.processEvents()
+        time.sleep(0.01)
+
+def names(model, parent=QModelIndex()):
+    return [model.data(model.index(row, 0, parent)) for row in range(model.rowCount(parent))]
+
+def load(model, root):
+    loaded = []
+    model.directory_loaded.connect(loaded.append)
+    model.set_root(root)
+    wait_for(lambda: str(root) in loaded)
+    return loaded
+
+def make_project(tmp_path):
+    (tmp_path / ".gitignore").write_text("*.log\n")
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "src" / "main.py").write_text("")
+    (tmp_path / "node_modules" / "lib").mkdir(parents=True)
+    (tmp_path / "models").mkdir()
+    (tmp_path / "debug.log").write_text("")
+    (tmp_path / "README.md").write_text("")
+    (tmp_path / "b.py").write_text("")
+
+def test_directories_load_on_expand(tmp_path):
+    make_project(tmp_path)
+    model = FileTreeModel()
+    loaded = load(model, tmp_path)
+    
+    assert names(model) == ["src", ".gitignore", "b.py", "README.md"]
+    src = model.index(0, 0)
+    assert model.hasChildren(src)
+    assert model.rowCount(src) == 0  # not read until expanded
+    assert model.canFetchMore(src)
+    
+    model.fetchMore(src)
+    assert not model.canFetchMore(src)
+    wait_for(lambda: str(tmp_path / "src") in loaded)
+    
+    assert names(model, src) == ["pkg", "main.py"]
+    assert model.file_path(model.index(1, 0, src)) == str(tmp_path / "src" / "main.py")
+    assert model.parent(model.index(1, 0, src)) == src
+    model.close()
+
+def test_large_directory_arrives_in_batches(tmp_path):
+    for i in range(250):
+        (tmp_path / f"file_{i:03}.txt").write_text("")
+    model = FileTreeModel(batch_size=100)
+    inserts = []
+    model.rowsInserted.connect(lambda parent, first, last: inserts.append((first, last)))
+    load(model, tmp_path)
+    
+    assert inserts == [(0, 99), (100, 199), (200, 249)]
+    assert names(model)[:2] == ["file_000.txt", "file_001.txt"]
+    model.close()
+
+def test_apply_changes_updates_scanned_directories(tmp_path):
+    make_project(tmp_path)
+    model = FileTreeModel()
+    load(model, tmp_path)
+    
+    (tmp_path / "a.py").write_text("")
+    (tmp_path / "new.log").write_text("")
+    (tmp_path / "src" / "other.py").write_text("")
+    (tmp_path / "b.py").unlink()
+    model.apply_changes([
+        (CREATED, str(tmp_path / "a.py")),
+        (CREATED, str(tmp_path / "new.log")),
+        (CREATED, str(tmp_path / "src" / "other.py")),
+        (DELETED, str(tmp_path / "b.py"))
+    ])
+    
+    assert names(model) == ["src", ".gitignore", "a.py", "README.md"]
+    # src was never expanded, so it is simply read later
+    assert model.rowCount(model.index(0, 0)) == 0
+    
+    model.apply_changes([(DELETED, str(tmp_path / "src"))])
+    assert names(model) == [".gitignore", "a.py", "README.md"]
+    assert str(tmp_path / "src") not in model.directories
+    model.close()
+
+def test_stale_scans_are_ignored(tmp_path):
+    (tmp_path / "first").mkdir()
+    (tmp_path / "first" / "a.py").write_text("")
+    (tmp_path / "second").mkdir()
+    model = FileTreeModel()
+    model.set_root(tmp_path / "first")
+    load(model, tmp_path / "second")
+    app.processEvents()
+    
+    assert names(model) == []
+    model.close()
@@ -0,0 +1,111 @@
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from PyQt6.QtCore import QCoreApplication
+from src.core.file_watcher import FileWatcher, coalesce, CREATED, MODIFIED, DELETED
+from src.core.file_manager import FileManager
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+def collect(watcher):
+    batches = []
+    watcher.files_changed.connect(batches.append)
+    return batches
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        app.processEvents()
+        time.sleep(0.01)
+
+def settle(seconds=0.3):
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+
+@pytest.mark.parametrize("use_polling", [False, True])
+def test_burst_arrives_as_one_batch(tmp_path, use_polling):
+    (tmp_path / "existing.py").write_text("a")
+    watcher = FileWatcher(tmp_path, debounce_ms=100, poll_interval_ms=100, use_polling=use_polling)
+    batches = collect(watcher)
+    wait_for(lambda: watcher.is_scanned)
+    
+    (tmp_path / "pkg").mkdir()
+    for i in range(20):
+        (tmp_path / "pkg" / f"module_{i}.py").write_text("x")
+    (tmp_path / "existing.py").write_text("changed")
+    (tmp_path / "node_modules").mkdir()
+    wait_for(lambda: batches)
+    settle()
+    watcher.stop()
+    
+    changes = set(batches[0])
+    assert len(batches) == 1
+    assert (CREATED, str(tmp_path / "pkg")) in changes
+    assert (CREATED, str(tmp_path / "pkg" / "module_19.py")) in changes
+    assert (MODIFIED, str(tmp_path / "existing.py")) in changes
+    assert not any("node_modules" in path for _, path in changes)
+
+def test_removed_directory_reports_its_files(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text("a")
+    watcher = FileWatcher(tmp_path, debounce_ms=100)
+    batches = collect(watcher)
+    wait_for(lambda: watcher.is_scanned)
+    
+    (tmp_path / "pkg" / "a.py").unlink()
+    (tmp_path / "pkg").rmdir()
+    wait_for(lambda: batches)
+    watcher.stop()
+    
+    assert set(batches[0]) == {(DELETED, str(tmp_path / "pkg")), (DELETED, str(tmp_path / "pkg" / "a.py"))}
+
+def test_first_snapshot_is_taken_off_the_calling_thread(tmp_path, monkeypatch):
+    (tmp_path / "pkg").mkdir()
+    threads = set()
+    scan_directory = FileWatcher.scan_directory
+    
+    def record_thread(self, directory):
+        threads.add(threading.get_ident())
+        return scan_directory(self, directory)
+    
+    monkeypatch.setattr(FileWatcher, "scan_directory", record_thread)
+    watcher = FileWatcher(tmp_path)
+    wait_for(lambda: watcher.is_scanned)
+    watcher.stop()
+    
+    assert set(watcher.snapshots) == {tmp_path, tmp_path / "pkg"}
+    assert threads and threading.get_ident() not in threads
+
+def test_coalesce():
+    pending = {}
+    coalesce(pending, "new", CREATED)
+    coalesce(pending, "new", MODIFIED)
+    coalesce(pending, "gone", CREATED)
+    coalesce(pending, "gone", DELETED)
+    coalesce(pending, "replaced", DELETED)
+    coalesce(pending, "replaced", CREATED)
+    
+    assert pending == {"new": CREATED, "replaced": MODIFIED}
+def test_file_manager_reports_only_external_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "project").mkdir()
+    file_manager = FileManager()
+    file_manager.watch_directory("project", debounce_ms=100)
+    batches = []
+    file_manager.files_changed.connect(batches.append)
+    wait_for(lambda: file_manager.watcher.is_scanned)
+    
+    file_manager.create_file("project/own.py", "mine")
+    (tmp_path / "project" / "external.py").write_text("theirs")
+    wait_for(lambda: batches)
+    settle()
+    file_manager.close()
+    
+    assert batches == [[(CREATED, str(tmp_path / "project" / "external.py"))]]
\ No newline at end of file
@@ -0,0 +1,42 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.ignore_rules import IgnoreRules
+
+def test_default_patterns(tmp_path):
+    rules = IgnoreRules(tmp_path)
+    
+    assert rules.is_ignored(tmp_path / "node_modules" / "react" / "index.js", False)
+    assert rules.is_ignored(tmp_path / "models" / "model.gguf", False)
+    assert rules.is_ignored(tmp_path / "src" / "module.pyc", False)
+    # models/ is only ignored at the project root
+    assert not rules.is_ignored(tmp_path / "src" / "models" / "user.py", False)
+    assert not rules.is_ignored(tmp_path / "src" / "main.py", False)
+
+def test_gitignore_patterns(tmp_path):
+    (tmp_path / ".gitignore").write_text(
+        "# build output\n"
+        "*.log\n"
+        "!keep.log\n"
+        "build/\n"
+        "/dist\n"
+        "docs/**/*.tmp\n"
+    )
+    rules = IgnoreRules(tmp_path)
+    
+    assert rules.is_ignored(tmp_path / "logs" / "server.log", False)
+    assert not rules.is_ignored(tmp_path / "keep.log", False)
+    assert rules.is_ignored(tmp_path / "build", True)
+    assert not rules.is_ignored(tmp_path / "build", False)  # a file named build
+    assert rules.is_ignored(tmp_path / "dist", True)
+    assert not rules.is_ignored(tmp_path / "pkg" / "dist", True)
+    assert rules.is_ignored(tmp_path / "docs" / "a" / "b" / "page.tmp", False)
+    assert rules.is_ignored(tmp_path / "docs" / "page.tmp", False)
+    assert not rules.is_ignored(tmp_path / "page.tmp", False)
+
+def test_translate_keeps_star_within_a_segment():
+    rules = IgnoreRules("/project", patterns=["src/*.py"], use_gitignore=False)
+    
+    assert rules.is_ignored("/project/src/main.py", False)
+    assert not rules.is_ignored("/project/src/pkg/main.py", False)
@@ -0,0 +1,166 @@
+import sys
+import os
+import threading
+import time
+import pytest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.backends import StubBackend
+from src.core.model_manager import ModelManager
+from src.core.chat_manager import ChatManager
+from src.core.ai_features import AIFeatures
+from src.core.response_cache import ResponseCache
+from tests.fakes import RecordingBackend, add_models, app
+
+def test_model_is_not_loaded_at_construction(model_manager):
+    assert not model_manager.is_model_loaded()
+    assert model_manager.backend.loads == 0
+
+def test_model_loads_on_first_request(model_manager):
+    model_manager.set_load_policy("on_first_use")
+    model_manager.start()
+    
+    request = model_manager.submit("hi")
+    assert request.wait(5) == "echo: hi"
+    model_manager.shutdown()
+    
+    assert model_manager.is_model_loaded()
+    assert model_manager.backend.loads == 1
+    assert model_manager.backend.prompts == ["hi"]
+
+def test_warm_up_policy_loads_in_background(model_manager):
+    model_manager.set_load_policy("warm_up")
+    model_manager.start()
+    model_manager.submit("hi").wait(5)
+    model_manager.shutdown()
+    
+    assert model_manager.backend.prompts == ["Test.", "hi"]
+    assert ModelManager().get_load_policy() == "warm_up"
+
+def test_stub_backend_needs_no_model_file(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    model_manager = ModelManager(backend=StubBackend())
+    
+    assert model_manager.is_model_available()
+    response = model_manager.submit("hi").wait(5)
+    model_manager.shutdown()
+    
+    assert response == StubBackend().respond("hi")
+
+def test_registry_is_persisted(model_manager):
+    add_models(model_manager, {"small": 1000})
+    model_manager.set_feature_model("explain_code", "small")
+    
+    models = ModelManager(backend=RecordingBackend()).get_available_models()
+    assert list(models) == ["mistral-7b-instruct", "small"]
+    assert models["small"]["downloaded"] and not models["small"]["resident"]
+    assert models["mistral-7b-instruct"]["default"]
+    assert ModelManager(backend=RecordingBackend()).model_for_feature("explain_code") == "small"
+    
+    with pytest.raises(ValueError):
+        model_manager.add_model("small", {"name": "small"})
+    with pytest.raises(ValueError):
+        model_manager.remove_model("mistral-7b-instruct")
+
+def test_models_stay_resident_within_the_ram_budget(model_manager):
+    add_models(model_manager, {"small": 1000, "medium": 2000, "large": 3000})
+    model_manager.ram_budget = 4000 * 1024 * 1024
+    model_manager.load_model("small")
+    
+    assert model_manager.submit("hi", model="medium").wait(5) == "echo: hi"
+    assert model_manager.get_resident_models() == ["small", "medium"]
+    # Making room for large unloads medium, the least recently used model that is not current
+    model_manager.submit("hi", model="large").wait(5)
+    assert model_manager.get_resident_models() == ["small", "large"]
+    assert model_manager.submit("hi").wait(5) == "echo: hi"
+    model_manager.shutdown()
+    
+    assert model_manager.get_current_model() == "small"
+    assert model_manager.backend.prompts == ["hi"]
+    assert model_manager.resident["large"].prompts == ["hi"]
+
+def test_switching_models_does_not_block(tmp_path, model_manager):
+    add_models(model_manager, {"small": 1000})
+    model_manager.ram_budget = 64 * 1024 ** 3
+    switched = []
+    model_manager.model_switched.connect(switched.append)
+    model_manager.load_model()
+    
+    chat_manager = ChatManager(model_manager)
+    model_manager.model_switched.connect(chat_manager.on_model_switched)
+    
+    model_manager.switch_model("small")
+    assert model_manager.submit("on small").wait(5) == "echo: on small"
+    app.processEvents()
+    assert chat_manager.history.context_length == 2048
+    # Removing the current model falls back to the default one
+    model_manager.remove_model("small")
+    model_manager.submit("on default").wait(5)
+    model_manager.shutdown()
+    app.processEvents()
+    
+    assert switched == ["mistral-7b-instruct", "small", "mistral-7b-instruct"]
+    assert model_manager.backend.prompts == ["on default"]
+    assert not (tmp_path / "models" / "small.gguf").exists()
+    assert model_manager.get_resident_models() == ["mistral-7b-instruct"]
+
+def test_routed_requests_load_only_their_model(model_manager):
+    add_models(model_manager, {"small": 1000})
+    model_manager.ram_budget = 64 * 1024 ** 3
+    model_manager.set_load_policy("on_first_use")
+    
+    request = model_manager.submit("hi", model="small", route="explain_code:small")
+    assert request.wait(5) == "echo: hi"
+    model_manager.shutdown()
+    assert model_manager.get_resident_models() == ["small"]
+    assert model_manager.router.stats()["explain_code:small"]["requests"] == 1
+
+def test_history_fits_the_saved_default_model(model_manager):
+    model_manager.add_model("long", {"name": "long", "description": "", "file": "long.gguf", "url": "", "size": None,
+                                     "type": "llama", "context_length": 8192, "prompt_template": "[INST] {0} [/INST]"})
+    model_manager.registry.set_default("long")
+    
+    history = ChatManager(model_manager).history
+    assert history.context_length == 8192 and history.prompt_template == "[INST] {0} [/INST]"
+
+def test_failed_switch_keeps_the_default_model(model_manager):
+    add_models(model_manager, {"small": 1000})
+    model_manager.get_model_path("small").unlink()
+    
+    model_manager.switch_model("small")
+    model_manager.shutdown()
+    assert model_manager.registry.default_model == "mistral-7b-instruct"
+
+def test_removed_model_counts_until_unloaded(model_manager):
+    add_models(model_manager, {"small": 1000})
+    model_manager.load_model("small")
+    model_manager.worker.run_task(lambda: time.sleep(0.2))
+    
+    model_manager.remove_model("small")
+    assert model_manager.resident_memory() == 1000 * 1024 * 1024
+    model_manager.shutdown()
+    assert model_manager.resident_memory() == 0
+
+def test_features_run_on_their_routed_model(model_manager):
+    add_models(model_manager, {"small": 1000})
+    model_manager.set_feature_model("explain_code", "small")
+    ai_features = AIFeatures(ChatManager(model_manager), cache=ResponseCache())
+    
+    assert ai_features.explain_code("x = 1", "python").startswith("echo: Explain")
+    model_manager.shutdown()
+    
+    assert model_manager.get_resident_models() == ["small"]
+    assert model_manager.get_current_model() is None
+
+
+def test_embedding_runs_on_the_worker(monkeypatch, model_manager):
+    backend = model_manager.backend
+    threads = []
+    embed = backend.embed
+    monkeypatch.setattr(backend, "embed", lambda texts: threads.append(threading.get_ident()) or embed(texts))
+    
+    vectors = model_manager.embed(["a", "b"])
+    model_manager.shutdown()
+    
+    assert len(vectors) == 2
+    assert threads == [model_manager.worker.thread_ident] and threads[0] != threading.get_ident()
\ No newline at end of file
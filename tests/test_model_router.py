@@ -0,0 +1,64 @@
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.chat_manager import ChatManager
+from src.core.ai_features import AIFeatures
+from src.core.response_cache import ResponseCache
+from tests.fakes import add_models
+
+def test_light_prompts_go_to_the_small_model(model_manager):
+    add_models(model_manager, {"tiny": 1000, "small": 2000})
+    
+    assert model_manager.route("explain_code", "x = 1") == ("explain_code:small", "tiny")
+    assert model_manager.route("answer_project_question", "Where is x set?") == ("answer_project_question:small", "tiny")
+    assert model_manager.route("explain_code", "x = 1\n" * 100) == ("explain_code:large", None)
+    assert model_manager.route("explain_code", "Please refactor x = 1") == ("explain_code:large", None)
+    assert model_manager.route("debug_code", "x = 1") == ("debug_code:large", None)
+    assert model_manager.route("chat", "hi") == ("chat:large", None)
+
+def test_small_tier_falls_back_to_the_current_model(model_manager):
+    assert model_manager.route("explain_code", "x = 1") == ("explain_code:large", None)
+    
+    # A registered model bigger than the current one is not a small model
+    add_models(model_manager, {"huge": 64000})
+    assert model_manager.route("explain_code", "x = 1") == ("explain_code:large", None)
+
+def test_registry_routes_and_rules_file_take_effect(tmp_path, model_manager):
+    add_models(model_manager, {"tiny": 1000, "coder": 3000})
+    model_manager.set_feature_model("debug_code", "coder")
+    assert model_manager.route("debug_code", "x = 1") == ("debug_code:coder", "coder")
+    
+    rules = {"features": {"explain_code": "large", "chat": "coder", "suggest_tests": "small"},
+             "auto": {"max_prompt_tokens": 5}}
+    (tmp_path / "config" / "routing.json").write_text(json.dumps(rules), encoding="utf-8")
+    assert model_manager.route("explain_code", "x = 1") == ("explain_code:large", None)
+    assert model_manager.route("chat", "hi") == ("chat:coder", "coder")
+    assert model_manager.route("suggest_tests", "x = 1") == ("suggest_tests:small", "tiny")
+    # Features the file leaves out run on the current model
+    assert model_manager.route("generate_documentation", "x = 1") == ("generate_documentation:large", None)
+
+def test_auto_checks_only_the_configured_limits(tmp_path, model_manager):
+    add_models(model_manager, {"tiny": 1000})
+    rules = {"default": "auto", "auto": {"max_prompt_tokens": 5000}}
+    (tmp_path / "config" / "routing.json").write_text(json.dumps(rules), encoding="utf-8")
+    assert model_manager.route("explain_code", "x = 1\n" * 1000) == ("explain_code:small", "tiny")
+    assert model_manager.route("explain_code", "x" * 30000) == ("explain_code:large", None)
+
+def test_latency_is_recorded_per_route(model_manager):
+    add_models(model_manager, {"tiny": 1000})
+    model_manager.ram_budget = 64 * 1024 ** 3
+    chat_manager = ChatManager(model_manager)
+    ai_features = AIFeatures(chat_manager, cache=ResponseCache())
+    
+    ai_features.explain_code("x = 1", "python")
+    ai_features.explain_code("y = 2", "python")
+    chat_manager.get_response("hi")
+    model_manager.shutdown()
+    
+    stats = model_manager.router.stats()
+    assert list(stats) == ["chat:large", "explain_code:small"]
+    assert stats["explain_code:small"]["model"] == "tiny" and stats["explain_code:small"]["requests"] == 2
+    assert stats["chat:large"]["model"] == "mistral-7b-instruct"
+    assert 0 <= stats["chat:large"]["p50"] <= stats["chat:large"]["max"]
\ No newline at end of file
@@ -0,0 +1,185 @@
+import sys
+import os
+import time
+import textwrap
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from src.core.plugin_manager import PluginManager, read_plugin_info
+from src.core.chat_manager import ChatManager
+from tests.fakes import FakeModelManager, wait_for
+
+def write_plugin(directory, name, source):
+    path = directory / f"{name}.py"
+    path.write_text(textwrap.dedent(source))
+    return path
+
+SHOUT = """
+    import pathlib
+    pathlib.Path(__file__).with_name("imported.txt").write_text("yes")
+    
+    PLUGIN_INFO = {"description": "Shouts", "version": "1.0", "author": "Tester"}
+    
+    def pre_chat(message):
+        return message.upper()
+    
+    def helper():
+        pass
+"""
+
+def test_plugins_are_indexed_without_importing(tmp_path):
+    write_plugin(tmp_path, "shout", SHOUT)
+    manager = PluginManager(tmp_path)
+    
+    plugins = manager.get_available_plugins()
+    assert plugins["shout"]["description"] == "Shouts"
+    assert plugins["shout"]["hooks"] == ["pre_chat"]
+    assert plugins["shout"]["status"] == "inactive"
+    assert not (tmp_path / "imported.txt").exists()
+    # A new manager reads the manifest instead of parsing again
+    assert "shout" in PluginManager(tmp_path).manifest
+
+def test_hooks_import_enabled_plugins_on_first_use(tmp_path):
+    write_plugin(tmp_path, "shout", SHOUT)
+    manager = PluginManager(tmp_path)
+    
+    assert manager.run_hook("pre_chat", "hi") == "hi"
+    manager.load_plugin("shout")
+    assert not (tmp_path / "imported.txt").exists()
+    assert manager.run_hook("pre_chat", "hi") == "HI"
+    assert manager.get_loaded_plugins() == ["shout"]
+    
+    manager.unload_plugin("shout")
+    assert manager.run_hook("pre_chat", "hi") == "hi"
+    assert PluginManager(tmp_path).manifest["shout"]["enabled"] is False
+
+def test_install_and_remove(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    manager = PluginManager(tmp_path / "plugins")
+    
+    with pytest.raises(ValueError):
+        manager.install_plugin(write_plugin(source, "nothing", "x = 1\n"))
+    name = manager.install_plugin(write_plugin(source, "shout", SHOUT))
+    assert name == "shout" and (tmp_path / "plugins" / "shout.py").exists()
+    
+    manager.remove_plugin("shout")
+    assert manager.get_available_plugins() == {}
+    assert not (tmp_path / "plugins" / "shout.py").exists()
+
+def test_chat_hooks(tmp_path):
+    write_plugin(tmp_path, "shout", SHOUT)
+    write_plugin(tmp_path, "sign", """
+        def post_chat(response, message):
+            return f"{response} (re: {message})"
+    """)
+    plugin_manager = PluginManager(tmp_path)
+    plugin_manager.load_plugin("shout")
+    plugin_manager.load_plugin("sign")
+    model_manager = FakeModelManager(["42"])
+    chat_manager = ChatManager(model_manager, plugin_manager)
+    
+    assert chat_manager.get_response("answer?") == "42 (re: ANSWER?)"
+    model_manager.worker.stop()
+    assert model_manager.model.prompts == ["ANSWER?"]
+    assert list(chat_manager.history) == [("user", "ANSWER?"), ("assistant", "42 (re: ANSWER?)")]
+
+def test_chat_hooks_run_on_the_worker(tmp_path):
+    write_plugin(tmp_path, "thread", """
+        import threading
+        
+        def pre_chat(message):
+            return f"{message} on {threading.get_ident()}"
+    """)
+    plugin_manager = PluginManager(tmp_path)
+    plugin_manager.load_plugin("thread")
+    model_manager = FakeModelManager(["ok"])
+    chat_manager = ChatManager(model_manager, plugin_manager)
+    finished = []
+    chat_manager.response_finished.connect(lambda request_id, response: finished.append(response))
+    
+    chat_manager.send_message("hi")
+    wait_for(lambda: finished)
+    model_manager.worker.stop()
+    assert model_manager.model.prompts == [f"hi on {model_manager.worker.thread_ident}"]
+    assert list(chat_manager.history)[0] == ("user", model_manager.model.prompts[0])
+
+def test_sandboxed_plugin(tmp_path):
+    write_plugin(tmp_path, "echo", """
+        import os
+        PLUGIN_INFO = {"sandbox": True}
+        
+        def post_chat(response, message):
+            print("plugin output goes to stderr")
+            return f"{response} from {os.getpid()}"
+    """)
+    manager = PluginManager(tmp_path)
+    manager.load_plugin("echo")
+    
+    response = manager.run_hook("post_chat", "ok", "message")
+    manager.shutdown()
+    assert response.startswith("ok from ") and response != f"ok from {os.getpid()}"
+
+def test_sandboxed_package_plugin(tmp_path):
+    package = tmp_path / "signer"
+    package.mkdir()
+    (package / "text.py").write_text("SUFFIX = ' -- signed'\n")
+    (package / "__init__.py").write_text(textwrap.dedent("""
+        from .text import SUFFIX
+        PLUGIN_INFO = {"sandbox": True}
+        
+        def post_chat(response, message):
+            return response + SUFFIX
+    """))
+    manager = PluginManager(tmp_path)
+    manager.load_plugin("signer")
+    errors = []
+    manager.plugin_error.connect(lambda name, error: errors.append(error))
+    
+    response = manager.run_hook("post_chat", "ok", "message")
+    manager.shutdown()
+    assert errors == [] and response == "ok -- signed"
+
+def test_slow_sandboxed_plugin_is_stopped(tmp_path):
+    write_plugin(tmp_path, "slow", """
+        import time
+        PLUGIN_INFO = {"sandbox": True, "timeout": 0.5}
+        
+        def pre_chat(message):
+            time.sleep(30)
+            return "never"
+    """)
+    manager = PluginManager(tmp_path)
+    manager.load_plugin("slow")
+    errors = []
+    manager.plugin_error.connect(lambda name, error: errors.append((name, error)))
+    
+    start = time.perf_counter()
+    assert manager.run_hook("pre_chat", "hi") == "hi"
+    assert time.perf_counter() - start < 5
+    assert errors and errors[0][0] == "slow" and "0.5s" in errors[0][1]
+    assert manager.loaded_plugins["slow"].process is None
+
+@pytest.mark.skipif(sys.platform == "win32", reason="memory limits need the resource module")
+def test_sandboxed_plugin_memory_limit(tmp_path):
+    write_plugin(tmp_path, "greedy", """
+        PLUGIN_INFO = {"sandbox": True, "timeout": 10, "memory_mb": 200}
+        
+        def pre_chat(message):
+            data = bytearray(500 * 1024 * 1024)
+            return "allocated"
+    """)
+    manager = PluginManager(tmp_path)
+    manager.load_plugin("greedy")
+    errors = []
+    manager.plugin_error.connect(lambda name, error: errors.append(error))
+    
+    assert manager.run_hook("pre_chat", "hi") == "hi"
+    manager.shutdown()
+    assert errors == ["Plugin exceeded its memory limit"]
+
+def test_read_plugin_info_rejects_bad_source(tmp_path):
+    with pytest.raises(ValueError):
+        read_plugin_info(write_plugin(tmp_path, "broken", "def pre_chat(:\n"))
+    with pytest.raises(ValueError):
+        read_plugin_info(write_plugin(tmp_path, "dynamic", "PLUGIN_INFO = dict(a=1)\ndef pre_chat(m): return m\n"))
\ No newline at end of file
@@ -0,0 +1,88 @@
+import sys
+import os
+import threading
+import pytest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.response_cache import ResponseCache
+from src.core.ai_features import AIFeatures
+from src.core.chat_manager import ChatManager
+from src.core.generation_worker import RequestCancelled
+from src.core.model_manager import ModelManager
+from tests.fakes import FakeChatManager, FakeModelManager, RecordingBackend, add_models
+
+def test_memory_tier_is_lru():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+def test_disk_tier_survives_restart(tmp_path):
+    ResponseCache(cache_dir=tmp_path).put("key", "cached answer")
+    
+    cache = ResponseCache(cache_dir=tmp_path)
+    assert cache.get("key") == "cached answer"
+    assert cache.stats()["disk_hits"] == 1
+
+def test_disk_tier_evicts_by_size(tmp_path):
+    cache = ResponseCache(max_entries=1, cache_dir=tmp_path, max_disk_bytes=300)
+    for i in range(10):
+        cache.put(f"key{i}", "x" * 50)
+    
+    assert cache.stats()["disk_bytes"] <= 300
+    assert cache.get("key9") is not None
+    assert cache.get("key0") is None
+
+def test_key_depends_on_inputs():
+    key = ResponseCache.make_key("model", "template", {}, "code", language="Python")
+    
+    assert key == ResponseCache.make_key("model", "template", {}, "code", language="Python")
+    assert key != ResponseCache.make_key("other", "template", {}, "code", language="Python")
+    assert key != ResponseCache.make_key("model", "template", {"temp": 0.1}, "code", language="Python")
+    assert key != ResponseCache.make_key("model", "template", {}, "code2", language="Python")
+    assert key != ResponseCache.make_key("model", "template", {}, "code", language="Go")
+
+def test_ai_features_reuse_cached_responses(tmp_path):
+    chat_manager = FakeChatManager()
+    ai_features = AIFeatures(chat_manager, cache=ResponseCache(cache_dir=tmp_path))
+    
+    first = ai_features.explain_code("print(1)", "Python")
+    second = ai_features.explain_code("print(1)", "Python")
+    third = ai_features.explain_code("print(2)", "Python")
+    
+    assert first == second == "response 1"
+    assert third == "response 2"
+    assert len(chat_manager.prompts) == 2
+
+def test_cancelled_responses_are_not_cached(tmp_path):
+    model_manager = FakeModelManager(["slow"] * 50, delay=0.02)
+    cache = ResponseCache(cache_dir=tmp_path)
+    ai_features = AIFeatures(ChatManager(model_manager), cache=cache)
+    threading.Timer(0.1, model_manager.worker.cancel_all).start()
+    
+    with pytest.raises(RequestCancelled):
+        ai_features.explain_code("print(1)", "Python")
+    model_manager.worker.stop()
+    
+    assert cache.stats()["entries"] == 0 and cache.stats()["disk_entries"] == 0
+
+def test_answers_cached_before_a_model_loads_are_keyed_by_the_model_that_ran(model_manager):
+    add_models(model_manager, {"small": 1000})
+    cache = ResponseCache()
+    AIFeatures(ChatManager(model_manager), cache=cache).debug_code("x = y", "NameError", "python")
+    model_manager.shutdown()
+    assert len(model_manager.backend.prompts) == 1
+    
+    # After a restart with another default model the answer is generated again
+    model_manager.registry.set_default("small")
+    restarted = ModelManager(backend=RecordingBackend())
+    AIFeatures(ChatManager(restarted), cache=cache).debug_code("x = y", "NameError", "python")
+    restarted.shutdown()
+    assert len(restarted.backend.prompts) == 1 and restarted.get_current_model() == "small"
\ No newline at end of file
@@ -0,0 +1,122 @@
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.backends import StubBackend
+from src.core.chat_manager import ChatManager
+from src.core.semantic_cache import SemanticCache
+from tests.fakes import FakeModelManager, wait_for
+
+embed = StubBackend(embedding_size=256).embed
+
+def test_near_duplicate_questions_hit():
+    cache = SemanticCache(embed, threshold=0.8)
+    cache.put("How do I reverse a list in Python?", "Use reversed().", "model")
+    
+    hit = cache.lookup("how do I reverse a list in python", "model")
+    assert hit["answer"] == "Use reversed()." and hit["similarity"] > 0.9
+    assert cache.lookup("What is a closure in JavaScript?", "model") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["hit_rate"] == 0.5
+
+def test_same_prompt_replaces_its_entry():
+    cache = SemanticCache(embed)
+    cache.put("Explain decorators", "old", "model")
+    cache.put("Explain decorators", "new", "model")
+    assert cache.stats()["entries"] == 1
+    assert cache.lookup("Explain decorators", "model")["answer"] == "new"
+
+def test_least_recently_used_entries_are_evicted():
+    cache = SemanticCache(embed, max_entries=2)
+    cache.put("first question about sorting", "1", "model")
+    cache.put("second question about threads", "2", "model")
+    assert cache.lookup("first question about sorting", "model") is not None
+    cache.put("third question about sockets", "3", "model")
+    
+    assert cache.lookup("second question about threads", "model") is None
+    assert cache.lookup("first question about sorting", "model")["answer"] == "1"
+    assert cache.stats()["evictions"] == 1
+
+def test_entries_expire_and_are_kept_per_model():
+    cache = SemanticCache(embed, ttl=0.05)
+    cache.put("What is a generator?", "A lazy iterator.", "model")
+    time.sleep(0.1)
+    assert cache.lookup("What is a generator?", "model") is None
+    assert cache.stats()["expirations"] == 1
+    
+    cache.ttl = None
+    cache.put("What is a generator?", "A lazy iterator.", "model")
+    assert cache.lookup("What is a generator?", "other model") is None
+    cache.put("What is a generator?", "A function that yields.", "other model")
+    assert cache.lookup("What is a generator?", "model")["answer"] == "A lazy iterator."
+    assert cache.lookup("What is a generator?", "other model")["answer"] == "A function that yields."
+    assert cache.stats()["entries"] == 2
+
+def test_chat_manager_reuses_answers_on_the_worker():
+    model_manager = FakeModelManager(["Use", " sorted()"])
+    threads = set()
+    
+    def record_thread(texts):
+        threads.add(threading.get_ident())
+        return embed(texts)
+    
+    chat_manager = ChatManager(model_manager, semantic_cache=SemanticCache(record_thread))
+    assert chat_manager.get_response("How do I sort a list?") == "Use sorted()"
+    chat_manager.clear_history()
+    assert chat_manager.get_response("How do I sort a list") == "Use sorted()"
+    assert len(model_manager.model.prompts) == 1
+    
+    chat_manager.clear_history()
+    finished = []
+    chat_manager.response_finished.connect(lambda request_id, response: finished.append((request_id, response)))
+    request_id = chat_manager.send_message("how do i sort a list?")
+    wait_for(lambda: (request_id, "Use sorted()") in finished)
+    model_manager.worker.stop()
+    
+    assert len(model_manager.model.prompts) == 1
+    assert len(chat_manager.history) == 2
+    assert threads == {model_manager.worker.thread_ident}
+
+def test_lookups_before_the_model_loads_use_the_default_model(model_manager):
+    cache = SemanticCache(embed)
+    cache.put("How do I sort a list?", "Use sorted()", "mistral-7b-instruct")
+    chat_manager = ChatManager(model_manager, semantic_cache=cache)
+    
+    assert chat_manager.get_response("How do I sort a list?") == "Use sorted()"
+    model_manager.shutdown()
+    assert model_manager.backend.prompts == []
+
+def test_follow_up_questions_are_not_cached():
+    model_manager = FakeModelManager(["Because", " it is stable"])
+    cache = SemanticCache(embed)
+    cache.put("Why?", "An answer from another conversation", "fake")
+    chat_manager = ChatManager(model_manager, semantic_cache=cache)
+    
+    chat_manager.get_response("Which sort does Python use?")
+    assert chat_manager.get_response("Why?") == "Because it is stable"
+    model_manager.worker.stop()
+    
+    assert len(model_manager.model.prompts) == 2
+    assert cache.stats()["entries"] == 2
+
+def test_offered_answer_replaces_the_generated_one():
+    model_manager = FakeModelManager(["slow"] * 50, delay=0.02)
+    cache = SemanticCache(embed)
+    cache.put("How do I sort a list?", "Use sorted()", "fake")
+    chat_manager = ChatManager(model_manager, semantic_cache=cache)
+    chat_manager.offer_cached_answers = True
+    offers = []
+    finished = []
+    chat_manager.cached_answer_offered.connect(lambda *offer: offers.append(offer))
+    chat_manager.response_finished.connect(lambda request_id, response: finished.append(response))
+    
+    request_id = chat_manager.send_message("How do I sort a list?")
+    wait_for(lambda: offers)
+    assert offers[0][:2] == (request_id, "Use sorted()")
+    chat_manager.use_cached_answer(request_id)
+    wait_for(lambda: finished)
+    model_manager.worker.stop()
+    
+    assert finished == ["Use sorted()"]
+    assert list(chat_manager.history)[-1] == ("assistant", "Use sorted()")
\ No newline at end of file
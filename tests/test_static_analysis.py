@@ -0,0 +1,87 @@
+import sys
+import os
+import ast
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.static_analysis import analyze_python, summarize_facts
+from src.core.ai_features import AIFeatures
+from src.core.response_cache import ResponseCache
+from tests.fakes import ScriptedChatManager
+
+SOURCE = '''import os
+from . import util
+
+LIMIT = 10
+
+class Parser(Base):
+    def parse(self, items):
+        """Parse items."""
+        for item in items:
+            if item and item.ok or item.forced:
+                try:
+                    yield item
+                except ValueError:
+                    pass
+            elif item is None:
+                continue
+    
+    def empty(self):
+        return [x for x in range(3) if x]
+
+def outer(a, *args, b=1, **kwargs):
+    def inner():
+        return 1 if a else 2
+    return inner
+'''
+
+def test_structure():
+    facts = analyze_python(SOURCE)
+    structure = facts["structure"]
+    
+    assert structure["classes"] == [{"name": "Parser", "line": 6, "end_line": 19, "bases": ["Base"],
+                                     "methods": ["parse", "empty"]}]
+    assert [f["name"] for f in structure["functions"]] == ["Parser.parse", "Parser.empty", "outer", "outer.inner"]
+    assert structure["functions"][2]["args"] == ["a", "*args", "b", "**kwargs"]
+    assert structure["functions"][0]["docstring"] and structure["functions"][0]["method"]
+    assert structure["imports"] == [".", "os"]
+    assert structure["globals"] == ["LIMIT"]
+
+def test_complexity():
+    complexity = analyze_python(SOURCE)["complexity"]
+    
+    # for, if, and/or, except, elif
+    assert complexity["cyclomatic"] == {"Parser.parse": 7, "Parser.empty": 3, "outer": 1, "outer.inner": 2}
+    # for > if > try; the elif does not nest deeper
+    assert complexity["nesting_depth"]["Parser.parse"] == 3
+    assert complexity["max_nesting_depth"] == 3
+    assert complexity["max_cyclomatic"] == 7
+    assert complexity["average_cyclomatic"] == 3.25
+
+def test_structure_without_unparse(monkeypatch):
+    facts = analyze_python(SOURCE)
+    # Python 3.8 has no ast.unparse, so expressions are read from the source
+    monkeypatch.delattr(ast, "unparse")
+    assert analyze_python(SOURCE) == facts
+
+def test_syntax_error():
+    assert analyze_python("def f(:\n") is None
+
+def test_model_only_reviews_python(tmp_path):
+    review = {"issues": ["parse swallows ValueError"], "best_practices": ["add docstrings"]}
+    chat_manager = ScriptedChatManager([json.dumps(review)])
+    ai_features = AIFeatures(chat_manager, cache=ResponseCache(cache_dir=tmp_path))
+    
+    result = ai_features.analyze_code_structure(SOURCE, "Python")
+    facts = analyze_python(SOURCE)
+    assert result == {**facts, **review}
+    assert summarize_facts(facts) in chat_manager.prompts[0]
+    assert "Complexity metrics" not in chat_manager.prompts[0]
+
+def test_unparsable_python_uses_full_analysis(tmp_path):
+    analysis = {"structure": {}, "complexity": {}, "issues": ["syntax error"], "best_practices": []}
+    chat_manager = ScriptedChatManager([json.dumps(analysis)])
+    ai_features = AIFeatures(chat_manager, cache=ResponseCache(cache_dir=tmp_path))
+    
+    assert ai_features.analyze_code_structure("def f(:\n", "Python") == analysis
+    assert "Complexity metrics" in chat_manager.prompts[0]
\ No newline at end of file
@@ -0,0 +1,81 @@
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from src.core.structured_output import StreamingJSONParser, extract_json, validate, SCHEMAS
+from src.core.ai_features import AIFeatures
+from src.core.response_cache import ResponseCache
+from src.core.backends import StubBackend
+from src.core.model_manager import ModelManager
+from src.core.chat_manager import ChatManager
+from tests.fakes import ScriptedChatManager
+
+VALID = {"structure": {"functions": ["f"]}, "complexity": {"f": 1}, "issues": [], "best_practices": ["ok"]}
+
+def test_parser_stops_when_object_closes():
+    parser = StreamingJSONParser()
+    tokens = ["Sure! ", "{\"a\": ", "\"}{\\\"\", ", "\"b\": [1, ", "{\"c\": 2}]", "} and ", "more"]
+    fed = [parser.feed(token) for token in tokens]
+    
+    assert fed == [False, False, False, False, False, True, True]
+    assert json.loads(parser.text()) == {"a": "}{\"", "b": [1, {"c": 2}]}
+
+def test_extract_json():
+    assert extract_json('Here it is:\n```json\n{"a": 1,}\n```\nThanks') == {"a": 1}
+    assert extract_json('```json\n{"a": {"b": [1, 2,]}}') == {"a": {"b": [1, 2]}}
+    assert extract_json('The result is {"a": "x"} as requested') == {"a": "x"}
+    with pytest.raises(ValueError):
+        extract_json("No JSON here")
+    with pytest.raises(ValueError):
+        extract_json('{"a": [1, 2')
+
+def test_validate():
+    schema = SCHEMAS["analyze_code_structure"]
+    
+    assert validate(VALID, schema) == []
+    assert validate([], schema) == ["$ should be object"]
+    assert validate({**VALID, "issues": "none", "complexity": True}, schema) == [
+        "$.complexity should be object", "$.issues should be array"]
+    assert validate({"structure": {}}, schema) == [
+        '$ is missing "complexity"', '$ is missing "issues"', '$ is missing "best_practices"']
+    assert validate(True, {"type": "integer"}) == ["$ should be integer"]
+
+def test_repair_prompt_after_invalid_answer(tmp_path):
+    chat_manager = ScriptedChatManager(["I think the code is fine.", json.dumps(VALID)])
+    ai_features = AIFeatures(chat_manager, cache=ResponseCache(cache_dir=tmp_path))
+    
+    assert ai_features.analyze_code_structure("function f() {}", "JavaScript") == VALID
+    assert "No JSON object found" in chat_manager.prompts[1]
+    assert "I think the code is fine." in chat_manager.prompts[1]
+    # The repair prompt still has the task and the code
+    assert chat_manager.prompts[1].startswith(chat_manager.prompts[0])
+    assert "function f() {}" in chat_manager.prompts[1]
+    # Valid answers are cached
+    assert ai_features.analyze_code_structure("function f() {}", "JavaScript") == VALID
+    assert len(chat_manager.prompts) == 2
+    
+    stats = ai_features.structured_stats()
+    assert (stats["requests"], stats["repaired"], stats["retries"]) == (1, 1, 1)
+    assert stats["success_rate"] == 1.0 and stats["retry_rate"] == 1.0
+
+def test_retries_are_bounded(tmp_path):
+    chat_manager = ScriptedChatManager(['{"structure": {}}'] * 3)
+    ai_features = AIFeatures(chat_manager, cache=ResponseCache(cache_dir=tmp_path))
+    
+    result = ai_features.analyze_code_structure("x = 1", "Python")
+    assert result["error"] == "Failed to parse analysis"
+    assert '$ is missing "issues"' in result["details"]
+    assert len(chat_manager.prompts) == 3
+    assert ai_features.structured_stats()["success_rate"] == 0.0
+
+def test_generation_stops_when_object_closes():
+    backend = StubBackend(responder=lambda prompt: '{"answer": "yes"} and then a long ramble that is never generated')
+    model_manager = ModelManager(backend=backend)
+    chat_manager = ChatManager(model_manager)
+    parser = StreamingJSONParser()
+    
+    response = chat_manager.process_message("Question?", stop_when=parser.feed)
+    model_manager.shutdown()
+    assert response == '{"answer": "yes"} '
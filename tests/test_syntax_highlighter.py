@@ -0,0 +1,48 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# GUI modules import core the way src/main.py runs them
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtGui import QTextDocument
+from gui.tabs.code_tab import PythonHighlighter
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+def highlight(code):
+    """Highlight code and return each block's (text, state, formatted spans)."""
+    document = QTextDocument()
+    highlighter = PythonHighlighter(document)
+    document.setPlainText(code)
+    highlighter.rehighlight()
+    blocks = []
+    block = document.begin()
+    while block.isValid():
+        spans = [block.text()[r.start:r.start + r.length] for r in block.layout().formats()]
+        blocks.append((block.text(), block.userState(), spans))
+        block = block.next()
+    return blocks
+
+def test_keywords_builtins_strings_and_comments():
+    [(_, state, spans)] = highlight("def f(x): return len('a#b') + 0x1F  # done")
+    
+    assert state == PythonHighlighter.NORMAL
+    assert spans == ["def", "return", "len", "'a#b'", "0x1F", "# done"]
+
+def test_identifiers_containing_keywords_are_not_highlighted():
+    [(_, _, spans)] = highlight("format_if = lengths")
+    
+    assert spans == []
+
+def test_triple_quoted_string_spans_blocks():
+    blocks = highlight('x = """first\nif in string\nend""" if y else z\n\'\'\'open')
+    
+    assert [state for _, state, _ in blocks] == [
+        PythonHighlighter.IN_TRIPLE_DOUBLE,
+        PythonHighlighter.IN_TRIPLE_DOUBLE,
+        PythonHighlighter.NORMAL,
+        PythonHighlighter.IN_TRIPLE_SINGLE
+    ]
+    assert blocks[1][2] == ["if in string"]
+    assert blocks[2][2] == ['end"""', "if", "else"]
\ No newline at end of file